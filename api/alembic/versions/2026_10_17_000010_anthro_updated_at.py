@@ -0,0 +1,31 @@
+"""anthropometric dataset updated_at
+
+Revision ID: 000010
+Revises: 000009
+Create Date: 2026-10-17 00:10:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "000010"
+down_revision = "000009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "anthropometric_datasets",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("anthropometric_datasets", "updated_at")
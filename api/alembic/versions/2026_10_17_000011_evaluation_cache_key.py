@@ -0,0 +1,47 @@
+"""evaluation cache key and artifact content hash
+
+The ``evaluation_runs.cache_key`` index is built with CREATE INDEX
+CONCURRENTLY so writes to the table are not blocked during the build.
+
+Revision ID: 000011
+Revises: 000010
+Create Date: 2026-10-17 00:11:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "000011"
+down_revision = "000010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "design_artifacts", sa.Column("sha256", sa.String(length=64), nullable=True)
+    )
+    op.add_column(
+        "evaluation_runs", sa.Column("cache_key", sa.String(length=64), nullable=True)
+    )
+    with op.get_context().autocommit_block():
+        # Leftover INVALID index from an interrupted concurrent build
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_evaluation_runs_cache_key")
+        op.create_index(
+            "ix_evaluation_runs_cache_key",
+            "evaluation_runs",
+            ["cache_key"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_evaluation_runs_cache_key",
+            table_name="evaluation_runs",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("evaluation_runs", "cache_key")
+    op.drop_column("design_artifacts", "sha256")
@@ -0,0 +1,43 @@
+"""report build status and evaluation link
+
+Revision ID: 000012
+Revises: 000011
+Create Date: 2026-10-17 00:12:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "000012"
+down_revision = "000011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("reports", sa.Column("evaluation_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_reports_evaluation_id",
+        "reports",
+        "evaluation_runs",
+        ["evaluation_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index("ix_reports_evaluation_id", "reports", ["evaluation_id"])
+    op.add_column(
+        "reports",
+        sa.Column(
+            "status", sa.String(length=32), nullable=False, server_default="done"
+        ),
+    )
+    op.add_column("reports", sa.Column("error", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("reports", "error")
+    op.drop_column("reports", "status")
+    op.drop_index("ix_reports_evaluation_id", table_name="reports")
+    op.drop_constraint("fk_reports_evaluation_id", "reports", type_="foreignkey")
+    op.drop_column("reports", "evaluation_id")
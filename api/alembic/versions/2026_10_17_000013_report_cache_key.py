@@ -0,0 +1,27 @@
+"""report content cache key
+
+Revision ID: 000013
+Revises: 000012
+Create Date: 2026-10-17 00:13:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "000013"
+down_revision = "000012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "reports", sa.Column("cache_key", sa.String(length=64), nullable=True)
+    )
+    op.create_index("ix_reports_cache_key", "reports", ["cache_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reports_cache_key", table_name="reports")
+    op.drop_column("reports", "cache_key")
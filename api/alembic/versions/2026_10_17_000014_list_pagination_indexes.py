@@ -0,0 +1,54 @@
+"""indexes for keyset-paginated listings
+
+Built with CREATE INDEX CONCURRENTLY so the listed tables stay writable
+during the build.
+
+Revision ID: 000014
+Revises: 000013
+Create Date: 2026-10-17 00:14:00
+
+"""
+
+from alembic import op
+
+revision = "000014"
+down_revision = "000013"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("users", ["org_id", "id"]),
+    ("projects", ["org_id", "id"]),
+    ("projects", ["org_id", "name"]),
+    ("design_artifacts", ["project_id", "id"]),
+    ("design_artifacts", ["project_id", "name"]),
+    ("anthropometric_datasets", ["org_id", "id"]),
+    ("ability_profiles", ["org_id", "id"]),
+    ("rule_packs", ["org_id", "id"]),
+    ("rule_packs", ["org_id", "name"]),
+    ("simulation_scenarios", ["project_id", "id"]),
+    ("evaluation_runs", ["scenario_id", "id"]),
+    ("reports", ["project_id", "id"]),
+]
+
+
+def _name(table: str, cols: list[str]) -> str:
+    return f"ix_{table}_{'_'.join(cols)}"
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, cols in INDEXES:
+            # Leftover INVALID index from an interrupted concurrent build
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {_name(table, cols)}")
+            op.create_index(
+                _name(table, cols), table, cols, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, cols in reversed(INDEXES):
+            op.drop_index(
+                _name(table, cols), table_name=table, postgresql_concurrently=True
+            )
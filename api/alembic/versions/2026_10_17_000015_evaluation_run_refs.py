@@ -0,0 +1,126 @@
+"""evaluation run artifact/rulepack/webhook columns
+
+Promotes ``artifact_id``, ``rulepack_id`` and ``webhook_url`` out of the
+``metrics`` JSON. The migration is online: indexes are built
+with CREATE INDEX CONCURRENTLY, foreign keys are added NOT VALID and
+validated separately, and the backfill commits in id-range batches so no
+long lock is held on ``evaluation_runs``. Rows that old app instances
+enqueue while the range pass runs are picked up by a catch-up loop; the
+app also falls back to ``metrics`` for them until the next release.
+
+Revision ID: 000015
+Revises: 000014
+Create Date: 2026-10-17 00:15:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "000015"
+down_revision = "000014"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10_000
+
+INDEXES = [
+    ("ix_evaluation_runs_artifact_id_id", ["artifact_id", "id"]),
+    ("ix_evaluation_runs_rulepack_id_id", ["rulepack_id", "id"]),
+    ("ix_evaluation_runs_status_created_at", ["status", "created_at"]),
+]
+
+FOREIGN_KEYS = [
+    ("fk_evaluation_runs_artifact_id", "artifact_id", "design_artifacts"),
+    ("fk_evaluation_runs_rulepack_id", "rulepack_id", "rule_packs"),
+]
+
+# Ids that no longer resolve (deleted artifacts/rulepacks) backfill as NULL.
+# COALESCE keeps values already written by new code during the migration.
+_SET = """
+    UPDATE evaluation_runs r SET
+        artifact_id = COALESCE(r.artifact_id, (
+            SELECT a.id FROM design_artifacts a
+            WHERE a.id::text = r.metrics->>'artifact_id'
+        )),
+        rulepack_id = COALESCE(r.rulepack_id, (
+            SELECT p.id FROM rule_packs p
+            WHERE p.id::text = r.metrics->>'rulepack_id'
+        )),
+        webhook_url = COALESCE(r.webhook_url, r.metrics->>'webhook_url')
+"""
+
+BACKFILL = sa.text(_SET + "WHERE r.id >= :lo AND r.id < :hi AND r.metrics IS NOT NULL")
+
+# Rows still missing a resolvable ref, e.g. enqueued by old app instances
+# after the range pass went by; repeated until none are left.
+CATCH_UP = sa.text(
+    _SET
+    + """
+    WHERE r.id IN (
+        SELECT e.id FROM evaluation_runs e
+        WHERE (e.artifact_id IS NULL AND EXISTS (
+                  SELECT 1 FROM design_artifacts a
+                  WHERE a.id::text = e.metrics->>'artifact_id'))
+           OR (e.rulepack_id IS NULL AND EXISTS (
+                  SELECT 1 FROM rule_packs p
+                  WHERE p.id::text = e.metrics->>'rulepack_id'))
+           OR (e.webhook_url IS NULL AND e.metrics->>'webhook_url' IS NOT NULL)
+        ORDER BY e.id
+        LIMIT :batch
+    )
+    """
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Nullable columns without defaults: metadata-only changes
+    op.add_column(
+        "evaluation_runs", sa.Column("artifact_id", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "evaluation_runs", sa.Column("rulepack_id", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "evaluation_runs",
+        sa.Column("webhook_url", sa.String(length=2048), nullable=True),
+    )
+    # NOT VALID: enforced for new rows now, existing rows checked after backfill
+    for name, column, target in FOREIGN_KEYS:
+        op.execute(
+            f"ALTER TABLE evaluation_runs ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+            f"REFERENCES {target} (id) ON DELETE SET NULL NOT VALID"
+        )
+
+    lo, hi = bind.execute(sa.text("SELECT min(id), max(id) FROM evaluation_runs")).one()
+    if lo is not None:
+        for start in range(lo, hi + 1, BATCH_SIZE):
+            with op.get_context().autocommit_block():
+                bind.execute(BACKFILL, {"lo": start, "hi": start + BATCH_SIZE})
+    while True:
+        with op.get_context().autocommit_block():
+            updated = bind.execute(CATCH_UP, {"batch": BATCH_SIZE}).rowcount
+        if not updated:
+            break
+
+    with op.get_context().autocommit_block():
+        for name, _, _ in FOREIGN_KEYS:
+            op.execute(f"ALTER TABLE evaluation_runs VALIDATE CONSTRAINT {name}")
+        for name, cols in INDEXES:
+            # Leftover INVALID index from an interrupted concurrent build
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.create_index(name, "evaluation_runs", cols, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name="evaluation_runs", postgresql_concurrently=True
+            )
+    for name, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(name, "evaluation_runs", type_="foreignkey")
+    for column in ("webhook_url", "rulepack_id", "artifact_id"):
+        op.drop_column("evaluation_runs", column)
@@ -0,0 +1,100 @@
+"""rule_results table
+
+Narrow per-rule outcome rows for aggregate queries, backfilled from the
+``rules`` list of finished runs in id-range batches. Each row carries its
+run's org, project and finish time so analytics need no joins.
+
+Revision ID: 000016
+Revises: 000015
+Create Date: 2026-10-17 00:16:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "000016"
+down_revision = "000015"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10_000
+
+BACKFILL = sa.text(
+    """
+    INSERT INTO rule_results
+        (run_id, org_id, project_id, completed_at, rule_id, passed, severity)
+    SELECT r.id,
+           p.org_id,
+           p.id,
+           coalesce(r.completed_at, r.created_at),
+           left(e->>'id', 255),
+           coalesce((e->>'passed')::boolean, false),
+           left(e->>'severity', 32)
+    FROM evaluation_runs r
+    JOIN simulation_scenarios s ON s.id = r.scenario_id
+    JOIN projects p ON p.id = s.project_id
+    CROSS JOIN LATERAL json_array_elements(r.results_json->'rules') AS e
+    WHERE r.id >= :lo AND r.id < :hi
+      AND r.status = 'done'
+      AND json_typeof(r.results_json->'rules') = 'array'
+    """
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rule_results",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "run_id",
+            sa.Integer(),
+            sa.ForeignKey("evaluation_runs.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "org_id",
+            sa.Integer(),
+            sa.ForeignKey("orgs.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "project_id",
+            sa.Integer(),
+            sa.ForeignKey("projects.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("rule_id", sa.String(length=255), nullable=False),
+        sa.Column("passed", sa.Boolean(), nullable=False),
+        sa.Column("severity", sa.String(length=32), nullable=True),
+    )
+
+    bind = op.get_bind()
+    lo, hi = bind.execute(
+        sa.text("SELECT min(id), max(id) FROM evaluation_runs WHERE status = 'done'")
+    ).one()
+    if lo is not None:
+        for start in range(lo, hi + 1, BATCH_SIZE):
+            with op.get_context().autocommit_block():
+                bind.execute(BACKFILL, {"lo": start, "hi": start + BATCH_SIZE})
+
+    # Built after the bulk load; the table is new so no CONCURRENTLY needed
+    op.create_index("ix_rule_results_run_id", "rule_results", ["run_id"])
+    op.create_index(
+        "ix_rule_results_rule_id_passed", "rule_results", ["rule_id", "passed"]
+    )
+    op.create_index(
+        "ix_rule_results_org_id_completed_at_rule_id",
+        "rule_results",
+        ["org_id", "completed_at", "rule_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_rule_results_org_id_completed_at_rule_id", table_name="rule_results"
+    )
+    op.drop_index("ix_rule_results_rule_id_passed", table_name="rule_results")
+    op.drop_index("ix_rule_results_run_id", table_name="rule_results")
+    op.drop_table("rule_results")
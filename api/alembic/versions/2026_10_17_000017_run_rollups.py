@@ -0,0 +1,191 @@
+"""project/rulepack rollups and stored score delta
+
+Adds ``evaluation_runs.score_delta`` and the daily ``project_rollups`` and
+``rulepack_rollups`` tables (the latter per org of the runs' projects),
+backfilled from existing runs. Backfills
+commit per range of scenario/project/rulepack ids.
+
+Revision ID: 000017
+Revises: 000016
+Create Date: 2026-10-17 00:17:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "000017"
+down_revision = "000016"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1_000
+
+# Delta vs the previously finished run of the same scenario (by completed_at)
+DELTA_BACKFILL = sa.text(
+    """
+    UPDATE evaluation_runs r SET score_delta = d.delta
+    FROM (
+        SELECT id,
+               score - lag(score) OVER (
+                   PARTITION BY scenario_id ORDER BY completed_at NULLS FIRST, id
+               ) AS delta
+        FROM (
+            SELECT id, scenario_id, completed_at,
+                   (inclusivity_index_json->>'score')::float AS score
+            FROM evaluation_runs
+            WHERE status = 'done'
+              AND json_typeof(inclusivity_index_json->'score') = 'number'
+              AND scenario_id >= :lo AND scenario_id < :hi
+        ) s
+    ) d
+    WHERE r.id = d.id AND d.delta IS NOT NULL
+    """
+)
+
+# Mirrors app.rollups.update_rollups: day buckets in UTC, 101 score bins,
+# rules as {rule_id: [total, failed]}. Rows are grouped by (scope, org,
+# day); the org is that of the run's project (constant per project).
+ROLLUP_BACKFILL = """
+    WITH f AS (
+        SELECT {scope} AS scope_id,
+               p.org_id,
+               (coalesce(r.completed_at, r.created_at) AT TIME ZONE 'UTC')::date AS bucket,
+               r.status,
+               r.results_json,
+               CASE WHEN r.status = 'done'
+                         AND json_typeof(r.inclusivity_index_json->'score') = 'number'
+                    THEN (r.inclusivity_index_json->>'score')::float END AS score
+        FROM evaluation_runs r
+        JOIN simulation_scenarios s ON s.id = r.scenario_id
+        JOIN projects p ON p.id = s.project_id
+        WHERE r.status IN ('done', 'error') AND {scope} >= :lo AND {scope} < :hi
+    ),
+    base AS (
+        SELECT scope_id, org_id, bucket,
+               count(*) AS runs,
+               count(*) FILTER (WHERE status = 'error') AS errors,
+               count(score) AS score_count,
+               coalesce(sum(score), 0) AS score_sum
+        FROM f GROUP BY scope_id, org_id, bucket
+    ),
+    bins AS (
+        SELECT scope_id, org_id, bucket,
+               least(100, greatest(0, floor(score * 100 + 1e-9)))::int AS bin,
+               count(*) AS n
+        FROM f WHERE score IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    ),
+    hist AS (
+        SELECT b.scope_id, b.org_id, b.bucket,
+               json_agg(coalesce(c.n, 0) ORDER BY g) AS score_hist
+        FROM base b
+        CROSS JOIN generate_series(0, 100) AS g
+        LEFT JOIN bins c ON c.scope_id = b.scope_id AND c.org_id = b.org_id
+                        AND c.bucket = b.bucket AND c.bin = g
+        GROUP BY b.scope_id, b.org_id, b.bucket
+    ),
+    rules AS (
+        SELECT scope_id, org_id, bucket,
+               json_object_agg(rule_id, json_build_array(total, failed)) AS rules
+        FROM (
+            SELECT f.scope_id, f.org_id, f.bucket, e->>'id' AS rule_id,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE NOT coalesce((e->>'passed')::boolean, false)) AS failed
+            FROM f CROSS JOIN LATERAL json_array_elements(f.results_json->'rules') AS e
+            WHERE f.status = 'done'
+              AND json_typeof(f.results_json->'rules') = 'array'
+              AND e->>'id' IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        ) x
+        GROUP BY scope_id, org_id, bucket
+    )
+    INSERT INTO {table} ({columns}, bucket, runs, errors, score_count, score_sum, score_hist, rules)
+    SELECT {values}, b.bucket, b.runs, b.errors, b.score_count, b.score_sum,
+           h.score_hist, coalesce(r.rules, '{{}}'::json)
+    FROM base b
+    JOIN hist h ON h.scope_id = b.scope_id AND h.org_id = b.org_id AND h.bucket = b.bucket
+    LEFT JOIN rules r ON r.scope_id = b.scope_id AND r.org_id = b.org_id
+                     AND r.bucket = b.bucket
+"""
+
+ROLLUPS = [
+    # table, scope column, scope expression, referenced table, keyed by org too
+    ("project_rollups", "project_id", "s.project_id", "projects", False),
+    ("rulepack_rollups", "rulepack_id", "r.rulepack_id", "rule_packs", True),
+]
+
+
+def _batched(bind, statement, id_range_sql: str) -> None:
+    lo, hi = bind.execute(sa.text(id_range_sql)).one()
+    if lo is None:
+        return
+    for start in range(lo, hi + 1, BATCH_SIZE):
+        with op.get_context().autocommit_block():
+            bind.execute(statement, {"lo": start, "hi": start + BATCH_SIZE})
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.add_column(
+        "evaluation_runs", sa.Column("score_delta", sa.Float(), nullable=True)
+    )
+    for table, column, _, target, per_org in ROLLUPS:
+        scope = [column, "org_id"] if per_org else [column]
+        org_columns = (
+            [
+                sa.Column(
+                    "org_id",
+                    sa.Integer(),
+                    sa.ForeignKey("orgs.id", ondelete="CASCADE"),
+                    nullable=False,
+                )
+            ]
+            if per_org
+            else []
+        )
+        op.create_table(
+            table,
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column(
+                column,
+                sa.Integer(),
+                sa.ForeignKey(f"{target}.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            *org_columns,
+            sa.Column("bucket", sa.Date(), nullable=False),
+            sa.Column("runs", sa.Integer(), nullable=False),
+            sa.Column("errors", sa.Integer(), nullable=False),
+            sa.Column("score_count", sa.Integer(), nullable=False),
+            sa.Column("score_sum", sa.Float(), nullable=False),
+            sa.Column("score_hist", sa.JSON(), nullable=True),
+            sa.Column("rules", sa.JSON(), nullable=True),
+            sa.UniqueConstraint(
+                *scope,
+                "bucket",
+                name=f"uq_{table}_{'_'.join(c.split('_')[0] for c in scope)}_bucket",
+            ),
+        )
+
+    _batched(
+        bind,
+        DELTA_BACKFILL,
+        "SELECT min(scenario_id), max(scenario_id) FROM evaluation_runs",
+    )
+    for table, column, scope, target, per_org in ROLLUPS:
+        statement = sa.text(
+            ROLLUP_BACKFILL.format(
+                table=table,
+                scope=scope,
+                columns=f"{column}, org_id" if per_org else column,
+                values="b.scope_id, b.org_id" if per_org else "b.scope_id",
+            )
+        )
+        _batched(bind, statement, f"SELECT min(id), max(id) FROM {target}")
+
+
+def downgrade() -> None:
+    for table, *_ in reversed(ROLLUPS):
+        op.drop_table(table)
+    op.drop_column("evaluation_runs", "score_delta")
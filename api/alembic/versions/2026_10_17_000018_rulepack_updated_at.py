@@ -0,0 +1,34 @@
+"""rule pack updated_at
+
+Keys the compiled rulepack and evaluation result caches instead of hashing
+the rules JSON on every lookup.
+
+Revision ID: 000018
+Revises: 000017
+Create Date: 2026-10-17 00:18:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "000018"
+down_revision = "000017"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "rule_packs",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("rule_packs", "updated_at")
@@ -0,0 +1,187 @@
+"""Write-behind audit log.
+
+Requests only enqueue their ``AuditEvent`` rows; a background thread
+bulk-inserts them every ``AUDIT_FLUSH_INTERVAL_MS`` or as soon as
+``AUDIT_BATCH_SIZE`` events are waiting. The queue is bounded
+(``AUDIT_QUEUE_SIZE``): when the database falls behind, new events are
+dropped and counted instead of growing memory or blocking requests.
+Pending events are flushed on shutdown.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _FlushMarker:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        maxsize: int = 10_000,
+        batch_size: int = 200,
+        flush_interval: float = 0.25,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def start(self) -> None:
+        with self._lock:
+            # Restart in a forked child: threads do not survive fork
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="audit-writer", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, event: Dict[str, Any]) -> bool:
+        """Enqueue one event (column -> value); False if it was dropped."""
+        self.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Audit queue full; {self.dropped} events dropped")
+            return False
+        self.submitted += 1
+        return True
+
+    def write_now(self, events: List[Dict[str, Any]]) -> None:
+        """Insert synchronously (write-behind disabled)."""
+        self._write(events)
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until everything enqueued so far is written."""
+        if not (self._thread and self._thread.is_alive()):
+            return self._queue.empty()
+        marker = _FlushMarker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush pending events and stop the writer thread."""
+        thread = self._thread
+        if not (thread and thread.is_alive()):
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Audit queue full at shutdown; pending events lost")
+            return
+        thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: List[Dict[str, Any]] = []
+            markers: List[_FlushMarker] = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _FlushMarker):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or markers or len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if stop:
+                # Drain whatever is left before exiting
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, _FlushMarker):
+                        markers.append(item)
+                    elif item is not _STOP:
+                        batch.append(item)
+            if batch:
+                self._write(batch)
+            for m in markers:
+                m.done.set()
+            if stop:
+                return
+
+    def _write(self, events: List[Dict[str, Any]]) -> None:
+        try:
+            with self.session_factory() as db:
+                _resolve_users(db, events)
+                db.execute(insert(models.AuditEvent), events)
+                db.commit()
+            self.written += len(events)
+        except Exception as e:
+            # fail-open for audit log
+            self.failed += len(events)
+            logger.warning(f"Audit write of {len(events)} events failed: {e}")
+
+
+def _resolve_users(db, events: List[Dict[str, Any]]) -> None:
+    """Fill missing org ids with one query per batch, and drop references to
+    users that no longer exist (one bad FK would fail the whole insert)."""
+    user_ids = {e["user_id"] for e in events if e.get("user_id")}
+    if not user_ids:
+        return
+    orgs = dict(
+        db.query(models.User.id, models.User.org_id).filter(
+            models.User.id.in_(user_ids)
+        )
+    )
+    for e in events:
+        uid = e.get("user_id")
+        if not uid:
+            continue
+        if uid not in orgs:
+            e["user_id"] = None
+        elif e.get("org_id") is None:
+            e["org_id"] = orgs[uid]
@@ -6,6 +6,7 @@ from . import models
 from .db import SessionLocal
 from sqlalchemy import text
 from .security import hash_password
+from .storage import ensure_bucket_exists
 
 
 def create_default_superadmin() -> None:
@@ -82,3 +83,9 @@ def repair_sequences() -> None:
     except Exception:
         # Do not block startup if this fails
         pass
+
+
+def bootstrap_storage() -> None:
+    """Create the bucket and apply CORS at deploy time; API and worker
+    processes then only check it once each."""
+    ensure_bucket_exists(force=True)
@@ -2,6 +2,7 @@ import os
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
+from sqlalchemy.engine import make_url
 
 
 class Settings(BaseSettings):
@@ -14,6 +15,11 @@ class Settings(BaseSettings):
     postgres_port: int = Field(default=5432, alias="POSTGRES_PORT")
 
     database_url: str | None = Field(default=None, alias="DATABASE_URL")
+    # Async engine used by the read-heavy routes (defaults to DATABASE_URL
+    # with its driver swapped for asyncpg/aiosqlite)
+    async_database_url: str | None = Field(default=None, alias="ASYNC_DATABASE_URL")
+    db_async_pool_size: int = Field(default=20, alias="DB_ASYNC_POOL_SIZE")
+    db_async_max_overflow: int = Field(default=20, alias="DB_ASYNC_MAX_OVERFLOW")
 
     jwt_secret: str = Field(default="change-this-in-prod", alias="JWT_SECRET")
     jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
@@ -23,21 +29,53 @@ class Settings(BaseSettings):
 
     # S3 / MinIO
     s3_endpoint_url: str = Field(default="http://minio:9000", alias="S3_ENDPOINT_URL")
-    s3_public_endpoint_url: str | None = Field(default=None, alias="S3_PUBLIC_ENDPOINT_URL")
+    s3_public_endpoint_url: str | None = Field(
+        default=None, alias="S3_PUBLIC_ENDPOINT_URL"
+    )
     s3_region: str = Field(default="us-east-1", alias="S3_REGION")
     s3_access_key: str = Field(default="minioadmin", alias="S3_ACCESS_KEY")
     s3_secret_key: str = Field(default="minioadmin", alias="S3_SECRET_KEY")
     s3_bucket: str = Field(default="idp", alias="S3_BUCKET")
     s3_use_ssl: bool = Field(default=False, alias="S3_USE_SSL")
+    # Connections kept per S3 client (one shared client per process)
+    s3_max_pool_connections: int = Field(default=50, alias="S3_MAX_POOL_CONNECTIONS")
 
     download_url_expire_seconds: int = Field(
         default=3600, alias="DOWNLOAD_URL_EXPIRE_SECONDS"
     )
+    # Presigned GET URLs reused per process (0 disables)
+    presign_cache_size: int = Field(default=10_000, alias="PRESIGN_CACHE_SIZE")
     max_upload_mb: int = Field(default=50, alias="MAX_UPLOAD_MB")
     max_params_mb: int = Field(default=5, alias="MAX_PARAMS_MB")
-    s3_cors_allow_origin: str = Field(default="http://localhost:3000", alias="S3_CORS_ALLOW_ORIGIN")
+    # Uploads are streamed to S3 in parts of this size (S3 minimum is 5 MB)
+    s3_multipart_part_mb: int = Field(default=8, alias="S3_MULTIPART_PART_MB")
+    s3_cors_allow_origin: str = Field(
+        default="http://localhost:3000", alias="S3_CORS_ALLOW_ORIGIN"
+    )
     # Local JSON persistence for rulepacks/datasets
     data_dir: str = Field(default="data", alias="DATA_DIR")
+    # Pub/sub for evaluation progress events (SSE)
+    redis_url: str = Field(default="redis://redis:6379/0", alias="REDIS_URL")
+    # Pre-warmed WeasyPrint renderer subprocesses per process (0 = render inline).
+    # Each is a separate Python process with WeasyPrint and fonts loaded (on the
+    # order of 100 MB RSS), started in every Celery prefork child: memory grows
+    # with worker concurrency x pool size.
+    pdf_pool_size: int = Field(default=1, alias="PDF_POOL_SIZE")
+    pdf_pool_max_jobs: int = Field(default=50, alias="PDF_POOL_MAX_JOBS")
+    pdf_render_timeout: float = Field(default=60.0, alias="PDF_RENDER_TIMEOUT_SECONDS")
+    # Authenticated user (roles, org) cached per process; 0 disables
+    principal_cache_ttl: float = Field(
+        default=15.0, alias="PRINCIPAL_CACHE_TTL_SECONDS"
+    )
+    # Audit log: queued per process and bulk-inserted in the background
+    audit_write_behind: bool = Field(default=True, alias="AUDIT_WRITE_BEHIND")
+    audit_queue_size: int = Field(default=10_000, alias="AUDIT_QUEUE_SIZE")
+    audit_batch_size: int = Field(default=200, alias="AUDIT_BATCH_SIZE")
+    audit_flush_interval_ms: int = Field(default=250, alias="AUDIT_FLUSH_INTERVAL_MS")
+    # Larger or non-JSON request bodies are not read by the audit middleware
+    audit_max_body_bytes: int = Field(default=64 * 1024, alias="AUDIT_MAX_BODY_BYTES")
+    # Compiled rulepacks kept per process (LRU)
+    rulepack_cache_size: int = Field(default=64, alias="RULEPACK_CACHE_SIZE")
     bootstrap_superadmin_secret: str | None = Field(
         default=None, alias="BOOTSTRAP_SUPERADMIN_SECRET"
     )
@@ -55,5 +93,26 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def async_sql_url(self) -> str:
+        if self.async_database_url:
+            return self.async_database_url
+        url = make_url(self.sql_url)
+        backend = url.get_backend_name()
+        driver = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}.get(backend)
+        if driver:
+            url = url.set(drivername=f"{backend}+{driver}")
+        return url.render_as_string(hide_password=False)
+
+    @property
+    def async_pool_options(self) -> dict:
+        # SQLite pools take no size arguments
+        if make_url(self.async_sql_url).get_backend_name() == "sqlite":
+            return {}
+        return {
+            "pool_size": self.db_async_pool_size,
+            "max_overflow": self.db_async_max_overflow,
+        }
+
 
 settings = Settings()  # Load at import time
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from .config import settings
@@ -8,9 +9,19 @@ class Base(DeclarativeBase):
     pass
 
 
+# Sync engine: Celery tasks, writes and the remaining sync routes
 engine = create_engine(settings.sql_url, pool_pre_ping=True, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+# Async engine (asyncpg): hot read routes run on the event loop instead of
+# holding a threadpool thread for their whole DB round trip
+async_engine = create_async_engine(
+    settings.async_sql_url, pool_pre_ping=True, **settings.async_pool_options
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def get_db():
     db = SessionLocal()
@@ -18,3 +29,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
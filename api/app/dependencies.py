@@ -1,31 +1,87 @@
-import jwt
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from . import models
-from .config import settings
-from .db import get_db
+from .db import get_async_db, get_db
+from .principals import (
+    Principal,
+    decode_user_id,
+    load_principal,
+    load_principal_async,
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/auth/token", auto_error=False)
 
 
 def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> models.User:
-    try:
-        payload = jwt.decode(
-            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> Principal:
+    return _resolve_principal(request, token, db)
+
+
+async def get_current_user_async(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """``get_current_user`` for ``async def`` routes (no threadpool hop)."""
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    principal = await load_principal_async(db, _token_user_id(request, token))
+    return _set_principal(request, principal)
+
+
+def get_stream_user(
+    request: Request,
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    access_token: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """Like ``get_current_user`` but also accepts ``?access_token=``.
+
+    Browsers' ``EventSource`` cannot send an Authorization header.
+    """
+    if not (token or access_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        user_id = int(payload.get("sub"))
-    except Exception:
+    return _resolve_principal(request, token or access_token, db)
+
+
+def _resolve_principal(request: Request, token: str, db: Session) -> Principal:
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    principal = load_principal(db, _token_user_id(request, token))
+    return _set_principal(request, principal)
+
+
+def _token_user_id(request: Request, token: str) -> int:
+    # The audit middleware already decoded the bearer token of this request
+    if getattr(request.state, "token", None) == token:
+        user_id = request.state.user_id
+    else:
+        user_id = decode_user_id(token)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
+    return user_id
+
 
-    user = db.get(models.User, user_id)
-    if not user:
+def _set_principal(request: Request, principal: Optional[Principal]) -> Principal:
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
         )
-    return user
+    request.state.principal = principal
+    return principal
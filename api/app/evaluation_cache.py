@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Bump whenever simulation or rule semantics change so older results stop
+# being served from the cache.
+EVALUATOR_VERSION = "1"
+
+
+def canonical_hash(obj: Any) -> str:
+    canonical = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def artifact_fingerprint(artifact: Optional[models.DesignArtifact]) -> str:
+    if artifact is None:
+        return ""
+    if artifact.sha256:
+        return artifact.sha256
+    # Legacy/presigned uploads have no content hash; object keys are unique
+    # per upload, so they still identify the stored content.
+    return f"{artifact.id}:{artifact.object_key or ''}"
+
+
+def population_dataset_id(
+    scenario: Optional[models.SimulationScenario],
+) -> Optional[int]:
+    pop = ((scenario.config or {}) if scenario else {}).get("population")
+    if not isinstance(pop, dict) or not pop.get("dataset_id"):
+        return None
+    try:
+        return int(pop["dataset_id"])
+    except (TypeError, ValueError):
+        return None
+
+
+def dataset_versions(
+    db: Session, scenarios: Iterable[Optional[models.SimulationScenario]]
+) -> Dict[int, Any]:
+    """``updated_at`` of the population datasets the scenarios reference."""
+    ids = {i for i in map(population_dataset_id, scenarios) if i is not None}
+    if not ids:
+        return {}
+    dataset = models.AnthropometricDataset
+    return dict(db.query(dataset.id, dataset.updated_at).filter(dataset.id.in_(ids)))
+
+
+def evaluation_cache_key(
+    scenario: Optional[models.SimulationScenario],
+    rulepack: Optional[models.RulePack],
+    artifact: Optional[models.DesignArtifact],
+    datasets: Optional[Dict[int, Any]] = None,
+) -> str:
+    """Content address of an evaluation: same inputs, same results.
+
+    ``datasets`` maps dataset ids to ``updated_at`` (see ``dataset_versions``)
+    so editing a scenario's population dataset changes the key; the rulepack
+    is likewise pinned by id, version and ``updated_at``.
+    """
+    dataset_id = population_dataset_id(scenario)
+    parts = {
+        "evaluator": EVALUATOR_VERSION,
+        "artifact": artifact_fingerprint(artifact),
+        "scenario": canonical_hash((scenario.config or {}) if scenario else {}),
+        "rulepack": (
+            [rulepack.id, rulepack.version, rulepack.updated_at] if rulepack else None
+        ),
+        "dataset": (
+            [dataset_id, (datasets or {}).get(dataset_id)] if dataset_id else None
+        ),
+    }
+    return canonical_hash(parts)
+
+
+def is_cacheable(run: models.EvaluationRun) -> bool:
+    """Debug and ``no_cache`` runs neither use nor seed the result cache."""
+    metrics = run.metrics or {}
+    return not (metrics.get("debug") or metrics.get("no_cache"))
+
+
+def find_cached_run(
+    db: Session,
+    cache_key: str,
+    project_id: Optional[int],
+    exclude_id: Optional[int] = None,
+) -> Optional[models.EvaluationRun]:
+    """Latest done run with ``cache_key`` in the org owning ``project_id``.
+
+    Results are never shared across orgs: they may embed org-private data
+    (population percentiles) and ``cached_from`` names the source run.
+    """
+    org_id = (
+        select(models.Project.org_id)
+        .where(models.Project.id == project_id)
+        .scalar_subquery()
+    )
+    q = (
+        db.query(models.EvaluationRun)
+        .join(
+            models.SimulationScenario,
+            models.SimulationScenario.id == models.EvaluationRun.scenario_id,
+        )
+        .join(models.Project, models.Project.id == models.SimulationScenario.project_id)
+        .filter(
+            models.EvaluationRun.cache_key == cache_key,
+            models.EvaluationRun.status == "done",
+            models.Project.org_id == org_id,
+        )
+    )
+    if exclude_id is not None:
+        q = q.filter(models.EvaluationRun.id != exclude_id)
+    return q.order_by(models.EvaluationRun.id.desc()).first()
+
+
+def copy_cached_results(
+    run: models.EvaluationRun, source: models.EvaluationRun
+) -> None:
+    """Mark ``run`` done with a copy of ``source``'s results."""
+    run.cache_key = source.cache_key
+    run.results_json = copy.deepcopy(source.results_json)
+    # Never hand another run's debug details (config, ids, rule inputs) on
+    if isinstance(run.results_json, dict):
+        run.results_json.pop("debug", None)
+    run.inclusivity_index_json = copy.deepcopy(source.inclusivity_index_json)
+    run.metrics = {**(run.metrics or {}), "cached_from": source.id}
+    run.status = "done"
+    run.completed_at = datetime.now(timezone.utc)
@@ -0,0 +1,108 @@
+"""Evaluation progress events over Redis pub/sub.
+
+Workers publish status transitions and debug log lines to a per-run channel;
+the API relays them to clients as Server-Sent Events so CLIs and the web UI
+do not have to poll ``GET /api/v1/evaluations/{id}``. API processes also
+use ``broadcast``/``listen`` to share principal cache invalidations.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = frozenset({"done", "error", "failed"})
+# After a failed publish, skip Redis for this long instead of retrying per line
+PUBLISH_BACKOFF_SECONDS = 30.0
+
+_client: Optional[redis.Redis] = None
+_client_lock = threading.Lock()
+_disabled_until = 0.0
+
+
+def channel(run_id: int) -> str:
+    return f"idp:evaluations:{run_id}"
+
+
+def _get_client() -> redis.Redis:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = redis.Redis.from_url(
+                    settings.redis_url, socket_connect_timeout=1, socket_timeout=2
+                )
+    return _client
+
+
+def broadcast(name: str, message: Dict[str, Any], backoff: bool = True) -> None:
+    """Best-effort publish of ``message`` on channel ``name``.
+
+    Events must never fail the operation that emits them. After a failure,
+    publishes with ``backoff`` (progress events) are skipped for
+    ``PUBLISH_BACKOFF_SECONDS``; without it (cache invalidations) every
+    message is attempted and each one lost is logged.
+    """
+    global _disabled_until
+    if backoff and time.monotonic() < _disabled_until:
+        return
+    try:
+        _get_client().publish(name, json.dumps(message, default=str))
+    except Exception as exc:
+        if backoff:
+            _disabled_until = time.monotonic() + PUBLISH_BACKOFF_SECONDS
+            logger.warning(f"Event publish failed on {name}: {exc}")
+        else:
+            logger.warning(f"Dropped message on {name}: {message} ({exc})")
+
+
+def publish(run_id: int, event: str, data: Dict[str, Any]) -> None:
+    broadcast(channel(run_id), {"event": event, "data": data})
+
+
+def publish_status(run: Any) -> None:
+    publish(run.id, "status", {"id": run.id, "status": run.status})
+
+
+def subscribe(
+    run_id: int, poll_seconds: float = 1.0
+) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """Events for ``run_id``; see ``listen``."""
+    return listen(channel(run_id), poll_seconds)
+
+
+async def listen(
+    name: str, poll_seconds: float = 1.0
+) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """Yield messages on channel ``name``; yields ``None`` when idle for ``poll_seconds``.
+
+    The idle ticks let the caller send keep-alives and notice disconnects.
+    """
+    client = aioredis.Redis.from_url(settings.redis_url)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(name)
+        while True:
+            msg = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=poll_seconds
+            )
+            if msg is None:
+                yield None
+                continue
+            try:
+                yield json.loads(msg["data"])
+            except (TypeError, ValueError):
+                continue
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
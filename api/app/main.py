@@ -1,8 +1,13 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .middleware import audit_middleware
+from .db import async_engine
+from .middleware import AccessLogRedactor, audit_middleware, audit_writer
 from .routers import (
+    analytics,
     artifacts,
     admin,
     auth,
@@ -20,6 +25,7 @@ from .routers import (
     files,
 )
 from .persistence import load_all_from_json
+from .principals import listen_for_invalidations
 
 app = FastAPI(title="IDP API")
 
@@ -30,9 +36,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor of the next page on list endpoints
+    expose_headers=["X-Next-Cursor", "Link"],
 )
 
 app.middleware("http")(audit_middleware)
+# Event streams authenticate with ?access_token=; keep tokens out of access logs
+logging.getLogger("uvicorn.access").addFilter(AccessLogRedactor())
 
 
 @app.on_event("startup")
@@ -43,6 +53,32 @@ def _load_json_seed() -> None:
         # do not block startup on file load
         pass
 
+
+@app.on_event("startup")
+def _start_audit_writer() -> None:
+    audit_writer.start()
+
+
+@app.on_event("startup")
+async def _start_principal_listener() -> None:
+    app.state.principal_listener = asyncio.create_task(listen_for_invalidations())
+
+
+@app.on_event("shutdown")
+async def _stop_principal_listener() -> None:
+    app.state.principal_listener.cancel()
+
+
+@app.on_event("shutdown")
+def _flush_audit_log() -> None:
+    audit_writer.close()
+
+
+@app.on_event("shutdown")
+async def _close_async_engine() -> None:
+    await async_engine.dispose()
+
+
 app.include_router(health.router)
 app.include_router(auth.router)
 app.include_router(organizations.router)
@@ -59,3 +95,4 @@ app.include_router(users.router)
 app.include_router(admin.router)
 app.include_router(conversion.router)
 app.include_router(files.router)
+app.include_router(analytics.router)
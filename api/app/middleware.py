@@ -1,50 +1,116 @@
 from __future__ import annotations
 
 import json
+import logging
 from datetime import datetime, timezone
-from typing import Callable
+from typing import Any, Callable, Optional
+from urllib.parse import unquote_plus
 
-import jwt
 from fastapi import Request
 
-from . import models
+from .audit import AuditWriter
 from .config import settings
 from .db import SessionLocal
+from .principals import decode_user_id, principal_cache
+
+# Sessions are looked up at write time so tests can swap SessionLocal
+audit_writer = AuditWriter(
+    lambda: SessionLocal(),
+    maxsize=settings.audit_queue_size,
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval_ms / 1000,
+)
+
+BODY_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+REDACTED_KEYS = frozenset({"password", "secret"})
+# Bearer tokens passed in the URL (EventSource cannot send headers)
+REDACTED_QUERY_PARAMS = frozenset({"access_token"})
+
+
+def _is_json(content_type: str) -> bool:
+    media = content_type.split(";")[0].strip().lower()
+    return media == "application/json" or media.endswith("+json")
+
+
+def _content_length(request: Request) -> Optional[int]:
+    try:
+        return int(request.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            k: "***" if k in REDACTED_KEYS else _redact(v) for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(v) for v in value]
+    return value
+
+
+def redact_query(url: str) -> str:
+    """``url`` with the values of secret query parameters replaced by ``***``."""
+    path, sep, query = url.partition("?")
+    if not sep:
+        return url
+    pairs = []
+    for pair in query.split("&"):
+        name = pair.split("=", 1)[0]
+        pairs.append(
+            f"{name}=***" if unquote_plus(name) in REDACTED_QUERY_PARAMS else pair
+        )
+    return f"{path}?{'&'.join(pairs)}"
+
+
+class AccessLogRedactor(logging.Filter):
+    """Redacts secret query parameters from uvicorn access log lines.
+
+    uvicorn logs ``(client, method, path_with_query, http_version, status)``.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        args = record.args
+        if isinstance(args, tuple) and len(args) >= 3 and isinstance(args[2], str):
+            record.args = (*args[:2], redact_query(args[2]), *args[3:])
+        return True
 
 
 async def audit_middleware(request: Request, call_next: Callable):
     user_id = None
     org_id = None
-    # Try extract user from Authorization header
+    # Try extract user from Authorization header; decoded once per request,
+    # get_current_user reuses it from request.state
     auth = request.headers.get("authorization") or request.headers.get("Authorization")
     if auth and auth.lower().startswith("bearer "):
         token = auth.split(" ", 1)[1]
-        try:
-            payload = jwt.decode(
-                token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
-            )
-            user_id = int(payload.get("sub"))
-        except Exception:
-            user_id = None
-    body_bytes = b""
-    try:
-        body_bytes = await request.body()
-
-        # re-inject body so downstream can read it
-        async def _receive():  # type: ignore
-            return {"type": "http.request", "body": body_bytes, "more_body": False}
-
-        request._receive = _receive  # type: ignore[attr-defined]
-    except Exception:
-        pass
-    # sanitize
+        user_id = decode_user_id(token)
+        request.state.token = token
+        request.state.user_id = user_id
+    # Only small JSON bodies are snapshotted; uploads and other streams are
+    # passed through without being read here
     before = None
-    try:
-        before = json.loads(body_bytes.decode("utf-8")) if body_bytes else None
-        if isinstance(before, dict) and "password" in before:
-            before["password"] = "***"
-    except Exception:
-        before = None
+    body_info = None
+    content_type = request.headers.get("content-type", "")
+    length = _content_length(request)
+    if request.method in BODY_METHODS and (length or content_type):
+        small = length is not None and length <= settings.audit_max_body_bytes
+        if _is_json(content_type) and small:
+            try:
+                # The cached body is replayed downstream by Starlette; replacing
+                # request._receive would also swallow http.disconnect, which
+                # streaming responses (SSE) rely on.
+                body_bytes = await request.body()
+                if body_bytes:
+                    before = _redact(json.loads(body_bytes.decode("utf-8")))
+            except Exception:
+                before = None
+        else:
+            # Record what was sent, not the payload itself
+            body_info = {
+                "content_type": content_type.split(";")[0].strip() or None,
+                "content_length": length,
+            }
 
     response = await call_next(request)
 
@@ -56,24 +122,25 @@ async def audit_middleware(request: Request, call_next: Callable):
     except Exception:
         after = None
 
-    # persist audit event
-    try:
-        with SessionLocal() as db:
-            if user_id:
-                u = db.get(models.User, user_id)
-                if u:
-                    org_id = u.org_id
-            evt = models.AuditEvent(
-                org_id=org_id,
-                user_id=user_id,
-                action=f"{request.method} {request.url.path}",
-                details={"before": before, "after": after},
-                created_at=datetime.now(timezone.utc),
-            )
-            db.add(evt)
-            db.commit()
-    except Exception:
-        # fail-open for audit log
-        pass
+    # queue audit event (written in batches by the audit writer)
+    principal = getattr(request.state, "principal", None)
+    if principal is None and user_id:
+        principal = principal_cache.get(user_id)
+    if principal is not None:
+        org_id = principal.org_id
+    details = {"before": before, "after": after}
+    if body_info is not None:
+        details["body"] = body_info
+    event = {
+        "org_id": org_id,
+        "user_id": user_id,
+        "action": f"{request.method} {request.url.path}",
+        "details": details,
+        "created_at": datetime.now(timezone.utc),
+    }
+    if settings.audit_write_behind:
+        audit_writer.submit(event)
+    else:
+        audit_writer.write_now([event])
 
     return response
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 
 from sqlalchemy import (
     JSON,
+    Boolean,
+    Date,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -30,7 +34,10 @@ class Org(Base):
 
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = (UniqueConstraint("email", name="uq_users_email"),)
+    __table_args__ = (
+        UniqueConstraint("email", name="uq_users_email"),
+        Index("ix_users_org_id_id", "org_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -46,6 +53,11 @@ class User(Base):
 
 class Project(Base):
     __tablename__ = "projects"
+    # (scope, sort key) indexes back the keyset-paginated list endpoints
+    __table_args__ = (
+        Index("ix_projects_org_id_id", "org_id", "id"),
+        Index("ix_projects_org_id_name", "org_id", "name"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     org_id: Mapped[int] = mapped_column(ForeignKey("orgs.id"), nullable=False)
@@ -84,6 +96,10 @@ class ProjectMembership(Base):
 
 class DesignArtifact(Base):
     __tablename__ = "design_artifacts"
+    __table_args__ = (
+        Index("ix_design_artifacts_project_id_id", "project_id", "id"),
+        Index("ix_design_artifacts_project_id_name", "project_id", "name"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
@@ -95,6 +111,7 @@ class DesignArtifact(Base):
     params_key: Mapped[str | None] = mapped_column(String(1024), nullable=True)
     object_mime: Mapped[str | None] = mapped_column(String(255), nullable=True)
     size_bytes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow
     )
@@ -102,6 +119,7 @@ class DesignArtifact(Base):
 
 class AnthropometricDataset(Base):
     __tablename__ = "anthropometric_datasets"
+    __table_args__ = (Index("ix_anthropometric_datasets_org_id_id", "org_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     org_id: Mapped[int] = mapped_column(ForeignKey("orgs.id"), nullable=False)
@@ -112,10 +130,18 @@ class AnthropometricDataset(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow
     )
+    # Bumped on every update; keys the in-process percentile index cache
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
 
 
 class AbilityProfile(Base):
     __tablename__ = "ability_profiles"
+    __table_args__ = (Index("ix_ability_profiles_org_id_id", "org_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     org_id: Mapped[int] = mapped_column(ForeignKey("orgs.id"), nullable=False)
@@ -128,6 +154,10 @@ class AbilityProfile(Base):
 
 class RulePack(Base):
     __tablename__ = "rule_packs"
+    __table_args__ = (
+        Index("ix_rule_packs_org_id_id", "org_id", "id"),
+        Index("ix_rule_packs_org_id_name", "org_id", "name"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     org_id: Mapped[int] = mapped_column(ForeignKey("orgs.id"), nullable=False)
@@ -137,10 +167,20 @@ class RulePack(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow
     )
+    # Bumped on every update; keys the compiled rulepack and result caches
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
 
 
 class SimulationScenario(Base):
     __tablename__ = "simulation_scenarios"
+    __table_args__ = (
+        Index("ix_simulation_scenarios_project_id_id", "project_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
@@ -153,11 +193,25 @@ class SimulationScenario(Base):
 
 class EvaluationRun(Base):
     __tablename__ = "evaluation_runs"
+    __table_args__ = (
+        Index("ix_evaluation_runs_scenario_id_id", "scenario_id", "id"),
+        Index("ix_evaluation_runs_artifact_id_id", "artifact_id", "id"),
+        Index("ix_evaluation_runs_rulepack_id_id", "rulepack_id", "id"),
+        Index("ix_evaluation_runs_status_created_at", "status", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     scenario_id: Mapped[int] = mapped_column(
         ForeignKey("simulation_scenarios.id"), nullable=False
     )
+    # Inputs of the run (also echoed in ``metrics`` for API compatibility)
+    artifact_id: Mapped[int | None] = mapped_column(
+        ForeignKey("design_artifacts.id", ondelete="SET NULL"), nullable=True
+    )
+    rulepack_id: Mapped[int | None] = mapped_column(
+        ForeignKey("rule_packs.id", ondelete="SET NULL"), nullable=True
+    )
+    webhook_url: Mapped[str | None] = mapped_column(String(2048), nullable=True)
     status: Mapped[str] = mapped_column(String(50), nullable=False, default="pending")
     metrics: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
@@ -168,6 +222,103 @@ class EvaluationRun(Base):
     )
     results_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     inclusivity_index_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Content address of (artifact, scenario config, rulepack); see evaluation_cache
+    cache_key: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    # Score change vs the previous finished run of the scenario, set on finish
+    score_delta: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    def input_ref(self, name: str):
+        """``artifact_id``, ``rulepack_id`` or ``webhook_url`` of the run.
+
+        Falls back to the ``metrics`` copy for runs written by pre-000015 code
+        during a rolling deploy; drop the fallback after the next release.
+        """
+        value = getattr(self, name)
+        if value is None and self.metrics:
+            value = self.metrics.get(name)
+        return value
+
+
+class RuleResult(Base):
+    """One rule outcome of a finished run, for aggregate queries."""
+
+    __tablename__ = "rule_results"
+    __table_args__ = (
+        Index("ix_rule_results_rule_id_passed", "rule_id", "passed"),
+        Index(
+            "ix_rule_results_org_id_completed_at_rule_id",
+            "org_id",
+            "completed_at",
+            "rule_id",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    run_id: Mapped[int] = mapped_column(
+        ForeignKey("evaluation_runs.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    # Copied from the run's project and finish time, for join-free analytics
+    org_id: Mapped[int] = mapped_column(
+        ForeignKey("orgs.id", ondelete="CASCADE"), nullable=False
+    )
+    project_id: Mapped[int] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"), nullable=False
+    )
+    completed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    rule_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    passed: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    severity: Mapped[str | None] = mapped_column(String(32), nullable=True)
+
+
+class _RollupColumns:
+    """Daily aggregates of finished runs, updated as each run finishes."""
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket: Mapped[date] = mapped_column(Date, nullable=False)
+    runs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    errors: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    # Counts of inclusivity scores in 0.01-wide bins (101 entries)
+    score_hist: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    # {rule_id: [total, failed]}
+    rules: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+
+class ProjectRollup(_RollupColumns, Base):
+    __tablename__ = "project_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "project_id", "bucket", name="uq_project_rollups_project_bucket"
+        ),
+    )
+
+    project_id: Mapped[int] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"), nullable=False
+    )
+
+
+class RulePackRollup(_RollupColumns, Base):
+    """Per org (of the run's project), so shared packs never mix tenants."""
+
+    __tablename__ = "rulepack_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "rulepack_id",
+            "org_id",
+            "bucket",
+            name="uq_rulepack_rollups_rulepack_org_bucket",
+        ),
+    )
+
+    rulepack_id: Mapped[int] = mapped_column(
+        ForeignKey("rule_packs.id", ondelete="CASCADE"), nullable=False
+    )
+    org_id: Mapped[int] = mapped_column(
+        ForeignKey("orgs.id", ondelete="CASCADE"), nullable=False
+    )
 
 
 class AdaptiveComponent(Base):
@@ -184,6 +335,7 @@ class AdaptiveComponent(Base):
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (Index("ix_reports_project_id_id", "project_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
@@ -192,6 +344,14 @@ class Report(Base):
     html_key: Mapped[str | None] = mapped_column(String(1024), nullable=True)
     pdf_key: Mapped[str | None] = mapped_column(String(1024), nullable=True)
     checksum_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Built asynchronously: queued -> building -> done | error
+    evaluation_id: Mapped[int | None] = mapped_column(
+        ForeignKey("evaluation_runs.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default="done")
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Content address of the rendered inputs (template, results, metadata)
+    cache_key: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow
     )
@@ -0,0 +1,144 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+List endpoints keep returning a JSON array; the cursor for the next page is
+sent in the ``X-Next-Cursor`` header (and as a ``Link: <...>; rel="next"``
+header) and passed back as ``?after=``. Pages are ordered by the requested
+sort column with ``id`` as tie-breaker, so a page is one index range scan
+regardless of how deep into the list it is.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, Query, Request, Response
+from sqlalchemy import DateTime, and_, or_
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+
+@dataclass(frozen=True)
+class PageParams:
+    limit: int
+    after: Optional[str]
+    sort: Optional[str]
+
+
+def page_params(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    sort: Optional[str] = Query(None, description="Field, '-' prefix for descending"),
+) -> PageParams:
+    return PageParams(limit=limit, after=after, sort=sort)
+
+
+def _encode(sort: str, value: Any, id_: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, id_], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str, sort: str, column) -> tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cur_sort, value, id_ = json.loads(raw)
+        if cur_sort != sort:
+            raise ValueError("cursor was issued for another sort order")
+        if isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        return value, int(id_)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    query,
+    params: PageParams,
+    id_column,
+    sorts: Dict[str, Any],
+    request: Request,
+    response: Response,
+    default_sort: str = "-id",
+) -> List[Any]:
+    """Apply sort, cursor and limit to ``query`` and return one page of rows.
+
+    ``sorts`` maps the public field names to non-nullable columns.
+    """
+    query, sort, column = _page_query(query, params, id_column, sorts, default_sort)
+    rows = query.all()
+    return _finish_page(rows, params, sort, column, id_column, request, response)
+
+
+async def paginate_async(
+    db,
+    stmt,
+    params: PageParams,
+    id_column,
+    sorts: Dict[str, Any],
+    request: Request,
+    response: Response,
+    default_sort: str = "-id",
+) -> List[Any]:
+    """``paginate`` for a ``select()`` of one entity on an ``AsyncSession``."""
+    stmt, sort, column = _page_query(stmt, params, id_column, sorts, default_sort)
+    rows = list((await db.scalars(stmt)).all())
+    return _finish_page(rows, params, sort, column, id_column, request, response)
+
+
+def _page_query(query, params: PageParams, id_column, sorts, default_sort: str):
+    sort = params.sort or default_sort
+    field = sort.lstrip("-")
+    desc = sort.startswith("-")
+    column = id_column if field == "id" else sorts.get(field)
+    if column is None:
+        allowed = ", ".join(sorted({"id", *sorts}))
+        raise HTTPException(
+            status_code=400, detail=f"Invalid sort (allowed: {allowed})"
+        )
+
+    if params.after:
+        value, last_id = _decode(params.after, sort, column)
+        if column is id_column:
+            cond = id_column < last_id if desc else id_column > last_id
+        elif desc:
+            cond = or_(column < value, and_(column == value, id_column < last_id))
+        else:
+            cond = or_(column > value, and_(column == value, id_column > last_id))
+        query = query.filter(cond)
+
+    if column is id_column:
+        order = [id_column.desc() if desc else id_column.asc()]
+    else:
+        order = (
+            [column.desc(), id_column.desc()]
+            if desc
+            else [column.asc(), id_column.asc()]
+        )
+    return query.order_by(*order).limit(params.limit + 1), sort, column
+
+
+def _finish_page(
+    rows, params: PageParams, sort: str, column, id_column, request, response
+):
+    if len(rows) > params.limit:
+        rows = rows[: params.limit]
+        last = rows[-1]
+        cursor = _encode(sort, getattr(last, column.key), getattr(last, id_column.key))
+        response.headers["X-Next-Cursor"] = cursor
+        next_url = request.url.include_query_params(after=cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return rows
+
+
+def name_filter(column, q: Optional[str]):
+    """Case-insensitive substring match for ``?q=``."""
+    pattern = (
+        "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    )
+    return column.ilike(pattern, escape="\\")
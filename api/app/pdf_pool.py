@@ -0,0 +1,269 @@
+"""Pool of pre-warmed PDF renderer processes.
+
+WeasyPrint's first render in a process pays for imports, font discovery and
+CSS parsing; repeated renders also grow the process' memory. Renderers run
+as plain subprocesses (``python -m app.pdf_pool``), which also works from
+daemonic Celery prefork children, and exchange length-prefixed frames over
+stdin/stdout:
+
+- request: ``<8-byte length><html utf-8>``
+- response: ``<8-byte length><status byte><payload>``; status ``R`` (ready,
+  sent once after warm-up), ``O`` (PDF bytes) or ``E`` (error message).
+
+The pool bounds concurrency to its size, kills a renderer that exceeds the
+per-job timeout and recycles each renderer after ``max_jobs`` renders.
+"""
+
+from __future__ import annotations
+
+import atexit
+import importlib
+import logging
+import os
+import queue
+import select
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FACTORY = "app.pdf_pool:weasyprint_renderer"
+STARTUP_TIMEOUT_SECONDS = 60.0
+
+_LEN = struct.Struct(">Q")
+_API_ROOT = Path(__file__).resolve().parent.parent
+
+
+class RendererError(RuntimeError):
+    pass
+
+
+class RendererTimeout(RendererError, TimeoutError):
+    pass
+
+
+def weasyprint_renderer() -> Callable[[str], bytes]:
+    """Load WeasyPrint, parse the report CSS and render once to load fonts."""
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    from .reporting import BASE_CSS
+
+    fonts = FontConfiguration()
+    CSS(string=BASE_CSS, font_config=fonts)
+    HTML(
+        string=(
+            f"<html><head><style>{BASE_CSS}</style></head><body>"
+            "<div class='header'><div class='title'>warm-up</div></div>"
+            "<table class='table'><tr><th>a</th><td>b ✓ ✗</td></tr></table>"
+            "</body></html>"
+        )
+    ).write_pdf(font_config=fonts)
+
+    def render(html: str) -> bytes:
+        return HTML(string=html).write_pdf(font_config=fonts)
+
+    return render
+
+
+def _load_factory(path: str) -> Callable[[], Callable[[str], bytes]]:
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def _write_frame(stream, payload: bytes) -> None:
+    stream.write(_LEN.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def _read_exact(fd: int, n: int, deadline: float) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RendererTimeout("PDF render timed out")
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            continue
+        chunk = os.read(fd, min(n - len(buf), 1 << 20))
+        if not chunk:
+            raise RendererError("PDF renderer exited unexpectedly")
+        buf += chunk
+    return bytes(buf)
+
+
+class _Renderer:
+    """One renderer subprocess; not thread-safe (the pool hands it out)."""
+
+    def __init__(self, factory: str):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            p for p in (str(_API_ROOT), env.get("PYTHONPATH")) if p
+        )
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "app.pdf_pool", factory],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+        )
+        self.jobs = 0
+        self.ready = False
+
+    def _read_frame(self, deadline: float) -> bytes:
+        fd = self.proc.stdout.fileno()
+        (n,) = _LEN.unpack(_read_exact(fd, _LEN.size, deadline))
+        return _read_exact(fd, n, deadline)
+
+    def _wait_ready(self) -> None:
+        frame = self._read_frame(time.monotonic() + STARTUP_TIMEOUT_SECONDS)
+        if frame[:1] != b"R":
+            raise RendererError(frame[1:].decode("utf-8", "replace"))
+        self.ready = True
+
+    def render(self, html: str, timeout: float) -> bytes:
+        if not self.ready:
+            self._wait_ready()
+        _write_frame(self.proc.stdin, html.encode("utf-8"))
+        frame = self._read_frame(time.monotonic() + timeout)
+        self.jobs += 1
+        if frame[:1] == b"O":
+            return frame[1:]
+        raise RendererError(frame[1:].decode("utf-8", "replace"))
+
+    def stop(self, kill: bool = False) -> None:
+        try:
+            if kill:
+                self.proc.kill()
+            else:
+                self.proc.stdin.close()  # EOF: renderer exits its loop
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+        finally:
+            if self.proc.stdout:
+                self.proc.stdout.close()
+
+
+class RendererPool:
+    def __init__(
+        self,
+        size: int,
+        max_jobs: int = 50,
+        timeout: float = 60.0,
+        factory: str = DEFAULT_FACTORY,
+    ):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.factory = factory
+        self._closed = False
+        # Idle renderers; callers beyond ``size`` wait here (bounded concurrency)
+        self._idle: "queue.Queue[_Renderer]" = queue.Queue()
+        for _ in range(size):
+            self._idle.put(_Renderer(factory))
+
+    def render(self, html: str, timeout: Optional[float] = None) -> bytes:
+        if self._closed:
+            raise RendererError("Renderer pool is closed")
+        timeout = self.timeout if timeout is None else timeout
+        # Waiting for a free renderer counts against the job's timeout
+        deadline = time.monotonic() + timeout
+        try:
+            renderer = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise RendererTimeout("No PDF renderer available") from None
+        replace = False
+        try:
+            return renderer.render(html, max(deadline - time.monotonic(), 0.001))
+        except RendererTimeout:
+            replace = True
+            logger.warning("PDF render timed out; restarting renderer")
+            raise
+        except RendererError:
+            # Render errors are reported by a healthy renderer; a dead one
+            # must be replaced
+            replace = not renderer.ready or renderer.proc.poll() is not None
+            raise
+        except BaseException:
+            replace = True
+            raise
+        finally:
+            if replace or renderer.jobs >= self.max_jobs:
+                renderer.stop(kill=replace)
+                renderer = _Renderer(self.factory)
+            if self._closed:
+                renderer.stop()
+            else:
+                self._idle.put(renderer)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+
+_pool: Optional[RendererPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_renderer_pool() -> RendererPool:
+    """Process-wide pool, started on first use (or by the worker at boot)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = RendererPool(
+                    size=settings.pdf_pool_size,
+                    max_jobs=settings.pdf_pool_max_jobs,
+                    timeout=settings.pdf_render_timeout,
+                )
+                atexit.register(_pool.close)
+    return _pool
+
+
+def shutdown_renderer_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def _serve(factory: str) -> None:
+    # Keep the protocol stream private: stray prints from libraries go to stderr
+    out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    inp = sys.stdin.buffer
+    try:
+        render = _load_factory(factory)()
+    except Exception as exc:
+        _write_frame(out, b"E" + f"Renderer failed to start: {exc!r}".encode())
+        return
+    _write_frame(out, b"R")
+    while True:
+        header = inp.read(_LEN.size)
+        if len(header) < _LEN.size:
+            return
+        (n,) = _LEN.unpack(header)
+        html = inp.read(n).decode("utf-8")
+        try:
+            frame = b"O" + render(html)
+        except Exception as exc:
+            frame = b"E" + repr(exc).encode()
+        _write_frame(out, frame)
+
+
+if __name__ == "__main__":
+    _serve(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FACTORY)
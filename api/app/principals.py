@@ -0,0 +1,157 @@
+"""Authenticated principal resolution.
+
+The JWT is decoded once per request (by the audit middleware, or by the
+dependency when the middleware did not see a bearer header) and the resolved
+``Principal`` is stored on ``request.state``. User rows are cached per
+process for ``PRINCIPAL_CACHE_TTL_SECONDS``; role and membership changes
+made through the API invalidate the entry locally and are broadcast over
+Redis to the other API processes. If Redis is unavailable, other processes
+pick the change up when their entry expires.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import jwt
+
+from . import events, models
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "idp:principals:invalidate"
+# Wait before re-subscribing after the Redis connection is lost
+RESUBSCRIBE_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    org_id: Optional[int]
+    roles: Tuple[str, ...]
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            org_id=user.org_id,
+            roles=tuple(user.roles or ()),
+        )
+
+
+class PrincipalCache:
+    """Thread-safe TTL map of user id -> Principal."""
+
+    def __init__(self, ttl: float, maxsize: int = 10_000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[float, Principal]] = {}
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[user_id]
+                return None
+            return entry[1]
+
+    def put(self, principal: Principal) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] >= now}
+                if len(self._entries) >= self.maxsize:
+                    self._entries.clear()
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(ttl=settings.principal_cache_ttl)
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate(user_id)
+    # Never muted by the progress-event back-off: a lost message leaves other
+    # processes serving stale roles until their entries expire
+    events.broadcast(INVALIDATION_CHANNEL, {"user_id": user_id}, backoff=False)
+
+
+async def listen_for_invalidations() -> None:
+    """Apply invalidations broadcast by other API processes until cancelled."""
+    while True:
+        subscribed = False
+        try:
+            async with aclosing(events.listen(INVALIDATION_CHANNEL, 60.0)) as stream:
+                async for message in stream:
+                    subscribed = True
+                    if message is None:
+                        continue
+                    try:
+                        principal_cache.invalidate(int(message["user_id"]))
+                    except (KeyError, TypeError, ValueError):
+                        continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning(f"Principal invalidation listener failed: {exc}")
+        if subscribed:
+            # Broadcasts may have been missed while disconnected
+            principal_cache.clear()
+        await asyncio.sleep(RESUBSCRIBE_SECONDS)
+
+
+def decode_user_id(token: str) -> Optional[int]:
+    """``sub`` of a valid token, or None."""
+    try:
+        payload = jwt.decode(
+            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
+        )
+        return int(payload.get("sub"))
+    except Exception:
+        return None
+
+
+def load_principal(db, user_id: int) -> Optional[Principal]:
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = db.get(models.User, user_id)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.put(principal)
+    return principal
+
+
+async def load_principal_async(db, user_id: int) -> Optional[Principal]:
+    """``load_principal`` for an ``AsyncSession``."""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = await db.get(models.User, user_id)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.put(principal)
+    return principal
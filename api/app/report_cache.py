@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .evaluation_cache import canonical_hash
+from .reporting import DEFAULT_TEMPLATE, get_template
+
+# Queued/building reports are reused for repeated clicks, unless they look
+# abandoned (e.g. the worker died mid-build).
+INFLIGHT_REUSE_SECONDS = 600
+
+
+def report_context(db: Session, run: models.EvaluationRun) -> Dict[str, Any]:
+    """Everything the report template renders for ``run``."""
+    scenario = db.get(models.SimulationScenario, run.scenario_id)
+    project = db.get(models.Project, scenario.project_id) if scenario else None
+    artifact_id = run.input_ref("artifact_id")
+    rulepack_id = run.input_ref("rulepack_id")
+    artifact = db.get(models.DesignArtifact, artifact_id) if artifact_id else None
+    rulepack = db.get(models.RulePack, rulepack_id) if rulepack_id else None
+
+    return {
+        "run": run,
+        "project": project,
+        "scenario": scenario,
+        "artifact": artifact,
+        "rulepack": rulepack,
+        "results": run.results_json or {"rules": []},
+        "index": run.inclusivity_index_json
+        or {
+            "score": 0,
+            "components": {"reach": False, "strength": False, "visual": False},
+        },
+        # Stored when the run finished (see rollups.record_score_deltas)
+        "delta": run.score_delta,
+        "date": run.completed_at.isoformat() if run.completed_at else "",
+    }
+
+
+def report_cache_key(context: Dict[str, Any], template: str = DEFAULT_TEMPLATE) -> str:
+    """Content address of a report: same template, results and metadata."""
+    run, project = context["run"], context["project"]
+    scenario, artifact, rulepack = (
+        context["scenario"],
+        context["artifact"],
+        context["rulepack"],
+    )
+    spec, _ = get_template(template)
+    parts = {
+        "template": spec.fingerprint,
+        "results": context["results"],
+        "index": context["index"],
+        "meta": {
+            "run_id": run.id,
+            "date": context["date"],
+            "delta": context["delta"],
+            "project": project.name if project else None,
+            "scenario": scenario.name if scenario else None,
+            "artifact": artifact.name if artifact else None,
+            "rulepack": [rulepack.name, rulepack.version] if rulepack else None,
+        },
+    }
+    return canonical_hash(parts)
+
+
+def find_cached_report(
+    db: Session,
+    project_id: int,
+    cache_key: str,
+    include_inflight: bool = False,
+    exclude_id: Optional[int] = None,
+) -> Optional[models.Report]:
+    q = db.query(models.Report).filter(
+        models.Report.project_id == project_id,
+        models.Report.cache_key == cache_key,
+    )
+    if exclude_id is not None:
+        q = q.filter(models.Report.id != exclude_id)
+    done = q.filter(models.Report.status == "done").order_by(models.Report.id.desc())
+    hit = done.first()
+    if hit is not None or not include_inflight:
+        return hit
+    cutoff = datetime.utcnow() - timedelta(seconds=INFLIGHT_REUSE_SECONDS)
+    return (
+        q.filter(
+            models.Report.status.in_(("queued", "building")),
+            models.Report.created_at >= cutoff,
+        )
+        .order_by(models.Report.id.desc())
+        .first()
+    )
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import hashlib
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Tuple
+from typing import Dict, Tuple
 
-from jinja2 import BaseLoader, Environment
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache, Template
+
+from .config import settings
 
 try:
     from weasyprint import HTML  # type: ignore
@@ -66,24 +69,70 @@ TEMPLATE = """
   </div>
 
   <div class="footer">
-    SHA-256: {{ checksum }}
+    Report for run {{ run.id }}. The SHA-256 of this PDF is published alongside it{% if checksum_file %} in {{ checksum_file }}{% endif %}.
   </div>
 </body>
 </html>
 """
 
 
-def render_html(context: dict) -> str:
-    env = Environment(loader=BaseLoader(), autoescape=True)
-    tmpl = env.from_string(TEMPLATE)
-    html = tmpl.render(**context, css=BASE_CSS)
-    return html
+@dataclass(frozen=True)
+class ReportTemplate:
+    name: str
+    version: str
+    source: str
+    css: str = BASE_CSS
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    @property
+    def fingerprint(self) -> str:
+        """Version plus content hash, so an edit without a bump still
+        invalidates cached reports."""
+        digest = hashlib.sha256((self.source + self.css).encode("utf-8")).hexdigest()
+        return f"{self.key}:{digest[:16]}"
+
+
+# Bump a template's version when its output changes; older versions stay
+# registered so they can still be rendered on request.
+TEMPLATES: Dict[str, ReportTemplate] = {
+    t.key: t for t in (ReportTemplate(name="report", version="2", source=TEMPLATE),)
+}
+DEFAULT_TEMPLATE = "report@2"
+
+# One process-wide environment: templates are compiled once and kept in its
+# cache; the bytecode cache lets new worker processes skip recompilation.
+_env = Environment(
+    loader=DictLoader({key: t.source for key, t in TEMPLATES.items()}),
+    autoescape=True,
+    auto_reload=False,
+    bytecode_cache=FileSystemBytecodeCache(),
+)
+
+
+def get_template(key: str = DEFAULT_TEMPLATE) -> Tuple[ReportTemplate, Template]:
+    try:
+        spec = TEMPLATES[key]
+    except KeyError:
+        raise KeyError(f"Unknown report template {key!r}") from None
+    return spec, _env.get_template(key)
+
+
+def render_html(context: dict, template: str = DEFAULT_TEMPLATE) -> str:
+    spec, tmpl = get_template(template)
+    return tmpl.render(**context, css=spec.css)
 
 
 def render_pdf(html: str) -> bytes:
     if HTML is None:
         # Fallback for environments without WeasyPrint installed
         return html.encode("utf-8")
+    if settings.pdf_pool_size > 0:
+        from .pdf_pool import get_renderer_pool
+
+        return get_renderer_pool().render(html)
     return HTML(string=html).write_pdf()  # type: ignore
 
 
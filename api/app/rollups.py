@@ -0,0 +1,278 @@
+"""Per-project and per-rulepack daily rollups of finished runs.
+
+Rollup rows are updated incrementally in the transaction that finishes a
+run, so dashboards read a handful of pre-aggregated rows instead of
+scanning runs. Percentiles come from a fixed 0.01-wide score histogram.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .rule_results import record_rule_results, scenario_owners
+
+HIST_BINS = 101
+PERCENTILES = (50, 90)
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+
+
+def record_finished_runs(db: Session, runs: Iterable[models.EvaluationRun]) -> None:
+    """Write everything derived from finished runs; the caller commits."""
+    runs = sorted((r for r in runs if r.id is not None), key=lambda r: r.id)
+    record_rule_results(db, runs)
+    record_score_deltas(db, runs)
+    update_rollups(db, runs)
+
+
+def _score(run: models.EvaluationRun) -> Optional[float]:
+    if run.status != "done":
+        return None
+    try:
+        score = (run.inclusivity_index_json or {}).get("score")
+        return float(score) if score is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _finish_order(run: models.EvaluationRun) -> tuple:
+    # Legacy runs without completed_at count as the earliest
+    finished = run.completed_at
+    return (finished is not None, finished.timestamp() if finished else 0.0, run.id)
+
+
+def record_score_deltas(db: Session, runs: List[models.EvaluationRun]) -> None:
+    """Set ``score_delta`` against the last run of each scenario to finish.
+
+    Runs are ordered by ``completed_at`` (then id), not submission order, so
+    chunks finishing out of order still compare against the latest result.
+    Earlier-finished runs of the same list count as previous runs, so a
+    batch needs one lookup per scenario.
+    """
+    ids = [r.id for r in runs]
+    last: Dict[int, Optional[float]] = {}
+    for run in sorted(runs, key=_finish_order):
+        if run.scenario_id not in last:
+            prev = (
+                db.query(models.EvaluationRun.inclusivity_index_json)
+                .filter(
+                    models.EvaluationRun.scenario_id == run.scenario_id,
+                    models.EvaluationRun.status == "done",
+                    models.EvaluationRun.id.notin_(ids),
+                )
+                .order_by(
+                    models.EvaluationRun.completed_at.desc().nullslast(),
+                    models.EvaluationRun.id.desc(),
+                )
+                .first()
+            )
+            prev_score = (
+                (prev.inclusivity_index_json or {}).get("score") if prev else None
+            )
+            last[run.scenario_id] = (
+                float(prev_score) if prev_score is not None else None
+            )
+        score = _score(run)
+        prev_score = last[run.scenario_id]
+        run.score_delta = (
+            score - prev_score if score is not None and prev_score is not None else None
+        )
+        if score is not None:
+            last[run.scenario_id] = score
+
+
+def _empty() -> Dict[str, Any]:
+    return {"runs": 0, "errors": 0, "scores": [], "rules": defaultdict(lambda: [0, 0])}
+
+
+def update_rollups(
+    db: Session, runs: List[models.EvaluationRun], sign: int = 1
+) -> None:
+    """Add finished runs to their rollup rows (``sign=-1`` takes them out)."""
+    finished = [r for r in runs if r.status in ("done", "error")]
+    if not finished:
+        return
+    owners = scenario_owners(db, {r.scenario_id for r in finished})
+
+    pending: Dict[tuple, Dict[str, Any]] = defaultdict(_empty)
+    for run in finished:
+        bucket = (run.completed_at or datetime.now(timezone.utc)).date()
+        owner = owners.get(run.scenario_id)
+        if owner is None:
+            continue
+        project_id, org_id = owner
+        keys = [(models.ProjectRollup, (project_id,), bucket)]
+        if run.rulepack_id is not None:
+            keys.append((models.RulePackRollup, (run.rulepack_id, org_id), bucket))
+        score = _score(run)
+        outcomes = (
+            ((run.results_json or {}).get("rules") or [])
+            if run.status == "done"
+            else []
+        )
+        for key in keys:
+            acc = pending[key]
+            acc["runs"] += sign
+            acc["errors"] += sign * (run.status == "error")
+            if score is not None:
+                acc["scores"].append(score)
+            for entry in outcomes:
+                counts = acc["rules"][str(entry.get("id"))]
+                counts[0] += sign
+                counts[1] += sign * (not entry.get("passed"))
+
+    # Fixed lock order so concurrent workers cannot deadlock on rollup rows
+    for key in sorted(pending, key=lambda k: (k[0].__tablename__, k[1], k[2])):
+        model, scope, bucket = key
+        acc = pending[key]
+        row = _locked_row(db, model, scope, bucket)
+        row.runs += acc["runs"]
+        row.errors += acc["errors"]
+        row.score_count += sign * len(acc["scores"])
+        row.score_sum += sign * sum(acc["scores"])
+        hist = list(row.score_hist or [0] * HIST_BINS)
+        for score in acc["scores"]:
+            hist[score_bin(score)] += sign
+        row.score_hist = hist
+        rules = {k: list(v) for k, v in (row.rules or {}).items()}
+        for rule_id, (total, failed) in acc["rules"].items():
+            prev_total, prev_failed = rules.get(rule_id, (0, 0))
+            rules[rule_id] = [prev_total + total, prev_failed + failed]
+        row.rules = rules
+
+
+def _scope_columns(model):
+    """Columns identifying a rollup's scope: project, or (rulepack, org)."""
+    if model is models.ProjectRollup:
+        return (model.project_id,)
+    return (model.rulepack_id, model.org_id)
+
+
+def _scope_filter(model, scope: tuple):
+    return [column == value for column, value in zip(_scope_columns(model), scope)]
+
+
+def _locked_row(db: Session, model, scope: tuple, bucket: date):
+    query = (
+        db.query(model)
+        .filter(*_scope_filter(model, scope), model.bucket == bucket)
+        .with_for_update()
+    )
+    row = query.one_or_none()
+    if row is not None:
+        return row
+    try:
+        with db.begin_nested():
+            row = model(bucket=bucket, runs=0, errors=0, score_count=0, score_sum=0.0)
+            for column, value in zip(_scope_columns(model), scope):
+                setattr(row, column.key, value)
+            db.add(row)
+        return row
+    except IntegrityError:
+        # Created by a concurrent worker since the lookup
+        return query.one()
+
+
+def score_bin(score: float) -> int:
+    return min(HIST_BINS - 1, max(0, int(score * (HIST_BINS - 1) + 1e-9)))
+
+
+def _percentile(hist: List[int], count: int, pct: int) -> Optional[float]:
+    if not count:
+        return None
+    target = pct / 100 * count
+    seen = 0
+    for i, n in enumerate(hist):
+        seen += n
+        if seen >= target:
+            return i / (HIST_BINS - 1)
+    return 1.0
+
+
+def _stats(
+    runs: int, errors: int, count: int, total: float, hist: List[int]
+) -> Dict[str, Any]:
+    out = {
+        "runs": runs,
+        "errors": errors,
+        "mean": round(total / count, 4) if count else None,
+    }
+    for pct in PERCENTILES:
+        out[f"p{pct}"] = _percentile(hist, count, pct)
+    return out
+
+
+def _rule_rates(rules: Dict[str, List[int]]) -> List[Dict[str, Any]]:
+    items = [
+        {
+            "rule_id": rule_id,
+            "total": total,
+            "failed": failed,
+            "pass_rate": round((total - failed) / total, 4) if total else None,
+        }
+        for rule_id, (total, failed) in rules.items()
+    ]
+    items.sort(key=lambda x: x["rule_id"])
+    return items
+
+
+def dashboard(
+    db: Session, model, scope: tuple, since: Optional[date], until: Optional[date]
+) -> Dict[str, Any]:
+    """Merge the rollup rows of one scope for ``[since, until]``.
+
+    ``scope`` is ``(project_id,)`` or ``(rulepack_id, org_id)``. Defaults to
+    the last ``DEFAULT_DAYS`` days (UTC).
+    """
+    until = until or datetime.now(timezone.utc).date()
+    since = since or until - timedelta(days=DEFAULT_DAYS - 1)
+    if since > until or (until - since).days >= MAX_DAYS:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    rows = (
+        db.query(model)
+        .filter(
+            *_scope_filter(model, scope),
+            model.bucket >= since,
+            model.bucket <= until,
+        )
+        .order_by(model.bucket)
+        .all()
+    )
+    runs = errors = count = 0
+    total = 0.0
+    hist = [0] * HIST_BINS
+    rules: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    buckets = []
+    for row in rows:
+        row_hist = row.score_hist or [0] * HIST_BINS
+        runs += row.runs
+        errors += row.errors
+        count += row.score_count
+        total += row.score_sum
+        hist = [a + b for a, b in zip(hist, row_hist)]
+        for rule_id, (t, f) in (row.rules or {}).items():
+            rules[rule_id][0] += t
+            rules[rule_id][1] += f
+        buckets.append(
+            {
+                "date": row.bucket.isoformat(),
+                **_stats(
+                    row.runs, row.errors, row.score_count, row.score_sum, row_hist
+                ),
+                "rules": _rule_rates(row.rules or {}),
+            }
+        )
+    return {
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        **_stats(runs, errors, count, total, hist),
+        "rules": _rule_rates(rules),
+        "buckets": buckets,
+    }
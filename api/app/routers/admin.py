@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from .. import models
 from ..config import settings
 from ..db import get_db
+from ..principals import invalidate_principal
 
 
 router = APIRouter(prefix="/api/v1/admin", tags=["admin"], include_in_schema=True)
@@ -29,6 +30,6 @@ def bootstrap_superadmin(payload: dict, db: Session = Depends(get_db)):
     user.roles = list(roles)
     db.add(user)
     db.commit()
+    invalidate_principal(user.id)
     db.refresh(user)
     return {"id": user.id, "email": user.email, "roles": user.roles}
-
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..db import get_db
+from ..dependencies import get_current_user
+
+router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
+
+MAX_RULES = 500
+
+
+def _rule_results_query(
+    db: Session,
+    current,
+    columns,
+    since: datetime | None,
+    until: datetime | None,
+    project_id: int | None,
+    rulepack_id: int | None,
+):
+    """``rule_results`` scoped and filtered on their own denormalized columns.
+
+    Only a ``rulepack_id`` filter joins back to ``evaluation_runs``.
+    """
+    rr = models.RuleResult
+    failed = func.sum(case((rr.passed.is_(False), 1), else_=0))
+    query = db.query(*columns, func.count(rr.id), failed)
+    if "superadmin" not in (current.roles or []):
+        query = query.filter(rr.org_id == current.org_id)
+    if since is not None:
+        query = query.filter(rr.completed_at >= since)
+    if until is not None:
+        query = query.filter(rr.completed_at < until)
+    if project_id is not None:
+        query = query.filter(rr.project_id == project_id)
+    if rulepack_id is not None:
+        query = query.join(
+            models.EvaluationRun, models.EvaluationRun.id == rr.run_id
+        ).filter(models.EvaluationRun.rulepack_id == rulepack_id)
+    return query.group_by(*columns)
+
+
+def _rates(total: int, failed: int | None) -> dict:
+    failed = int(failed or 0)
+    return {
+        "total": total,
+        "failed": failed,
+        "fail_rate": round(failed / total, 4) if total else 0.0,
+    }
+
+
+@router.get("/rules")
+def rule_failure_rates(
+    since: datetime | None = Query(
+        default=None, description="Runs finished at or after"
+    ),
+    until: datetime | None = Query(default=None, description="Runs finished before"),
+    project_id: int | None = Query(default=None),
+    rulepack_id: int | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=MAX_RULES),
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Outcome counts per rule, most frequently failing first."""
+    rows = _rule_results_query(
+        db,
+        current,
+        [models.RuleResult.rule_id],
+        since,
+        until,
+        project_id,
+        rulepack_id,
+    ).all()
+    items = [
+        {"rule_id": rule_id, **_rates(total, failed)} for rule_id, total, failed in rows
+    ]
+    items.sort(key=lambda x: (-x["fail_rate"], -x["failed"], x["rule_id"]))
+    return items[:limit]
+
+
+@router.get("/rules/{rule_id}")
+def rule_breakdown(
+    rule_id: str,
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    project_id: int | None = Query(default=None),
+    rulepack_id: int | None = Query(default=None),
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """One rule's outcome counts overall and per project."""
+    rows = (
+        _rule_results_query(
+            db,
+            current,
+            [models.RuleResult.project_id],
+            since,
+            until,
+            project_id,
+            rulepack_id,
+        )
+        .filter(models.RuleResult.rule_id == rule_id)
+        .all()
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail="No results for rule")
+    names = dict(
+        db.query(models.Project.id, models.Project.name).filter(
+            models.Project.id.in_([pid for pid, _, _ in rows])
+        )
+    )
+    projects = [
+        {"project_id": pid, "project_name": names.get(pid), **_rates(total, failed)}
+        for pid, total, failed in rows
+    ]
+    projects.sort(key=lambda x: x["project_id"])
+    return {
+        "rule_id": rule_id,
+        **_rates(sum(p["total"] for p in projects), sum(p["failed"] for p in projects)),
+        "projects": projects,
+    }
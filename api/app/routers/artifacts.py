@@ -4,22 +4,44 @@ import json
 from typing import Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
 from ..config import settings
-from ..db import get_db
-from ..dependencies import get_current_user
+from ..db import get_async_db, get_db
+from ..dependencies import get_current_user, get_current_user_async
+from ..pagination import PageParams, name_filter, page_params, paginate_async
 from ..rbac import require_role
 from ..schemas import DesignArtifactRead
+from ..scoping import (
+    authorize_project,
+    authorize_project_async,
+    check_org,
+    scoped_artifact_async,
+    scoped_row,
+)
 from ..storage import (
+    UploadTooLarge,
     get_s3_client,
     new_object_key,
     presigned_get,
     presigned_put,
     delete_object,
     upload_bytes,
+    upload_stream,
 )
 
 router = APIRouter(prefix="/api/v1/projects/{project_id}/artifacts", tags=["artifacts"])
@@ -50,11 +72,7 @@ def upload_artifact(
     current=Depends(get_current_user),
 ) -> DesignArtifactRead:
     # Validate project & scope
-    project = db.get(models.Project, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if "superadmin" not in (current.roles or []) and project.org_id != current.org_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
+    authorize_project(db, project_id, current, detail="Project not found")
     require_role(current, ["org_admin", "designer"])  # upload requires edit role
 
     if presign:
@@ -88,10 +106,10 @@ def upload_artifact(
     if ext not in ALLOWED_EXTS:
         raise HTTPException(status_code=400, detail="Unsupported file type")
 
-    # Enforce size limit
+    # Enforce size limit (early when the parser already knows the size; the
+    # stream is checked again while uploading)
     max_bytes = settings.max_upload_mb * 1024 * 1024
-    content = file.file.read()
-    if len(content) > max_bytes:
+    if file.size is not None and file.size > max_bytes:
         raise HTTPException(status_code=413, detail="File too large")
 
     params_key: str | None = None
@@ -109,7 +127,12 @@ def upload_artifact(
     object_mime = MIME_BY_EXT.get(ext, file.content_type or "application/octet-stream")
 
     client = get_s3_client()
-    upload_bytes(object_key, content, object_mime, client=client)
+    try:
+        size, sha256 = upload_stream(
+            object_key, file.file, object_mime, max_bytes=max_bytes, client=client
+        )
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="File too large")
 
     if params is not None:
         params_key = object_key.rsplit(".", 1)[0] + ".json"
@@ -123,7 +146,8 @@ def upload_artifact(
         object_key=object_key,
         params_key=params_key,
         object_mime=object_mime,
-        size_bytes=len(content),
+        size_bytes=size,
+        sha256=sha256,
     )
     db.add(art)
     db.commit()
@@ -138,27 +162,43 @@ def upload_artifact(
 
 
 @router.get("")
-def list_artifacts(
+async def list_artifacts(
     project_id: int,
-    db: Session = Depends(get_db),
-    current=Depends(get_current_user),
+    request: Request,
+    response: Response,
+    q: str | None = Query(default=None, description="Name contains"),
+    page: PageParams = Depends(page_params),
+    type: str | None = Query(default=None),
+    urls: bool = Query(default=False, description="Include presigned URLs"),
+    db: AsyncSession = Depends(get_async_db),
+    current=Depends(get_current_user_async),
 ) -> list[DesignArtifactRead]:
-    project = db.get(models.Project, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if "superadmin" not in (current.roles or []) and project.org_id != current.org_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
-
-    items = (
-        db.query(models.DesignArtifact)
-        .filter(models.DesignArtifact.project_id == project_id)
-        .order_by(models.DesignArtifact.id.desc())
-        .all()
+    await authorize_project_async(db, project_id, current, detail="Project not found")
+
+    stmt = select(models.DesignArtifact).filter(
+        models.DesignArtifact.project_id == project_id
+    )
+    if q:
+        stmt = stmt.filter(name_filter(models.DesignArtifact.name, q))
+    if type is not None:
+        stmt = stmt.filter(models.DesignArtifact.type == type)
+    items = await paginate_async(
+        db,
+        stmt,
+        page,
+        models.DesignArtifact.id,
+        {
+            "name": models.DesignArtifact.name,
+            "created_at": models.DesignArtifact.created_at,
+        },
+        request,
+        response,
     )
     out: list[DesignArtifactRead] = []
     for a in items:
         resp = DesignArtifactRead.model_validate(a)
-        if a.object_key:
+        # Omitted by default; see POST /api/v1/files/presign
+        if urls and a.object_key:
             try:
                 # Use public endpoint for browser access
                 resp.presigned_url = presigned_get(a.object_key)
@@ -173,17 +213,9 @@ router_common = APIRouter(prefix="/api/v1/artifacts", tags=["artifacts"])
 
 
 @router_common.get("/{artifact_id}")
-def get_artifact_by_id(
-    artifact_id: int,
-    db: Session = Depends(get_db),
-    current=Depends(get_current_user),
+async def get_artifact_by_id(
+    art: models.DesignArtifact = Depends(scoped_artifact_async),
 ) -> DesignArtifactRead:
-    art = db.get(models.DesignArtifact, artifact_id)
-    if not art:
-        raise HTTPException(status_code=404, detail="Not found")
-    proj = db.get(models.Project, art.project_id)
-    if "superadmin" not in (current.roles or []) and proj.org_id != current.org_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
     resp = DesignArtifactRead.model_validate(art)
     if art.object_key:
         try:
@@ -200,13 +232,11 @@ def delete_artifact(
     db: Session = Depends(get_db),
     current=Depends(get_current_user),
 ):
-    art = db.get(models.DesignArtifact, artifact_id)
-    if not art or art.project_id != project_id:
+    scoped = scoped_row(db, models.DesignArtifact, artifact_id)
+    if not scoped or scoped.entity.project_id != project_id:
         raise HTTPException(status_code=404, detail="Not found")
-    # scope check
-    proj = db.get(models.Project, project_id)
-    if "superadmin" not in (current.roles or []) and proj.org_id != current.org_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
+    check_org(current, scoped)
+    art = scoped.entity
     require_role(current, ["org_admin", "designer"])  # delete allowed to editors
     # delete objects if present
     client = get_s3_client()
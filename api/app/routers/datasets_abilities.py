@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
-from ..db import get_db
-from ..dependencies import get_current_user
+from ..db import get_async_db, get_db
+from ..dependencies import get_current_user, get_current_user_async
+from ..pagination import PageParams, name_filter, page_params, paginate_async
 from ..rbac import require_role
 from ..schemas import AbilityProfileCreate, AbilityProfileRead
 from ..persistence import save_ability_json, delete_ability_json
@@ -14,12 +17,32 @@ router = APIRouter(prefix="/api/v1/datasets/abilities", tags=["datasets:abilitie
 
 
 @router.get("", response_model=list[AbilityProfileRead])
-def list_abilities(current=Depends(get_current_user), db: Session = Depends(get_db)):
-    q = db.query(models.AbilityProfile)
-    if "superadmin" in (current.roles or []):
-        items = q.all()
-    else:
-        items = q.filter(models.AbilityProfile.org_id == current.org_id).all()
+async def list_abilities(
+    request: Request,
+    response: Response,
+    q: str | None = Query(default=None, description="Name contains"),
+    page: PageParams = Depends(page_params),
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = select(models.AbilityProfile)
+    if "superadmin" not in (current.roles or []):
+        stmt = stmt.filter(models.AbilityProfile.org_id == current.org_id)
+    if q:
+        stmt = stmt.filter(name_filter(models.AbilityProfile.name, q))
+    items = await paginate_async(
+        db,
+        stmt,
+        page,
+        models.AbilityProfile.id,
+        {
+            "name": models.AbilityProfile.name,
+            "created_at": models.AbilityProfile.created_at,
+        },
+        request,
+        response,
+        default_sort="id",
+    )
     return [AbilityProfileRead.model_validate(x) for x in items]
 
 
@@ -48,10 +71,12 @@ def create_ability(
 
 
 @router.get("/{ability_id}", response_model=AbilityProfileRead)
-def get_ability(
-    ability_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+async def get_ability(
+    ability_id: int,
+    current=Depends(get_current_user_async),
+    db: Session = Depends(get_db),
 ):
-    item = db.get(models.AbilityProfile, ability_id)
+    item = await db.get(models.AbilityProfile, ability_id)
     if not item:
         raise HTTPException(status_code=404, detail="Not found")
     if "superadmin" not in (current.roles or []) and item.org_id != current.org_id:
@@ -91,10 +116,10 @@ def update_ability(
     if "superadmin" not in (current.roles or []) and item.org_id != current.org_id:
         raise HTTPException(status_code=403, detail="Forbidden")
     require_role(current, ["org_admin", "researcher"])  # update
-    name = payload.get('name')
+    name = payload.get("name")
     if isinstance(name, str):
         item.name = name
-    data = payload.get('data')
+    data = payload.get("data")
     if data is not None:
         item.data = data
     db.add(item)
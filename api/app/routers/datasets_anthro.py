@@ -1,28 +1,65 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import itertools
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
-from ..db import get_db
-from ..dependencies import get_current_user
+from ..db import get_async_db, get_db
+from ..dependencies import get_current_user, get_current_user_async
+from ..pagination import PageParams, name_filter, page_params, paginate_async
 from ..rbac import require_role
-from ..schemas import AnthropometricDatasetCreate, AnthropometricDatasetRead
+from ..schemas import (
+    AnthropometricDatasetCreate,
+    AnthropometricDatasetRead,
+    PercentileBatchItem,
+    PercentileBatchRequest,
+    PercentileBatchResponse,
+)
 from ..persistence import save_anthro_json, delete_anthro_json
-from ..services.datasets import query_percentile
+from ..services.datasets import DatasetIndex, dataset_indexes
 
 router = APIRouter(
     prefix="/api/v1/datasets/anthropometrics", tags=["datasets:anthropometrics"]
 )
 
+MAX_BATCH_QUERIES = 50_000
+# Larger batches are computed off the event loop
+INLINE_BATCH_QUERIES = 1_000
+
 
 @router.get("", response_model=list[AnthropometricDatasetRead])
-def list_anthro(current=Depends(get_current_user), db: Session = Depends(get_db)):
-    q = db.query(models.AnthropometricDataset)
-    if "superadmin" in (current.roles or []):
-        items = q.all()
-    else:
-        items = q.filter(models.AnthropometricDataset.org_id == current.org_id).all()
+async def list_anthro(
+    request: Request,
+    response: Response,
+    q: str | None = Query(default=None, description="Name contains"),
+    page: PageParams = Depends(page_params),
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = select(models.AnthropometricDataset)
+    if "superadmin" not in (current.roles or []):
+        stmt = stmt.filter(models.AnthropometricDataset.org_id == current.org_id)
+    if q:
+        stmt = stmt.filter(name_filter(models.AnthropometricDataset.name, q))
+    items = await paginate_async(
+        db,
+        stmt,
+        page,
+        models.AnthropometricDataset.id,
+        {
+            "name": models.AnthropometricDataset.name,
+            "created_at": models.AnthropometricDataset.created_at,
+        },
+        request,
+        response,
+        default_sort="id",
+    )
     return [AnthropometricDatasetRead.model_validate(x) for x in items]
 
 
@@ -52,38 +89,108 @@ def create_anthro(
     return AnthropometricDatasetRead.model_validate(item)
 
 
+async def _dataset_index(dataset_id: int, current, db: AsyncSession) -> DatasetIndex:
+    # Fetch only the scoping columns; the distributions blob is loaded
+    # solely when the cached index for this (id, updated_at) is missing.
+    row = (
+        await db.execute(
+            select(
+                models.AnthropometricDataset.org_id,
+                models.AnthropometricDataset.updated_at,
+            ).filter(models.AnthropometricDataset.id == dataset_id)
+        )
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    if "superadmin" not in (current.roles or []) and row.org_id != current.org_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    index = dataset_indexes.peek(dataset_id, row.updated_at)
+    if index is None:
+        distributions = await db.scalar(
+            select(models.AnthropometricDataset.distributions).filter(
+                models.AnthropometricDataset.id == dataset_id
+            )
+        )
+        # NumPy precompute over the whole dataset: keep it off the event loop
+        index = await run_in_threadpool(
+            dataset_indexes.put, dataset_id, row.updated_at, distributions
+        )
+    if not index:
+        raise HTTPException(status_code=400, detail="Dataset has no distributions")
+    return index
+
+
 @router.get("/{dataset_id}/percentile")
-def get_percentile(
+async def get_percentile(
     dataset_id: int,
     metric: str = Query(...),
     percentile: float = Query(..., ge=0, le=100),
     region: str | None = Query(default=None),
     sex: str | None = Query(default=None),
     age: str | None = Query(default=None),
-    current=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    ds = db.get(models.AnthropometricDataset, dataset_id)
-    if not ds:
-        raise HTTPException(status_code=404, detail="Dataset not found")
-    if "superadmin" not in (current.roles or []) and ds.org_id != current.org_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
-    if not ds.distributions:
-        raise HTTPException(status_code=400, detail="Dataset has no distributions")
+    index = await _dataset_index(dataset_id, current, db)
     try:
-        value = query_percentile(
-            ds.distributions, metric, percentile, region=region, sex=sex, age=age
-        )
+        value = index.query(metric, percentile, region=region, sex=sex, age=age)
     except KeyError as e:
         raise HTTPException(status_code=400, detail=str(e))
     return {"metric": metric, "percentile": percentile, "value": value}
 
 
+@router.post("/{dataset_id}/percentiles:batch", response_model=PercentileBatchResponse)
+async def get_percentiles_batch(
+    dataset_id: int,
+    payload: PercentileBatchRequest,
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    queries = [q.model_dump() for q in payload.queries]
+    cart = payload.cartesian
+    if cart is not None:
+        size = (
+            len(cart.metrics)
+            * len(cart.percentiles)
+            * len(cart.regions)
+            * len(cart.sexes)
+            * len(cart.ages)
+        )
+        if len(queries) + size > MAX_BATCH_QUERIES:
+            raise HTTPException(status_code=413, detail="Too many queries")
+        if any(not 0 <= p <= 100 for p in cart.percentiles):
+            raise HTTPException(status_code=400, detail="percentile must be 0-100")
+        queries.extend(
+            {"metric": m, "percentile": p, "region": r, "sex": s, "age": a}
+            for m, p, r, s, a in itertools.product(
+                cart.metrics, cart.percentiles, cart.regions, cart.sexes, cart.ages
+            )
+        )
+    if not queries:
+        raise HTTPException(status_code=400, detail="No queries")
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=413, detail="Too many queries")
+
+    index = await _dataset_index(dataset_id, current, db)
+    if len(queries) > INLINE_BATCH_QUERIES:
+        values, errors = await run_in_threadpool(index.query_many, queries)
+    else:
+        values, errors = index.query_many(queries)
+    results = []
+    for q, value, err in zip(queries, values.tolist(), errors):
+        ok = err is None and not math.isnan(value)
+        results.append(PercentileBatchItem(**q, value=value if ok else None, error=err))
+    return PercentileBatchResponse(results=results)
+
+
 @router.get("/{dataset_id}", response_model=AnthropometricDatasetRead)
-def get_anthro_dataset(
-    dataset_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+async def get_anthro_dataset(
+    dataset_id: int,
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    ds = db.get(models.AnthropometricDataset, dataset_id)
+    ds = await db.get(models.AnthropometricDataset, dataset_id)
     if not ds:
         raise HTTPException(status_code=404, detail="Dataset not found")
     if "superadmin" not in (current.roles or []) and ds.org_id != current.org_id:
@@ -21,18 +21,25 @@ router = APIRouter(prefix="/api/v1/demo", tags=["demo"])
 @router.post("/seed")
 def seed_demo(current=Depends(get_current_user), db: Session = Depends(get_db)):
     # Require a basic role
-    require_role(current, ["designer", "researcher", "org_admin"])  # default user has designer
+    require_role(
+        current, ["designer", "researcher", "org_admin"]
+    )  # default user has designer
 
     # 1) Ensure a project exists in user's org
     if not current.org_id:
         raise HTTPException(status_code=400, detail="User not in an organization")
     proj = (
         db.query(models.Project)
-        .filter(models.Project.org_id == current.org_id, models.Project.name == "Demo Project")
+        .filter(
+            models.Project.org_id == current.org_id,
+            models.Project.name == "Demo Project",
+        )
         .first()
     )
     if not proj:
-        proj = models.Project(org_id=current.org_id, name="Demo Project", description="Demo")
+        proj = models.Project(
+            org_id=current.org_id, name="Demo Project", description="Demo"
+        )
         db.add(proj)
         db.commit()
         db.refresh(proj)
@@ -49,6 +56,7 @@ def seed_demo(current=Depends(get_current_user), db: Session = Depends(get_db)):
     upload_bytes(object_key, data, "model/gltf+json", client=client)
 
     from ..config import settings
+
     art = models.DesignArtifact(
         project_id=proj.id,
         name="Minimal glTF",
@@ -66,7 +74,10 @@ def seed_demo(current=Depends(get_current_user), db: Session = Depends(get_db)):
     # 3) Create or find a scenario
     scen = (
         db.query(models.SimulationScenario)
-        .filter(models.SimulationScenario.project_id == proj.id, models.SimulationScenario.name == "Demo Scenario")
+        .filter(
+            models.SimulationScenario.project_id == proj.id,
+            models.SimulationScenario.name == "Demo Scenario",
+        )
         .first()
     )
     if not scen:
@@ -88,7 +99,10 @@ def seed_demo(current=Depends(get_current_user), db: Session = Depends(get_db)):
     # 4) Create or find a rulepack from seeds
     rp = (
         db.query(models.RulePack)
-        .filter(models.RulePack.org_id == proj.org_id, models.RulePack.name == "General EU v1")
+        .filter(
+            models.RulePack.org_id == proj.org_id,
+            models.RulePack.name == "General EU v1",
+        )
         .first()
     )
     if not rp:
@@ -97,7 +111,9 @@ def seed_demo(current=Depends(get_current_user), db: Session = Depends(get_db)):
             raise HTTPException(status_code=500, detail="Demo rulepack missing")
         payload = json.loads(rp_path.read_text("utf-8"))
         rp = models.RulePack(
-            org_id=proj.org_id, name=payload.get("name", "General EU v1"), rules=payload.get("rules")
+            org_id=proj.org_id,
+            name=payload.get("name", "General EU v1"),
+            rules=payload.get("rules"),
         )
         setattr(rp, "version", payload.get("version", "1.0.0"))
         db.add(rp)
@@ -107,6 +123,8 @@ def seed_demo(current=Depends(get_current_user), db: Session = Depends(get_db)):
     # 5) Enqueue evaluation
     run = models.EvaluationRun(
         scenario_id=scen.id,
+        artifact_id=art.id,
+        rulepack_id=rp.id,
         status="queued",
         metrics={"artifact_id": art.id, "rulepack_id": rp.id, "scenario_id": scen.id},
     )
@@ -1,53 +1,96 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import time
+from contextlib import aclosing
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from celery import group
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .. import models
+from .. import events, models
 from ..config import settings
-from ..db import get_db
-from ..dependencies import get_current_user
+from ..db import SessionLocal, get_async_db, get_db
+from ..dependencies import get_current_user, get_current_user_async, get_stream_user
+from ..evaluation_cache import (
+    copy_cached_results,
+    dataset_versions,
+    evaluation_cache_key,
+    find_cached_run,
+    is_cacheable,
+)
 from ..rbac import require_role
-from ..reporting import render_html, render_pdf, sha256_bytes
-from ..storage import get_s3_client, presigned_get, upload_bytes
-from ..tasks import run_evaluation
+from ..rollups import record_finished_runs, update_rollups
+from ..report_cache import find_cached_report, report_cache_key, report_context
+from ..scoping import (
+    check_org,
+    load_scoped,
+    load_scoped_async,
+    scoped_row,
+    scoped_run,
+    scoped_run_async,
+)
+from ..storage import presigned_get
+from ..tasks import build_report, run_evaluation, run_evaluation_batch
 
 router = APIRouter(prefix="/api/v1/evaluations", tags=["evaluations"])
 
+MAX_BATCH_RUNS = 1000
+BATCH_CHUNK_SIZE = 50
+# Event stream: comment line to keep proxies from idling the connection out,
+# and a DB status re-check in case a published transition was missed
+SSE_KEEPALIVE_SECONDS = 15.0
+SSE_RECHECK_SECONDS = 30.0
+# Server-side status polling when Redis is unavailable
+SSE_FALLBACK_POLL_SECONDS = 2.0
+
+
+def _as_int(val: Any, name: str) -> int:
+    try:
+        return int(val)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}") from exc
+
 
 @router.post("", status_code=202)
 def enqueue_evaluation(
-    payload: dict, current=Depends(get_current_user), db: Session = Depends(get_db)
+    payload: dict,
+    response: Response,
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    def _as_int(val: Any, name: str) -> int:
-        try:
-            return int(val)
-        except Exception as exc:
-            raise HTTPException(status_code=400, detail=f"Invalid {name}") from exc
-
     artifact_id = _as_int(payload.get("artifact_id"), "artifact_id")
     scenario_id = _as_int(payload.get("scenario_id"), "scenario_id")
     rulepack_id = _as_int(payload.get("rulepack_id"), "rulepack_id")
     webhook_url = payload.get("webhook_url")
     debug = bool(payload.get("debug", False))
 
-    scenario = db.get(models.SimulationScenario, scenario_id)
+    # Scenario and artifact come with their project's org for the scope check
+    scoped = scoped_row(db, models.SimulationScenario, scenario_id)
+    scoped_artifact = scoped_row(db, models.DesignArtifact, artifact_id)
+    scenario = scoped.entity if scoped else None
+    artifact = scoped_artifact.entity if scoped_artifact else None
     rulepack = db.get(models.RulePack, rulepack_id)
-    artifact = db.get(models.DesignArtifact, artifact_id)
     if not all([scenario, rulepack, artifact]):
         raise HTTPException(status_code=400, detail="Invalid references")
-    # scope org
-    if "superadmin" not in (current.roles or []) and scenario and scenario.id:
-        # We ensure project/org match user
-        project = db.get(models.Project, scenario.project_id)
-        if not project or project.org_id != current.org_id:
-            raise HTTPException(status_code=403, detail="Forbidden")
+    check_org(current, scoped)
+    check_org(current, scoped_artifact)
+    if "superadmin" not in (current.roles or []) and rulepack.org_id != current.org_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
 
     require_role(current, ["org_admin", "researcher", "designer"])  # can submit eval
+    no_cache = bool(payload.get("no_cache", False))
     run = models.EvaluationRun(
         scenario_id=scenario_id,
+        artifact_id=artifact_id,
+        rulepack_id=rulepack_id,
+        webhook_url=webhook_url,
         status="queued",
         metrics={
             "artifact_id": artifact_id,
@@ -56,169 +99,334 @@ def enqueue_evaluation(
             "scenario_id": scenario_id,
             "debug": debug,
             "log": [] if debug else None,
+            "no_cache": no_cache,
         },
     )
+    if is_cacheable(run):
+        run.cache_key = evaluation_cache_key(
+            scenario, rulepack, artifact, dataset_versions(db, [scenario])
+        )
+    # Identical inputs already evaluated: answer immediately without a task.
+    # Webhook runs still go through the worker so the hook gets posted.
+    cached = None
+    if not (debug or no_cache or webhook_url):
+        cached = find_cached_run(db, run.cache_key, scenario.project_id)
+    if cached is not None:
+        copy_cached_results(run, cached)
     db.add(run)
+    if cached is not None:
+        db.flush()
+        record_finished_runs(db, [run])
     db.commit()
     db.refresh(run)
 
+    if cached is not None:
+        response.status_code = 200
+        return {"id": run.id, "status": run.status, "cached": True}
     run_evaluation.delay(run.id)
     return {"id": run.id, "status": run.status}
 
 
-@router.get("/{evaluation_id}")
-def get_evaluation(
-    evaluation_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+@router.post("/batch", status_code=202)
+def enqueue_evaluation_batch(
+    payload: dict,
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    run = db.get(models.EvaluationRun, evaluation_id)
-    if not run:
-        raise HTTPException(status_code=404, detail="Not found")
-    # scope
-    scen = db.get(models.SimulationScenario, run.scenario_id)
-    proj = db.get(models.Project, scen.project_id) if scen else None
-    if "superadmin" not in (current.roles or []) and (
-        not proj or proj.org_id != current.org_id
+    """Queue many (artifact, scenario, rulepack) evaluations at once.
+
+    All runs are inserted in one transaction and dispatched as a Celery group
+    of ``chunk_size`` runs; each chunk shares its entity loads and commit.
+    """
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="No items")
+    if len(items) > MAX_BATCH_RUNS:
+        raise HTTPException(status_code=413, detail="Too many items")
+    require_role(current, ["org_admin", "researcher", "designer"])  # can submit eval
+    chunk_size = _as_int(payload.get("chunk_size", BATCH_CHUNK_SIZE), "chunk_size")
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="Invalid chunk_size")
+    no_cache = bool(payload.get("no_cache", False))
+
+    triples = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise HTTPException(status_code=400, detail="Invalid item")
+        triples.append(
+            (
+                _as_int(item.get("artifact_id"), "artifact_id"),
+                _as_int(item.get("scenario_id"), "scenario_id"),
+                _as_int(item.get("rulepack_id"), "rulepack_id"),
+                item.get("webhook_url"),
+            )
+        )
+
+    def _by_id(model, ids):
+        return {o.id: o for o in db.query(model).filter(model.id.in_(set(ids)))}
+
+    artifacts = _by_id(models.DesignArtifact, [t[0] for t in triples])
+    scenarios = _by_id(models.SimulationScenario, [t[1] for t in triples])
+    rulepacks = _by_id(models.RulePack, [t[2] for t in triples])
+    if (
+        len(artifacts) != len({t[0] for t in triples})
+        or len(scenarios) != len({t[1] for t in triples})
+        or len(rulepacks) != len({t[2] for t in triples})
     ):
-        raise HTTPException(status_code=403, detail="Forbidden")
+        raise HTTPException(status_code=400, detail="Invalid references")
+    # scope org: every referenced scenario, artifact and rulepack
+    if "superadmin" not in (current.roles or []):
+        owned = [*scenarios.values(), *artifacts.values()]
+        projects = _by_id(models.Project, [o.project_id for o in owned])
+        for obj in owned:
+            project = projects.get(obj.project_id)
+            if not project or project.org_id != current.org_id:
+                raise HTTPException(status_code=403, detail="Forbidden")
+        if any(rp.org_id != current.org_id for rp in rulepacks.values()):
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+    datasets = dataset_versions(db, scenarios.values())
+    runs = []
+    for artifact_id, scenario_id, rulepack_id, webhook_url in triples:
+        runs.append(
+            models.EvaluationRun(
+                scenario_id=scenario_id,
+                artifact_id=artifact_id,
+                rulepack_id=rulepack_id,
+                webhook_url=webhook_url,
+                status="queued",
+                metrics={
+                    "artifact_id": artifact_id,
+                    "rulepack_id": rulepack_id,
+                    "webhook_url": webhook_url,
+                    "scenario_id": scenario_id,
+                    "debug": False,
+                    "log": None,
+                    "no_cache": no_cache,
+                },
+                cache_key=(
+                    None
+                    if no_cache
+                    else evaluation_cache_key(
+                        scenarios[scenario_id],
+                        rulepacks[rulepack_id],
+                        artifacts[artifact_id],
+                        datasets,
+                    )
+                ),
+            )
+        )
+    # A single multi-row INSERT; read ids before commit expires the rows
+    db.add_all(runs)
+    db.flush()
+    ids = [r.id for r in runs]
+    db.commit()
+
+    chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    group(run_evaluation_batch.s(chunk) for chunk in chunks).apply_async()
+    return {"ids": ids, "status": "queued", "chunks": len(chunks)}
+
+
+@router.get("/{evaluation_id}")
+async def get_evaluation(run: models.EvaluationRun = Depends(scoped_run_async)):
     return {
         "id": run.id,
         "status": run.status,
+        "scenario_id": run.scenario_id,
+        "artifact_id": run.artifact_id,
+        "rulepack_id": run.rulepack_id,
         "metrics": run.metrics,
         "results": getattr(run, "results_json", None),
         "inclusivity_index": getattr(run, "inclusivity_index_json", None),
     }
 
 
-@router.post("/{evaluation_id}/report")
-def create_report(
-    evaluation_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
-):
-    run = db.get(models.EvaluationRun, evaluation_id)
-    if not run or run.status != "done":
-        raise HTTPException(status_code=400, detail="Evaluation not ready")
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
-    scenario = db.get(models.SimulationScenario, run.scenario_id)
-    project = db.get(models.Project, scenario.project_id) if scenario else None
-    # find artifact and rulepack ids from metrics
-    m = run.metrics or {}
-    artifact = (
-        db.get(models.DesignArtifact, m.get("artifact_id"))
-        if m.get("artifact_id")
-        else None
-    )
-    rulepack = (
-        db.get(models.RulePack, m.get("rulepack_id")) if m.get("rulepack_id") else None
-    )
 
-    # authorize org scope
-    if "superadmin" not in (current.roles or []) and (
-        not project or project.org_id != current.org_id
-    ):
-        raise HTTPException(status_code=403, detail="Forbidden")
-    # previous run delta
-    prev = (
-        db.query(models.EvaluationRun)
-        .filter(
-            models.EvaluationRun.scenario_id == run.scenario_id,
-            models.EvaluationRun.id < run.id,
-        )
-        .order_by(models.EvaluationRun.id.desc())
-        .first()
-    )
-    delta = None
+def _current_status(evaluation_id: int) -> str | None:
+    with SessionLocal() as db:
+        run = db.get(models.EvaluationRun, evaluation_id)
+        return run.status if run else None
+
+
+async def _event_stream(evaluation_id: int, status: str):
+    yield _sse("status", {"id": evaluation_id, "status": status})
+    if status in events.TERMINAL_STATUSES:
+        return
+    last_status = status
+    last_check: float | None = None  # re-check once subscribed, then periodically
+    last_sent = time.monotonic()
     try:
-        prev_score = (prev.inclusivity_index_json or {}).get("score") if prev else None
-        cur_score = (run.inclusivity_index_json or {}).get("score")
-        if prev_score is not None and cur_score is not None:
-            delta = float(cur_score) - float(prev_score)
+        async with aclosing(events.subscribe(evaluation_id)) as stream:
+            async for event in stream:
+                now = time.monotonic()
+                if event is None and (
+                    last_check is None or now - last_check >= SSE_RECHECK_SECONDS
+                ):
+                    last_check = now
+                    db_status = await run_in_threadpool(_current_status, evaluation_id)
+                    if db_status and db_status != last_status:
+                        event = {
+                            "event": "status",
+                            "data": {"id": evaluation_id, "status": db_status},
+                        }
+                if event is None:
+                    if now - last_sent >= SSE_KEEPALIVE_SECONDS:
+                        last_sent = now
+                        yield ": keep-alive\n\n"
+                    continue
+                name, data = event.get("event"), event.get("data") or {}
+                if name not in ("status", "log"):
+                    continue
+                last_sent = now
+                yield _sse(name, data)
+                if name == "status":
+                    last_status = data.get("status")
+                    if last_status in events.TERMINAL_STATUSES:
+                        return
     except Exception:
-        delta = None
-
-    context = {
-        "run": run,
-        "project": project,
-        "scenario": scenario,
-        "artifact": artifact,
-        "rulepack": rulepack,
-        "results": run.results_json or {"rules": []},
-        "index": run.inclusivity_index_json
-        or {
-            "score": 0,
-            "components": {"reach": False, "strength": False, "visual": False},
-        },
-        "delta": delta,
-        "date": run.completed_at.isoformat() if run.completed_at else "",
-        "checksum": "",
-    }
+        # Redis unavailable: fall back to polling the row server-side
+        while last_status not in events.TERMINAL_STATUSES:
+            await asyncio.sleep(SSE_FALLBACK_POLL_SECONDS)
+            db_status = await run_in_threadpool(_current_status, evaluation_id)
+            if db_status is None:
+                return
+            if db_status != last_status:
+                last_status = db_status
+                yield _sse("status", {"id": evaluation_id, "status": db_status})
+            else:
+                yield ": keep-alive\n\n"
 
-    html = render_html(context)
-    pdf = render_pdf(html)
-    checksum = sha256_bytes(pdf)
-    context["checksum"] = checksum
-    # re-render HTML with checksum visible
-    html = render_html(context)
-    pdf = render_pdf(html)
-    checksum = sha256_bytes(pdf)
-
-    # Upload
-    client = get_s3_client()
-    base = f"projects/{project.id}/reports/{run.id}"
-    html_key = f"{base}.html"
-    pdf_key = f"{base}.pdf"
-    upload_bytes(html_key, html.encode("utf-8"), "text/html", client=client)
-    upload_bytes(pdf_key, pdf, "application/pdf", client=client)
 
-    report = models.Report(
-        project_id=project.id,
-        title=f"Evaluation Report #{run.id}",
-        content=None,
-        html_key=html_key,
-        pdf_key=pdf_key,
-        checksum_sha256=checksum,
+@router.get("/{evaluation_id}/events")
+def stream_evaluation_events(
+    evaluation_id: int, current=Depends(get_stream_user), db: Session = Depends(get_db)
+):
+    """Server-Sent Events: ``status`` transitions and ``log`` lines of a run.
+
+    The current status is sent first; the stream ends after a terminal
+    status (``done``/``error``). Accepts ``?access_token=`` for EventSource.
+    """
+    run = load_scoped(db, models.EvaluationRun, evaluation_id, current)
+    return StreamingResponse(
+        _event_stream(run.id, run.status),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    db.add(report)
-    db.commit()
-    db.refresh(report)
 
-    # Build URLs, preferring presigned; fallback to API proxy
-    proxy_html = f"/api/v1/files/get?key={html_key}"
-    proxy_pdf = f"/api/v1/files/get?key={pdf_key}"
-    try:
-        html_url = presigned_get(html_key)
-    except Exception:
-        html_url = proxy_html
-    try:
-        pdf_url = presigned_get(pdf_key)
-    except Exception:
-        pdf_url = proxy_pdf
 
-    return {
+def _report_out(report: models.Report) -> dict:
+    out = {
         "id": report.id,
         "project_id": report.project_id,
+        "evaluation_id": report.evaluation_id,
         "title": report.title,
+        "status": report.status,
+        "error": report.error,
         "content": report.content,
         "html_key": report.html_key,
         "pdf_key": report.pdf_key,
         "checksum_sha256": report.checksum_sha256,
-        "presigned_html_url": html_url,
-        "presigned_pdf_url": pdf_url,
+        "presigned_html_url": None,
+        "presigned_pdf_url": None,
     }
+    if report.status != "done":
+        return out
+    # Build URLs, preferring presigned; fallback to API proxy
+    for field, key in (
+        ("presigned_html_url", report.html_key),
+        ("presigned_pdf_url", report.pdf_key),
+    ):
+        if not key:
+            continue
+        try:
+            out[field] = presigned_get(key)
+        except Exception:
+            out[field] = f"/api/v1/files/get?key={key}"
+    return out
+
+
+@router.post("/{evaluation_id}/report", status_code=202)
+def create_report(
+    evaluation_id: int,
+    response: Response,
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Queue a report build; poll ``GET /{evaluation_id}/report`` until done."""
+    scoped = scoped_row(db, models.EvaluationRun, evaluation_id)
+    run = scoped.entity if scoped else None
+    if not run or run.status != "done":
+        raise HTTPException(status_code=400, detail="Evaluation not ready")
+    check_org(current, scoped)
+    if scoped.project_id is None:
+        raise HTTPException(status_code=400, detail="Evaluation has no project")
+
+    # Unchanged run: hand back the existing (or in-flight) report instead of
+    # rendering and uploading it again
+    context = report_context(db, run)
+    project = context["project"]
+    cache_key = report_cache_key(context)
+    cached = find_cached_report(db, project.id, cache_key, include_inflight=True)
+    if cached is not None:
+        if cached.status == "done":
+            response.status_code = 200
+        response.headers["Location"] = f"/api/v1/evaluations/{evaluation_id}/report"
+        return {**_report_out(cached), "cached": True}
+
+    report = models.Report(
+        project_id=project.id,
+        evaluation_id=run.id,
+        title=f"Evaluation Report #{run.id}",
+        content=None,
+        status="queued",
+        cache_key=cache_key,
+    )
+    db.add(report)
+    db.commit()
+    report_id = report.id
+    build_report.delay(report_id)
+
+    response.headers["Location"] = f"/api/v1/evaluations/{evaluation_id}/report"
+    # Re-read: an eager/fast worker may already have finished
+    report = db.get(models.Report, report_id)
+    return _report_out(report)
+
+
+@router.get("/{evaluation_id}/report")
+async def get_report(
+    evaluation_id: int,
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Latest report requested for the run, with URLs once it is built."""
+    await load_scoped_async(db, models.EvaluationRun, evaluation_id, current)
+    report = await db.scalar(
+        select(models.Report)
+        .filter(models.Report.evaluation_id == evaluation_id)
+        .order_by(models.Report.id.desc())
+        .limit(1)
+    )
+    if not report:
+        raise HTTPException(status_code=404, detail="No report")
+    return _report_out(report)
 
 
 @router.delete("/{evaluation_id}")
 def delete_evaluation(
-    evaluation_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+    evaluation_id: int,
+    run: models.EvaluationRun = Depends(scoped_run),
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    run = db.get(models.EvaluationRun, evaluation_id)
-    if not run:
-        raise HTTPException(status_code=404, detail="Not found")
-    scen = db.get(models.SimulationScenario, run.scenario_id)
-    proj = db.get(models.Project, scen.project_id) if scen else None
-    if "superadmin" not in (current.roles or []) and (
-        not proj or proj.org_id != current.org_id
-    ):
-        raise HTTPException(status_code=403, detail="Forbidden")
     require_role(current, ["org_admin", "researcher"])  # destructive
+    update_rollups(db, [run], sign=-1)
+    # Explicit rather than relying on ON DELETE CASCADE (not enforced on SQLite)
+    db.query(models.RuleResult).filter(
+        models.RuleResult.run_id == evaluation_id
+    ).delete(synchronize_session=False)
     db.delete(run)
     db.commit()
     return {"status": "ok", "deleted": True, "id": evaluation_id}
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+import re
+from email.utils import format_datetime
+
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from .. import models
 from ..db import get_db
 from ..dependencies import get_current_user
 from ..rbac import require_role
-from ..storage import get_s3_client
+from ..scoping import authorize_project
+from ..storage import get_s3_client, presigned_get
 from ..config import settings
 
 router = APIRouter(prefix="/api/v1/files", tags=["files"])
 
+STREAM_CHUNK_BYTES = 256 * 1024
+MAX_PRESIGN_KEYS = 500
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
+
 
 def _project_id_from_key(key: str) -> int | None:
     # Expected keys: projects/{project_id}/...
@@ -24,24 +34,127 @@ def _project_id_from_key(key: str) -> int | None:
     return None
 
 
+@router.post("/presign")
+def presign_batch(
+    payload: dict, current=Depends(get_current_user), db: Session = Depends(get_db)
+):
+    """Presigned GET URLs for ``{"keys": [...]}``; list endpoints omit them."""
+    keys = payload.get("keys")
+    if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+        raise HTTPException(status_code=400, detail="keys must be a list of strings")
+    if len(keys) > MAX_PRESIGN_KEYS:
+        raise HTTPException(status_code=413, detail="Too many keys")
+    pids = {}
+    for key in keys:
+        pid = _project_id_from_key(key)
+        if pid is None:
+            raise HTTPException(status_code=400, detail="Invalid key format")
+        pids[key] = pid
+    # One query authorizes every project referenced by the batch
+    orgs = {}
+    if pids:
+        orgs = dict(
+            db.query(models.Project.id, models.Project.org_id).filter(
+                models.Project.id.in_(set(pids.values()))
+            )
+        )
+    if len(orgs) != len(set(pids.values())):
+        raise HTTPException(status_code=404, detail="Project not found")
+    if "superadmin" not in (current.roles or []) and any(
+        org_id != current.org_id for org_id in orgs.values()
+    ):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    urls = {}
+    for key in keys:
+        try:
+            urls[key] = presigned_get(key)
+        except Exception:
+            urls[key] = f"/api/v1/files/get?key={key}"
+    return {"urls": urls}
+
+
 @router.get("/get")
-def proxy_get_object(key: str, current=Depends(get_current_user), db: Session = Depends(get_db)):
+def proxy_get_object(
+    key: str,
+    request: Request,
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     # Basic authorization: user must belong to the project's org
     pid = _project_id_from_key(key)
     if pid is None:
         raise HTTPException(status_code=400, detail="Invalid key format")
-    proj = db.get(models.Project, pid)
-    if not proj:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if "superadmin" not in (current.roles or []) and proj.org_id != current.org_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
+    authorize_project(db, pid, current, detail="Project not found")
+
+    # Range and If-None-Match are evaluated by S3 itself, so a conditional or
+    # partial request costs a single round trip
+    params = {"Bucket": settings.s3_bucket, "Key": key}
+    byte_range = _single_range(request.headers.get("range"))
+    if byte_range:
+        params["Range"] = byte_range
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        params["IfNoneMatch"] = if_none_match
 
     s3 = get_s3_client()
     try:
-        obj = s3.get_object(Bucket=settings.s3_bucket, Key=key)
+        obj = s3.get_object(**params)
+    except ClientError as e:
+        status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        code = str(e.response.get("Error", {}).get("Code"))
+        if status == 304 or code in ("304", "NotModified"):
+            etag = e.response["ResponseMetadata"].get("HTTPHeaders", {}).get("etag")
+            return Response(
+                status_code=304, headers=_cache_headers(etag or if_none_match)
+            )
+        if status == 416 or code == "InvalidRange":
+            raise HTTPException(status_code=416, detail="Range not satisfiable")
+        raise HTTPException(status_code=404, detail="Not found")
     except Exception:
         raise HTTPException(status_code=404, detail="Not found")
-    data = obj["Body"].read()
+
+    headers = _cache_headers(obj.get("ETag"))
+    headers["Accept-Ranges"] = "bytes"
+    if obj.get("ContentLength") is not None:
+        headers["Content-Length"] = str(obj["ContentLength"])
+    if obj.get("LastModified") is not None:
+        headers["Last-Modified"] = format_datetime(obj["LastModified"], usegmt=True)
+    status_code = 200
+    if byte_range and obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+        status_code = 206
     ctype = obj.get("ContentType") or "application/octet-stream"
-    return Response(content=data, media_type=ctype)
+    return StreamingResponse(
+        _iter_body(obj["Body"]),
+        status_code=status_code,
+        media_type=ctype,
+        headers=headers,
+    )
+
+
+def _single_range(value: str | None) -> str | None:
+    """``bytes=a-b`` / ``bytes=a-`` / ``bytes=-n``; anything else (including
+    multi-range) is ignored and the whole object is served."""
+    if not value:
+        return None
+    m = _RANGE_RE.fullmatch(value.strip())
+    if not m or m.group(1) == m.group(2) == "":
+        return None
+    if m.group(1) and m.group(2) and int(m.group(2)) < int(m.group(1)):
+        return None
+    return value.strip()
 
+
+def _cache_headers(etag: str | None) -> dict:
+    # Authorized per request, so only the browser may cache; revalidate by ETag
+    headers = {"Cache-Control": "private, no-cache"}
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+
+def _iter_body(body, chunk_size: int = STREAM_CHUNK_BYTES):
+    try:
+        yield from body.iter_chunks(chunk_size=chunk_size)
+    finally:
+        body.close()
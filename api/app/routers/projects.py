@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
-from ..db import get_db
-from ..dependencies import get_current_user
+from ..db import get_async_db, get_db
+from ..dependencies import get_current_user, get_current_user_async
+from ..pagination import PageParams, name_filter, page_params, paginate_async
 from ..rbac import require_role
+from ..rollups import dashboard
 from ..schemas import ProjectCreate, ProjectRead
 from ..storage import presigned_get
 from ..storage import delete_object
@@ -32,12 +38,33 @@ def create_project(
 
 
 @router.get("", response_model=list[ProjectRead])
-def list_projects(current=Depends(get_current_user), db: Session = Depends(get_db)):
-    q = db.query(models.Project)
-    if "superadmin" in (current.roles or []):
-        projs = q.all()
-    else:
-        projs = q.filter(models.Project.org_id == current.org_id).all()
+async def list_projects(
+    request: Request,
+    response: Response,
+    q: str | None = Query(default=None, description="Name contains"),
+    page: PageParams = Depends(page_params),
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = select(models.Project)
+    if "superadmin" not in (current.roles or []):
+        stmt = stmt.filter(models.Project.org_id == current.org_id)
+    if q:
+        stmt = stmt.filter(name_filter(models.Project.name, q))
+    projs = await paginate_async(
+        db,
+        stmt,
+        page,
+        models.Project.id,
+        {
+            "name": models.Project.name,
+            "created_at": models.Project.created_at,
+            "updated_at": models.Project.updated_at,
+        },
+        request,
+        response,
+        default_sort="id",
+    )
     return [ProjectRead.model_validate(p) for p in projs]
 
 
@@ -53,6 +80,28 @@ def get_project(
     return ProjectRead.model_validate(proj)
 
 
+@router.get("/{project_id}/dashboard")
+def project_dashboard(
+    project_id: int,
+    since: date | None = Query(default=None, description="First day (UTC)"),
+    until: date | None = Query(
+        default=None, description="Last day (UTC), default today"
+    ),
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Run counts, score mean/percentiles and rule pass rates per day."""
+    proj = db.get(models.Project, project_id)
+    if not proj:
+        raise HTTPException(status_code=404, detail="Not found")
+    if "superadmin" not in (current.roles or []) and proj.org_id != current.org_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return {
+        "project_id": project_id,
+        **dashboard(db, models.ProjectRollup, (project_id,), since, until),
+    }
+
+
 @router.patch("/{project_id}", response_model=ProjectRead)
 def update_project(
     project_id: int,
@@ -90,48 +139,75 @@ def delete_project(
 
 
 @router.get("/{project_id}/reports")
-def list_reports(
-    project_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+async def list_reports(
+    project_id: int,
+    request: Request,
+    response: Response,
+    status: str | None = Query(default=None),
+    evaluation_id: int | None = Query(default=None),
+    urls: bool = Query(default=False, description="Include presigned URLs"),
+    page: PageParams = Depends(page_params),
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    proj = db.get(models.Project, project_id)
+    proj = await db.get(models.Project, project_id)
     if not proj:
         raise HTTPException(status_code=404, detail="Not found")
     if "superadmin" not in (current.roles or []) and proj.org_id != current.org_id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    items = (
-        db.query(models.Report)
-        .filter(models.Report.project_id == project_id)
-        .order_by(models.Report.id.desc())
-        .all()
+    stmt = select(models.Report).filter(models.Report.project_id == project_id)
+    if status is not None:
+        stmt = stmt.filter(models.Report.status == status)
+    if evaluation_id is not None:
+        stmt = stmt.filter(models.Report.evaluation_id == evaluation_id)
+    items = await paginate_async(
+        db,
+        stmt,
+        page,
+        models.Report.id,
+        {"created_at": models.Report.created_at},
+        request,
+        response,
     )
     out = []
     for r in items:
-        # Prefer presigned URLs; fallback to API proxy if signing fails
-        proxy_html = f"/api/v1/files/get?key={r.html_key}" if r.html_key else None
-        proxy_pdf = f"/api/v1/files/get?key={r.pdf_key}" if r.pdf_key else None
-        try:
-            html_url = presigned_get(r.html_key) if r.html_key else proxy_html
-        except Exception:
-            html_url = proxy_html
-        try:
-            pdf_url = presigned_get(r.pdf_key) if r.pdf_key else proxy_pdf
-        except Exception:
-            pdf_url = proxy_pdf
+        html_url = pdf_url = None
+        # Omitted by default; see POST /api/v1/files/presign
+        if urls:
+            # Prefer presigned URLs; fallback to API proxy if signing fails
+            proxy_html = f"/api/v1/files/get?key={r.html_key}" if r.html_key else None
+            proxy_pdf = f"/api/v1/files/get?key={r.pdf_key}" if r.pdf_key else None
+            try:
+                html_url = presigned_get(r.html_key) if r.html_key else proxy_html
+            except Exception:
+                html_url = proxy_html
+            try:
+                pdf_url = presigned_get(r.pdf_key) if r.pdf_key else proxy_pdf
+            except Exception:
+                pdf_url = proxy_pdf
         out.append(
             {
                 "id": r.id,
                 "project_id": r.project_id,
                 "title": r.title,
+                "status": r.status,
+                "evaluation_id": r.evaluation_id,
                 "created_at": r.created_at.isoformat() if r.created_at else None,
+                "html_key": r.html_key,
+                "pdf_key": r.pdf_key,
                 "presigned_html_url": html_url,
                 "presigned_pdf_url": pdf_url,
             }
         )
     return out
 
+
 @router.delete("/{project_id}/reports/{report_id}", status_code=204)
 def delete_report(
-    project_id: int, report_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+    project_id: int,
+    report_id: int,
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     proj = db.get(models.Project, project_id)
     if not proj:
@@ -150,6 +226,7 @@ def delete_report(
     try:
         if rep.pdf_key:
             delete_object(rep.pdf_key)
+            delete_object(f"{rep.pdf_key}.sha256")
     except Exception:
         pass
     db.delete(rep)
@@ -158,30 +235,54 @@ def delete_report(
 
 
 @router.get("/{project_id}/evaluations")
-def list_project_evaluations(
-    project_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+async def list_project_evaluations(
+    project_id: int,
+    request: Request,
+    response: Response,
+    status: str | None = Query(default=None),
+    scenario_id: int | None = Query(default=None),
+    artifact_id: int | None = Query(default=None),
+    rulepack_id: int | None = Query(default=None),
+    page: PageParams = Depends(page_params),
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    proj = db.get(models.Project, project_id)
+    proj = await db.get(models.Project, project_id)
     if not proj:
         raise HTTPException(status_code=404, detail="Not found")
     if "superadmin" not in (current.roles or []) and proj.org_id != current.org_id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    scen_ids = [
-        s.id
-        for s in db.query(models.SimulationScenario).filter(models.SimulationScenario.project_id == project_id).all()
-    ]
-    if not scen_ids:
-        return []
-    runs = (
-        db.query(models.EvaluationRun)
-        .filter(models.EvaluationRun.scenario_id.in_(scen_ids))
-        .order_by(models.EvaluationRun.id.desc())
-        .all()
+    stmt = (
+        select(models.EvaluationRun)
+        .join(
+            models.SimulationScenario,
+            models.SimulationScenario.id == models.EvaluationRun.scenario_id,
+        )
+        .filter(models.SimulationScenario.project_id == project_id)
+    )
+    if status is not None:
+        stmt = stmt.filter(models.EvaluationRun.status == status)
+    if scenario_id is not None:
+        stmt = stmt.filter(models.EvaluationRun.scenario_id == scenario_id)
+    if artifact_id is not None:
+        stmt = stmt.filter(models.EvaluationRun.artifact_id == artifact_id)
+    if rulepack_id is not None:
+        stmt = stmt.filter(models.EvaluationRun.rulepack_id == rulepack_id)
+    runs = await paginate_async(
+        db,
+        stmt,
+        page,
+        models.EvaluationRun.id,
+        {"created_at": models.EvaluationRun.created_at},
+        request,
+        response,
     )
     return [
         {
             "id": r.id,
             "scenario_id": r.scenario_id,
+            "artifact_id": r.artifact_id,
+            "rulepack_id": r.rulepack_id,
             "status": r.status,
             "created_at": r.created_at.isoformat() if r.created_at else None,
             "metrics": r.metrics,
@@ -191,14 +292,20 @@ def list_project_evaluations(
 
 
 @router.get("/{project_id}/members", response_model=list[UserRead])
-def list_members(project_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)):
+def list_members(
+    project_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+):
     proj = db.get(models.Project, project_id)
     if not proj:
         raise HTTPException(status_code=404, detail="Not found")
     if "superadmin" not in (current.roles or []) and proj.org_id != current.org_id:
         raise HTTPException(status_code=403, detail="Forbidden")
     # join memberships to users
-    mids = db.query(models.ProjectMembership).filter(models.ProjectMembership.project_id == project_id).all()
+    mids = (
+        db.query(models.ProjectMembership)
+        .filter(models.ProjectMembership.project_id == project_id)
+        .all()
+    )
     user_ids = [m.user_id for m in mids]
     if not user_ids:
         return []
@@ -207,7 +314,12 @@ def list_members(project_id: int, current=Depends(get_current_user), db: Session
 
 
 @router.post("/{project_id}/members")
-def add_member(project_id: int, payload: dict, current=Depends(get_current_user), db: Session = Depends(get_db)):
+def add_member(
+    project_id: int,
+    payload: dict,
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     require_role(current, ["org_admin"])  # membership managed by org admin
     proj = db.get(models.Project, project_id)
     if not proj:
@@ -222,10 +334,14 @@ def add_member(project_id: int, payload: dict, current=Depends(get_current_user)
         raise HTTPException(status_code=404, detail="User not found")
     if user.org_id != proj.org_id:
         raise HTTPException(status_code=400, detail="User must be in same org")
-    existing = db.query(models.ProjectMembership).filter(
-        models.ProjectMembership.project_id == project_id,
-        models.ProjectMembership.user_id == uid,
-    ).first()
+    existing = (
+        db.query(models.ProjectMembership)
+        .filter(
+            models.ProjectMembership.project_id == project_id,
+            models.ProjectMembership.user_id == uid,
+        )
+        .first()
+    )
     if existing:
         return {"status": "ok", "added": False}
     db.add(models.ProjectMembership(project_id=project_id, user_id=uid))
@@ -234,17 +350,26 @@ def add_member(project_id: int, payload: dict, current=Depends(get_current_user)
 
 
 @router.delete("/{project_id}/members/{user_id}")
-def remove_member(project_id: int, user_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)):
+def remove_member(
+    project_id: int,
+    user_id: int,
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     require_role(current, ["org_admin"])  # membership managed by org admin
     proj = db.get(models.Project, project_id)
     if not proj:
         raise HTTPException(status_code=404, detail="Not found")
     if "superadmin" not in (current.roles or []) and proj.org_id != current.org_id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    m = db.query(models.ProjectMembership).filter(
-        models.ProjectMembership.project_id == project_id,
-        models.ProjectMembership.user_id == user_id,
-    ).first()
+    m = (
+        db.query(models.ProjectMembership)
+        .filter(
+            models.ProjectMembership.project_id == project_id,
+            models.ProjectMembership.user_id == user_id,
+        )
+        .first()
+    )
     if not m:
         return {"status": "ok", "removed": False}
     db.delete(m)
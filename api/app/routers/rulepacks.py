@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
-from ..db import get_db
-from ..dependencies import get_current_user
+from ..db import get_async_db, get_db
+from ..dependencies import get_current_user, get_current_user_async
+from ..pagination import PageParams, name_filter, page_params, paginate_async
 from ..rbac import require_role
+from ..rollups import dashboard
 from ..schemas import RulePackCreate, RulePackRead
 from ..persistence import save_rulepack_json, delete_rulepack_json
 
@@ -14,12 +20,35 @@ router = APIRouter(prefix="/api/v1/rulepacks", tags=["rulepacks"])
 
 
 @router.get("", response_model=list[RulePackRead])
-def list_rulepacks(current=Depends(get_current_user), db: Session = Depends(get_db)):
-    q = db.query(models.RulePack)
-    if "superadmin" in (current.roles or []):
-        items = q.all()
-    else:
-        items = q.filter(models.RulePack.org_id == current.org_id).all()
+async def list_rulepacks(
+    request: Request,
+    response: Response,
+    q: str | None = Query(default=None, description="Name contains"),
+    page: PageParams = Depends(page_params),
+    name: str | None = Query(default=None, description="Exact name"),
+    version: str | None = Query(default=None),
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = select(models.RulePack)
+    if "superadmin" not in (current.roles or []):
+        stmt = stmt.filter(models.RulePack.org_id == current.org_id)
+    if q:
+        stmt = stmt.filter(name_filter(models.RulePack.name, q))
+    if name is not None:
+        stmt = stmt.filter(models.RulePack.name == name)
+    if version is not None:
+        stmt = stmt.filter(models.RulePack.version == version)
+    items = await paginate_async(
+        db,
+        stmt,
+        page,
+        models.RulePack.id,
+        {"name": models.RulePack.name, "created_at": models.RulePack.created_at},
+        request,
+        response,
+        default_sort="id",
+    )
     return [RulePackRead.model_validate(x) for x in items]
 
 
@@ -63,6 +92,39 @@ def get_rulepack(
     return RulePackRead.model_validate(item)
 
 
+@router.get("/{pack_id}/dashboard")
+def rulepack_dashboard(
+    pack_id: int,
+    since: date | None = Query(default=None, description="First day (UTC)"),
+    until: date | None = Query(
+        default=None, description="Last day (UTC), default today"
+    ),
+    org_id: int | None = Query(
+        default=None, description="Superadmin: org, default the pack's"
+    ),
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Run counts, score mean/percentiles and rule pass rates per day.
+
+    Only runs of the caller's org are counted.
+    """
+    item = db.get(models.RulePack, pack_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Not found")
+    if "superadmin" in (current.roles or []):
+        org_id = org_id if org_id is not None else item.org_id
+    elif item.org_id != current.org_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    else:
+        org_id = current.org_id
+    return {
+        "rulepack_id": pack_id,
+        "org_id": org_id,
+        **dashboard(db, models.RulePackRollup, (pack_id, org_id), since, until),
+    }
+
+
 @router.delete("/{pack_id}", status_code=204)
 def delete_rulepack(
     pack_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
@@ -72,7 +134,9 @@ def delete_rulepack(
         raise HTTPException(status_code=404, detail="Not found")
     if "superadmin" not in (current.roles or []) and item.org_id != current.org_id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    require_role(current, ["org_admin", "researcher"])  # delete allowed to org admins/researchers
+    require_role(
+        current, ["org_admin", "researcher"]
+    )  # delete allowed to org admins/researchers
     db.delete(item)
     db.commit()
     try:
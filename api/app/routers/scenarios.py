@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
-from ..db import get_db
-from ..dependencies import get_current_user
+from ..db import get_async_db, get_db
+from ..dependencies import get_current_user, get_current_user_async
+from ..pagination import PageParams, name_filter, page_params, paginate_async
 from ..rbac import require_role
 from ..schemas import SimulationScenarioCreate, SimulationScenarioRead
+from ..scoping import authorize_project, authorize_project_async, scoped_scenario
 
 
 router = APIRouter(prefix="/api/v1/scenarios", tags=["scenarios"])
@@ -20,11 +24,9 @@ def create_scenario(
     db: Session = Depends(get_db),
 ):
     # Validate project exists and belongs to user's org (unless superadmin)
-    project = db.get(models.Project, payload.project_id)
-    if not project:
-        raise HTTPException(status_code=400, detail="Invalid project_id")
-    if "superadmin" not in (current.roles or []) and project.org_id != current.org_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
+    authorize_project(
+        db, payload.project_id, current, detail="Invalid project_id", status_code=400
+    )
 
     require_role(current, ["org_admin", "designer", "researcher"])  # can create
 
@@ -40,67 +42,59 @@ def create_scenario(
 
 
 @router.get("/{scenario_id}", response_model=SimulationScenarioRead)
-def get_scenario(
-    scenario_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
-):
-    scen = db.get(models.SimulationScenario, scenario_id)
-    if not scen:
-        raise HTTPException(status_code=404, detail="Not found")
-    proj = db.get(models.Project, scen.project_id)
-    if "superadmin" not in (current.roles or []) and (
-        not proj or proj.org_id != current.org_id
-    ):
-        raise HTTPException(status_code=403, detail="Forbidden")
+def get_scenario(scen: models.SimulationScenario = Depends(scoped_scenario)):
     return SimulationScenarioRead.model_validate(scen)
 
 
 @router.get("", response_model=list[SimulationScenarioRead])
-def list_scenarios(
+async def list_scenarios(
+    request: Request,
+    response: Response,
     project_id: int | None = Query(default=None),
-    current=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    q: str | None = Query(default=None, description="Name contains"),
+    page: PageParams = Depends(page_params),
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    q = db.query(models.SimulationScenario)
+    stmt = select(models.SimulationScenario)
     if project_id is not None:
         # validate access to project
-        proj = db.get(models.Project, project_id)
-        if not proj:
-            raise HTTPException(status_code=400, detail="Invalid project_id")
-        if "superadmin" not in (current.roles or []) and proj.org_id != current.org_id:
-            raise HTTPException(status_code=403, detail="Forbidden")
-        items = q.filter(models.SimulationScenario.project_id == project_id).all()
-    else:
+        await authorize_project_async(
+            db, project_id, current, detail="Invalid project_id", status_code=400
+        )
+        stmt = stmt.filter(models.SimulationScenario.project_id == project_id)
+    elif "superadmin" not in (current.roles or []):
         # list all scenarios in user's org by joining via project
-        if "superadmin" in (current.roles or []):
-            items = q.all()
-        else:
-            # get projects for org
-            proj_ids = [
-                p.id
-                for p in db.query(models.Project)
-                .filter(models.Project.org_id == current.org_id)
-                .all()
-            ]
-            if proj_ids:
-                items = q.filter(models.SimulationScenario.project_id.in_(proj_ids)).all()
-            else:
-                items = []
+        stmt = stmt.join(
+            models.Project, models.Project.id == models.SimulationScenario.project_id
+        ).filter(models.Project.org_id == current.org_id)
+    if q:
+        stmt = stmt.filter(name_filter(models.SimulationScenario.name, q))
+    items = await paginate_async(
+        db,
+        stmt,
+        page,
+        models.SimulationScenario.id,
+        {
+            "name": models.SimulationScenario.name,
+            "created_at": models.SimulationScenario.created_at,
+        },
+        request,
+        response,
+        default_sort="id",
+    )
     return [SimulationScenarioRead.model_validate(s) for s in items]
 
 
 @router.delete("/{scenario_id}", status_code=204)
 def delete_scenario(
-    scenario_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+    scen: models.SimulationScenario = Depends(scoped_scenario),
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
-    scen = db.get(models.SimulationScenario, scenario_id)
-    if not scen:
-        raise HTTPException(status_code=404, detail="Not found")
-    proj = db.get(models.Project, scen.project_id)
-    if "superadmin" not in (current.roles or []) and (
-        not proj or proj.org_id != current.org_id
-    ):
-        raise HTTPException(status_code=403, detail="Forbidden")
-    require_role(current, ["org_admin", "designer"])  # allow delete by org admin/designer
+    require_role(
+        current, ["org_admin", "designer"]
+    )  # allow delete by org admin/designer
     db.delete(scen)
     db.commit()
     return None
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
-from ..db import get_db
-from ..dependencies import get_current_user
+from ..db import get_async_db, get_db
+from ..dependencies import get_current_user, get_current_user_async
+from ..pagination import PageParams, name_filter, page_params, paginate_async
+from ..principals import invalidate_principal
 from ..rbac import require_role
 from ..schemas import UserRead
 from ..security import hash_password
@@ -20,18 +24,45 @@ def get_me(current=Depends(get_current_user)):
 
 
 @router.get("/users", response_model=list[UserRead])
-def list_users(current=Depends(get_current_user), db: Session = Depends(get_db)):
+async def list_users(
+    request: Request,
+    response: Response,
+    q: str | None = Query(default=None, description="Email contains"),
+    org_id: int | None = Query(default=None, description="Superadmin only"),
+    page: PageParams = Depends(page_params),
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
     # org_admin can list users in their org; superadmin lists all
+    stmt = select(models.User)
     if "superadmin" in (current.roles or []):
-        users = db.query(models.User).all()
+        if org_id is not None:
+            stmt = stmt.filter(models.User.org_id == org_id)
     else:
         require_role(current, ["org_admin"])  # must be org admin to list
-        users = db.query(models.User).filter(models.User.org_id == current.org_id).all()
+        stmt = stmt.filter(models.User.org_id == current.org_id)
+    if q:
+        stmt = stmt.filter(name_filter(models.User.email, q))
+    users = await paginate_async(
+        db,
+        stmt,
+        page,
+        models.User.id,
+        {"email": models.User.email, "created_at": models.User.created_at},
+        request,
+        response,
+        default_sort="id",
+    )
     return [UserRead.model_validate(u) for u in users]
 
 
 @router.patch("/users/{user_id}/roles", response_model=UserRead)
-def set_roles(user_id: int, payload: dict, current=Depends(get_current_user), db: Session = Depends(get_db)):
+def set_roles(
+    user_id: int,
+    payload: dict,
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     # payload: {roles: [..]}
     roles = payload.get("roles")
     if not isinstance(roles, list):
@@ -49,12 +80,18 @@ def set_roles(user_id: int, payload: dict, current=Depends(get_current_user), db
     target.roles = roles
     db.add(target)
     db.commit()
+    invalidate_principal(target.id)
     db.refresh(target)
     return UserRead.model_validate(target)
 
 
 @router.patch("/users/{user_id}/password")
-def reset_password(user_id: int, payload: dict, current=Depends(get_current_user), db: Session = Depends(get_db)):
+def reset_password(
+    user_id: int,
+    payload: dict,
+    current=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     new_password = payload.get("password")
     if not new_password:
         raise HTTPException(status_code=400, detail="password required")
@@ -73,7 +110,9 @@ def reset_password(user_id: int, payload: dict, current=Depends(get_current_user
 
 
 @router.delete("/users/{user_id}", status_code=204)
-def delete_user(user_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)):
+def delete_user(
+    user_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+):
     target = db.get(models.User, user_id)
     if not target:
         raise HTTPException(status_code=404, detail="User not found")
@@ -86,7 +125,11 @@ def delete_user(user_id: int, current=Depends(get_current_user), db: Session = D
         if target.org_id != current.org_id:
             raise HTTPException(status_code=403, detail="Forbidden")
     # Null references in audit log to keep FK happy, then delete
-    db.query(models.AuditEvent).filter(models.AuditEvent.user_id == target.id).update({models.AuditEvent.user_id: None})
+    db.query(models.AuditEvent).filter(models.AuditEvent.user_id == target.id).update(
+        {models.AuditEvent.user_id: None}
+    )
+    target_id = target.id
     db.delete(target)
     db.commit()
+    invalidate_principal(target_id)
     return None
@@ -0,0 +1,74 @@
+"""Per-rule outcomes of finished runs, kept narrow for aggregate queries.
+
+``results_json`` stays the source of truth for a run; ``rule_results`` is a
+write-once projection of its ``rules`` list so "how often does rule X fail"
+is an index scan instead of a JSON parse of every run. Rows carry their
+run's org, project and finish time, so analytics filter and group without
+joining back to runs, scenarios and projects.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from . import models
+
+
+def scenario_owners(
+    db: Session, scenario_ids: Iterable[int]
+) -> Dict[int, Tuple[int, int]]:
+    """Map scenario id -> (project id, org id) in one query."""
+    ids = set(scenario_ids)
+    if not ids:
+        return {}
+    return {
+        scenario_id: (project_id, org_id)
+        for scenario_id, project_id, org_id in db.query(
+            models.SimulationScenario.id, models.Project.id, models.Project.org_id
+        )
+        .join(models.Project, models.Project.id == models.SimulationScenario.project_id)
+        .filter(models.SimulationScenario.id.in_(ids))
+    }
+
+
+def record_rule_results(db: Session, runs: Iterable[models.EvaluationRun]) -> None:
+    """Replace the rule rows of the given runs; only ``done`` runs get rows.
+
+    One DELETE and one multi-row INSERT for the whole set; the caller
+    commits together with the run rows.
+    """
+    runs = [r for r in runs if r.id is not None]
+    if not runs:
+        return
+    db.execute(
+        delete(models.RuleResult).where(
+            models.RuleResult.run_id.in_([r.id for r in runs])
+        )
+    )
+    done = [r for r in runs if r.status == "done"]
+    owners = scenario_owners(db, {r.scenario_id for r in done})
+    rows = []
+    for run in done:
+        owner = owners.get(run.scenario_id)
+        if owner is None:
+            continue
+        project_id, org_id = owner
+        completed_at = run.completed_at or datetime.now(timezone.utc)
+        for entry in (run.results_json or {}).get("rules") or []:
+            rows.append(
+                {
+                    "run_id": run.id,
+                    "org_id": org_id,
+                    "project_id": project_id,
+                    "completed_at": completed_at,
+                    "rule_id": str(entry.get("id"))[:255],
+                    "passed": bool(entry.get("passed")),
+                    "severity": entry.get("severity"),
+                }
+            )
+    if rows:
+        db.execute(insert(models.RuleResult), rows)
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
 import ast
+import hashlib
+import json
+import operator
+import threading
+from collections import ChainMap, OrderedDict
 from dataclasses import dataclass
-from typing import Any, Mapping
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Hashable, Iterable, Mapping
+
+import numpy as np
+
+from .config import settings
 
 ALLOWED_BINOPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow)
 ALLOWED_CMPOPS = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
@@ -14,133 +25,170 @@ class UnsafeExpression(Exception):
     pass
 
 
-def _eval_node(node: ast.AST, vars: Mapping[str, Any]) -> Any:
+DISALLOWED_NODES = (
+    ast.Call,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Dict,
+    ast.List,
+    ast.Tuple,
+    ast.Lambda,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+    ast.Import,
+    ast.ImportFrom,
+    ast.Assign,
+    ast.AugAssign,
+    ast.While,
+    ast.For,
+    ast.With,
+    ast.If,
+    ast.FunctionDef,
+    ast.ClassDef,
+    ast.Delete,
+    ast.Yield,
+    ast.YieldFrom,
+    ast.Global,
+    ast.Nonlocal,
+    ast.Raise,
+    ast.Try,
+    ast.Assert,
+)
+
+_UNARY_FUNCS: dict[type, Callable[[Any], Any]] = {
+    ast.Not: operator.not_,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+_BINOP_FUNCS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_CMPOP_FUNCS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+Evaluator = Callable[[Mapping[str, Any]], Any]
+
+
+def parse_condition(expr: str) -> ast.Expression:
+    # Normalize common non-Python logical operators used in rule JSON
+    # e.g. use of '&&' / '||' from C/JS style.
+    normalized = expr.replace("&&", " and ").replace("||", " or ").strip()
+    tree = ast.parse(normalized, mode="eval")
+    # Ensure no dangerous nodes present
+    for n in ast.walk(tree):
+        if isinstance(n, DISALLOWED_NODES):
+            raise UnsafeExpression("Disallowed syntax in expression")
+    return tree
+
+
+def _compile_node(node: ast.AST) -> Evaluator:
+    """Turn a whitelisted AST node into a closure over its compiled children.
+
+    Dispatch on node/operator type happens once here instead of on every
+    evaluation, so the returned callable only does the arithmetic.
+    """
     if isinstance(node, ast.Expression):
-        return _eval_node(node.body, vars)
+        return _compile_node(node.body)
     if isinstance(node, ast.Constant):
         if isinstance(node.value, (int, float, bool)):
-            return node.value
+            value = node.value
+            return lambda vars: value
         raise UnsafeExpression("Only numeric and boolean constants allowed")
     if isinstance(node, ast.Name):
-        if node.id in vars:
-            val = vars[node.id]
-            if isinstance(val, (int, float, bool)):
-                return val
-            raise UnsafeExpression("Variable values must be numeric or boolean")
-        raise UnsafeExpression(f"Unknown variable: {node.id}")
+        name = node.id
+
+        def _name(vars: Mapping[str, Any]) -> Any:
+            if name in vars:
+                val = vars[name]
+                if isinstance(val, (int, float, bool)):
+                    return val
+                raise UnsafeExpression("Variable values must be numeric or boolean")
+            raise UnsafeExpression(f"Unknown variable: {name}")
+
+        return _name
     if isinstance(node, ast.UnaryOp) and isinstance(node.op, ALLOWED_UNARYOPS):
-        operand = _eval_node(node.operand, vars)
-        if isinstance(node.op, ast.Not):
-            return not bool(operand)
-        if isinstance(node.op, ast.USub):
-            return -operand
-        if isinstance(node.op, ast.UAdd):
-            return +operand
+        unary = _UNARY_FUNCS[type(node.op)]
+        operand = _compile_node(node.operand)
+        return lambda vars: unary(operand(vars))
     if isinstance(node, ast.BinOp) and isinstance(node.op, ALLOWED_BINOPS):
-        left = _eval_node(node.left, vars)
-        right = _eval_node(node.right, vars)
-        if isinstance(node.op, ast.Add):
-            return left + right
-        if isinstance(node.op, ast.Sub):
-            return left - right
-        if isinstance(node.op, ast.Mult):
-            return left * right
-        if isinstance(node.op, ast.Div):
-            return left / right
-        if isinstance(node.op, ast.Mod):
-            return left % right
-        if isinstance(node.op, ast.Pow):
-            return left**right
+        binop = _BINOP_FUNCS[type(node.op)]
+        left = _compile_node(node.left)
+        right = _compile_node(node.right)
+        return lambda vars: binop(left(vars), right(vars))
     if isinstance(node, ast.BoolOp) and isinstance(node.op, ALLOWED_BOOLOPS):
-        values = [_eval_node(v, vars) for v in node.values]
+        # All operands are evaluated (no short-circuit) so that unknown or
+        # invalid variables anywhere in the expression still surface.
+        values = [_compile_node(v) for v in node.values]
         if isinstance(node.op, ast.And):
-            result = True
-            for v in values:
-                result = result and bool(v)
-            return result
-        if isinstance(node.op, ast.Or):
-            result = False
-            for v in values:
-                result = result or bool(v)
-            return result
+            return lambda vars: all([bool(v(vars)) for v in values])
+        return lambda vars: any([bool(v(vars)) for v in values])
     if isinstance(node, ast.Compare):
-        left = _eval_node(node.left, vars)
+        first = _compile_node(node.left)
+        pairs = []
         for op, comparator in zip(node.ops, node.comparators):
-            right = _eval_node(comparator, vars)
-            ok = None
-            if isinstance(op, ast.Eq):
-                ok = left == right
-            elif isinstance(op, ast.NotEq):
-                ok = left != right
-            elif isinstance(op, ast.Lt):
-                ok = left < right
-            elif isinstance(op, ast.LtE):
-                ok = left <= right
-            elif isinstance(op, ast.Gt):
-                ok = left > right
-            elif isinstance(op, ast.GtE):
-                ok = left >= right
-            else:
+            cmpop = _CMPOP_FUNCS.get(type(op))
+            if cmpop is None:
                 raise UnsafeExpression("Comparison operator not allowed")
-            if not ok:
-                return False
-            left = right
-        return True
+            pairs.append((cmpop, _compile_node(comparator)))
+        if len(pairs) == 1:
+            cmpop, second = pairs[0]
+            return lambda vars: bool(cmpop(first(vars), second(vars)))
+
+        def _compare(vars: Mapping[str, Any]) -> bool:
+            left = first(vars)
+            for cmpop, comparator in pairs:
+                right = comparator(vars)
+                if not cmpop(left, right):
+                    return False
+                left = right
+            return True
+
+        return _compare
     raise UnsafeExpression(
         f"Disallowed expression: {ast.dump(node, include_attributes=False)}"
     )
 
 
+@lru_cache(maxsize=1024)
+def compile_condition(expr: str) -> Callable[[Mapping[str, Any]], bool]:
+    """Parse, validate and compile a rule condition into a reusable callable.
+
+    Results are memoized by expression text, so identical conditions shared
+    across rules or rulepacks are compiled once per process.
+    """
+    evaluator = _compile_node(parse_condition(expr))
+
+    def condition(variables: Mapping[str, Any]) -> bool:
+        result = evaluator(variables)
+        if not isinstance(result, (bool, int, float)):
+            raise UnsafeExpression("Expression must evaluate to a boolean or number")
+        return bool(result)
+
+    return condition
+
+
 def evaluate_condition(expr: str, variables: Mapping[str, Any]) -> bool:
-    # Normalize common non-Python logical operators used in rule JSON
-    # e.g. use of '&&' / '||' from C/JS style.
-    normalized = (
-        expr.replace("&&", " and ")
-        .replace("||", " or ")
-        .strip()
-    )
-    tree = ast.parse(normalized, mode="eval")
-    # Ensure no dangerous nodes present
-    for n in ast.walk(tree):
-        if isinstance(
-            n,
-            (
-                ast.Call,
-                ast.Attribute,
-                ast.Subscript,
-                ast.Dict,
-                ast.List,
-                ast.Tuple,
-                ast.Lambda,
-                ast.ListComp,
-                ast.SetComp,
-                ast.DictComp,
-                ast.GeneratorExp,
-                ast.Import,
-                ast.ImportFrom,
-                ast.Assign,
-                ast.AugAssign,
-                ast.While,
-                ast.For,
-                ast.With,
-                ast.If,
-                ast.FunctionDef,
-                ast.ClassDef,
-                ast.Delete,
-                ast.Yield,
-                ast.YieldFrom,
-                ast.Global,
-                ast.Nonlocal,
-                ast.Raise,
-                ast.Try,
-                ast.Assert,
-            ),
-        ):
-            raise UnsafeExpression("Disallowed syntax in expression")
-    result = _eval_node(tree, variables)
-    if not isinstance(result, (bool, int, float)):
-        raise UnsafeExpression("Expression must evaluate to a boolean or number")
-    return bool(result)
+    return compile_condition(expr)(variables)
+
+
+@lru_cache(maxsize=1024)
+def condition_variables(expr: str) -> frozenset[str]:
+    """Names a condition reads, found by static analysis of its AST."""
+    tree = parse_condition(expr)
+    return frozenset(n.id for n in ast.walk(tree) if isinstance(n, ast.Name))
 
 
 @dataclass
@@ -152,6 +200,61 @@ class RuleResult:
     details: dict
 
 
+def _raise_on_call(exc: Exception) -> Callable[[Mapping[str, Any]], bool]:
+    # Defer compile errors to evaluation time so one bad rule only fails itself
+    def condition(variables: Mapping[str, Any]) -> bool:
+        raise type(exc)(*exc.args)
+
+    return condition
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    rule: dict
+    id: str
+    severity: str
+    remediation: str | None
+    thresholds: Mapping[str, Any]
+    condition: Callable[[Mapping[str, Any]], bool]
+    # Variables declared by the rule JSON (used for scenario config overrides)
+    variables: tuple[str, ...] = ()
+    # Names the condition reads that its own thresholds don't provide
+    requires: frozenset[str] = frozenset()
+
+    def evaluate(self, inputs: Mapping[str, Any]) -> RuleResult:
+        # Thresholds shadow inputs; layered instead of copied into a new dict
+        variables = ChainMap(self.thresholds, inputs) if self.thresholds else inputs
+        passed = self.condition(variables)
+        return RuleResult(
+            id=self.id,
+            passed=bool(passed),
+            severity=self.severity,
+            remediation=self.remediation,
+            details={"variables": variables},
+        )
+
+
+def compile_rule(rule: dict) -> CompiledRule:
+    expr = rule.get("condition") or ""
+    thresholds = MappingProxyType(dict(rule.get("thresholds") or {}))
+    try:
+        condition = compile_condition(expr)
+        names = condition_variables(expr)
+    except (UnsafeExpression, SyntaxError) as exc:
+        condition = _raise_on_call(exc)
+        names = frozenset()
+    return CompiledRule(
+        rule=rule,
+        id=str(rule.get("id")),
+        severity=str(rule.get("severity", "info")),
+        remediation=rule.get("remediation"),
+        thresholds=thresholds,
+        condition=condition,
+        variables=tuple(str(v) for v in (rule.get("variables") or [])),
+        requires=names.difference(thresholds),
+    )
+
+
 def evaluate_rule(rule: dict, inputs: Mapping[str, Any]) -> RuleResult:
     """
     rule structure:
@@ -162,14 +265,245 @@ def evaluate_rule(rule: dict, inputs: Mapping[str, Any]) -> RuleResult:
      "condition": "button_width_mm >= min_mm and button_height_mm >= min_mm",
      "severity": "medium", "remediation": "Increase control size"}
     """
-    variables = dict(inputs)
-    variables.update(rule.get("thresholds") or {})
-    cond = rule.get("condition") or ""
-    passed = evaluate_condition(cond, variables)
-    return RuleResult(
-        id=str(rule.get("id")),
-        passed=bool(passed),
-        severity=str(rule.get("severity", "info")),
-        remediation=rule.get("remediation"),
-        details={"variables": variables},
+    return compile_rule(rule).evaluate(inputs)
+
+
+_VECTOR_UNARY_FUNCS: dict[type, Callable[[Any], Any]] = {
+    ast.Not: np.logical_not,
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+}
+
+
+class _VectorScope(dict):
+    """Columns of one batch evaluation, collecting rows whose arithmetic failed."""
+
+    invalid: Any = False
+
+
+def _compile_vector_node(node: ast.AST) -> Evaluator:
+    """Array counterpart of ``_compile_node``: same whitelist, element-wise ops.
+
+    Evaluators take a mapping of column name -> 1-D array (or scalar) and
+    return an array/scalar that broadcasts against the row axis.
+    """
+    if isinstance(node, ast.Expression):
+        return _compile_vector_node(node.body)
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, (int, float, bool)):
+            value = node.value
+            return lambda cols: value
+        raise UnsafeExpression("Only numeric and boolean constants allowed")
+    if isinstance(node, ast.Name):
+        name = node.id
+
+        def _name(cols: Mapping[str, Any]) -> Any:
+            if name not in cols:
+                raise UnsafeExpression(f"Unknown variable: {name}")
+            val = np.asarray(cols[name])
+            if val.dtype.kind not in "biuf":
+                raise UnsafeExpression("Variable values must be numeric or boolean")
+            return val
+
+        return _name
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ALLOWED_UNARYOPS):
+        unary = _VECTOR_UNARY_FUNCS[type(node.op)]
+        operand = _compile_vector_node(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda cols: unary(np.asarray(operand(cols), dtype=bool))
+        return lambda cols: unary(operand(cols))
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ALLOWED_BINOPS):
+        binop = _BINOP_FUNCS[type(node.op)]
+        left = _compile_vector_node(node.left)
+        right = _compile_vector_node(node.right)
+
+        def _binop(cols: Mapping[str, Any]) -> Any:
+            lhs = np.asarray(left(cols), dtype=float)
+            rhs = np.asarray(right(cols), dtype=float)
+            out = binop(lhs, rhs)
+            # x / 0, 0 ** -1, overflow: rows the scalar evaluator raises for
+            bad = ~np.isfinite(out) & np.isfinite(lhs) & np.isfinite(rhs)
+            if isinstance(cols, _VectorScope) and bad.any():
+                cols.invalid = np.logical_or(cols.invalid, bad)
+            return out
+
+        return _binop
+    if isinstance(node, ast.BoolOp) and isinstance(node.op, ALLOWED_BOOLOPS):
+        values = [_compile_vector_node(v) for v in node.values]
+        reduce = (
+            np.logical_and.reduce
+            if isinstance(node.op, ast.And)
+            else np.logical_or.reduce
+        )
+        return lambda cols: reduce(
+            np.broadcast_arrays(*[np.asarray(v(cols), dtype=bool) for v in values])
+        )
+    if isinstance(node, ast.Compare):
+        first = _compile_vector_node(node.left)
+        pairs = []
+        for op, comparator in zip(node.ops, node.comparators):
+            cmpop = _CMPOP_FUNCS.get(type(op))
+            if cmpop is None:
+                raise UnsafeExpression("Comparison operator not allowed")
+            pairs.append((cmpop, _compile_vector_node(comparator)))
+
+        def _compare(cols: Mapping[str, Any]) -> Any:
+            # a < b < c  ->  (a < b) & (b < c), each operand evaluated once
+            left = first(cols)
+            result: Any = True
+            for cmpop, comparator in pairs:
+                right = comparator(cols)
+                result = np.logical_and(result, cmpop(left, right))
+                left = right
+            return result
+
+        return _compare
+    raise UnsafeExpression(
+        f"Disallowed expression: {ast.dump(node, include_attributes=False)}"
     )
+
+
+@lru_cache(maxsize=1024)
+def compile_condition_vectorized(expr: str) -> Evaluator:
+    return _compile_vector_node(parse_condition(expr))
+
+
+@dataclass
+class BatchRuleResult:
+    ids: list[str]
+    # Boolean matrix of shape (len(ids), rows)
+    passed: np.ndarray
+    # Rules that could not be evaluated (unknown variables, unsafe syntax);
+    # their rows in ``passed`` are all False, as in ``run_evaluation``.
+    errors: dict[str, str]
+    # Rows where a rule's arithmetic failed (division by zero, overflow), which
+    # ``evaluate_rule`` raises for; also False in ``passed``.
+    row_errors: np.ndarray
+
+
+def evaluate_rules_batch(
+    rules: Iterable[dict] | CompiledRulePack,
+    columns: Mapping[str, Any],
+    rows: int | None = None,
+) -> BatchRuleResult:
+    """Evaluate every rule against many input rows in one vectorized pass.
+
+    ``columns`` maps variable names to 1-D NumPy arrays (one entry per design
+    variant or virtual user) or to scalars shared by all rows. Rule
+    thresholds are layered on top as scalars. Returns a rules x rows pass
+    matrix.
+    """
+    if isinstance(rules, CompiledRulePack):
+        rule_dicts = [r.rule for r in rules.rules]
+    else:
+        rule_dicts = [r for r in rules if isinstance(r, dict)]
+    cols = {k: np.asarray(v) for k, v in columns.items()}
+    if rows is None:
+        sizes = {v.shape[0] for v in cols.values() if v.ndim == 1}
+        if len(sizes) > 1:
+            raise ValueError("All input columns must have the same length")
+        rows = sizes.pop() if sizes else 1
+
+    ids: list[str] = []
+    errors: dict[str, str] = {}
+    passed = np.zeros((len(rule_dicts), rows), dtype=bool)
+    row_errors = np.zeros_like(passed)
+    for i, rule in enumerate(rule_dicts):
+        rid = str(rule.get("id"))
+        ids.append(rid)
+        scope = _VectorScope(cols)
+        thresholds = rule.get("thresholds") or {}
+        scope.update((k, np.asarray(v)) for k, v in thresholds.items())
+        try:
+            evaluator = compile_condition_vectorized(rule.get("condition") or "")
+            with np.errstate(all="ignore"):
+                result = np.asarray(evaluator(scope), dtype=bool)
+            row_errors[i] = np.broadcast_to(scope.invalid, (rows,))
+            passed[i] = np.broadcast_to(result, (rows,)) & ~row_errors[i]
+        except (UnsafeExpression, SyntaxError, TypeError, ValueError) as exc:
+            errors[rid] = str(exc)
+    return BatchRuleResult(ids=ids, passed=passed, errors=errors, row_errors=row_errors)
+
+
+def rulepack_content_hash(rules: Any) -> str:
+    """Stable SHA-256 of a rulepack's ``rules`` JSON (key order independent)."""
+    canonical = json.dumps(rules, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledRulePack:
+    key: Hashable
+    rules: tuple[CompiledRule, ...]
+    # Union of input names required by any rule, so callers resolve only these
+    requires: frozenset[str] = frozenset()
+
+
+def compile_rulepack(
+    rules: Mapping[str, Any] | None, key: Hashable = None
+) -> CompiledRulePack:
+    entries = (rules or {}).get("rules") or []
+    compiled = tuple(compile_rule(r) for r in entries if isinstance(r, dict))
+    return CompiledRulePack(
+        key=key,
+        rules=compiled,
+        requires=frozenset().union(*(r.requires for r in compiled)),
+    )
+
+
+class RulePackCache:
+    """Thread-safe LRU of compiled rulepacks.
+
+    Keys combine the rulepack id, its version pin and the row's
+    ``updated_at``, which every edit bumps, so edits never hit a stale entry
+    and no explicit invalidation is needed. Packs without an id or
+    ``updated_at`` (not saved yet) are keyed on a hash of their content.
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[Hashable, CompiledRulePack] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        rulepack_id: int | None,
+        version: str | None,
+        rules: Mapping[str, Any] | None,
+        updated_at: Any = None,
+    ) -> CompiledRulePack:
+        if rulepack_id is not None and updated_at is not None:
+            key: Hashable = (rulepack_id, version, updated_at)
+        else:
+            key = (rulepack_id, version, rulepack_content_hash(rules))
+        with self._lock:
+            pack = self._items.get(key)
+            if pack is not None:
+                self._items.move_to_end(key)
+                return pack
+        pack = compile_rulepack(rules, key=key)
+        with self._lock:
+            self._items[key] = pack
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return pack
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+compiled_rulepacks = RulePackCache(maxsize=settings.rulepack_cache_size)
+
+
+def get_compiled_rulepack(
+    rulepack_id: int | None,
+    version: str | None,
+    rules: Mapping[str, Any] | None,
+    updated_at: Any = None,
+) -> CompiledRulePack:
+    return compiled_rulepacks.get(rulepack_id, version, rules, updated_at)
@@ -90,6 +90,7 @@ class DesignArtifactRead(DesignArtifactCreate):
     params_key: Optional[str] = None
     object_mime: Optional[str] = None
     size_bytes: Optional[int] = None
+    sha256: Optional[str] = None
     presigned_url: Optional[str] = None
 
     class Config:
@@ -111,6 +112,38 @@ class AnthropometricDatasetRead(AnthropometricDatasetCreate):
         from_attributes = True
 
 
+class PercentileQuery(BaseModel):
+    metric: str
+    percentile: float = Field(ge=0, le=100)
+    region: Optional[str] = None
+    sex: Optional[str] = None
+    age: Optional[str] = None
+
+
+class PercentileCartesian(BaseModel):
+    # Every combination of the listed values is queried; omitted segment
+    # dimensions are left unfiltered.
+    metrics: List[str] = Field(min_length=1)
+    percentiles: List[float] = Field(min_length=1)
+    regions: List[Optional[str]] = [None]
+    sexes: List[Optional[str]] = [None]
+    ages: List[Optional[str]] = [None]
+
+
+class PercentileBatchRequest(BaseModel):
+    queries: List[PercentileQuery] = []
+    cartesian: Optional[PercentileCartesian] = None
+
+
+class PercentileBatchItem(PercentileQuery):
+    value: Optional[float] = None
+    error: Optional[str] = None
+
+
+class PercentileBatchResponse(BaseModel):
+    results: List[PercentileBatchItem]
+
+
 class AbilityProfileCreate(BaseModel):
     org_id: int
     name: str
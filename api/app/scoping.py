@@ -0,0 +1,151 @@
+"""Org-scoped loading of project-owned entities.
+
+Each lookup fetches the entity together with its project's id and
+``org_id`` in a single statement (outer-joined through the scenario for
+evaluation runs), so "missing" (404) and "other org" (403) are told apart
+without follow-up ``db.get`` round trips. The ``scoped_*`` functions are
+FastAPI dependencies for routes keyed by the entity id.
+"""
+
+from __future__ import annotations
+
+from typing import Any, NamedTuple, Optional
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import models
+from .db import get_async_db, get_db
+from .dependencies import get_current_user, get_current_user_async
+
+
+class ScopedRow(NamedTuple):
+    entity: Any
+    project_id: Optional[int]
+    org_id: Optional[int]
+
+
+def _scoped_select(model):
+    project = models.Project
+    if model is project:
+        return select(project, project.id, project.org_id)
+    stmt = select(model, project.id, project.org_id)
+    if model is models.EvaluationRun:
+        scenario = models.SimulationScenario
+        return stmt.outerjoin(scenario, scenario.id == model.scenario_id).outerjoin(
+            project, project.id == scenario.project_id
+        )
+    return stmt.outerjoin(project, project.id == model.project_id)
+
+
+def scoped_row(db: Session, model, entity_id: int) -> Optional[ScopedRow]:
+    """The entity with its project id/org, or None if it does not exist."""
+    row = db.execute(_scoped_select(model).where(model.id == entity_id)).first()
+    return ScopedRow(*row) if row else None
+
+
+async def scoped_row_async(
+    db: AsyncSession, model, entity_id: int
+) -> Optional[ScopedRow]:
+    row = (await db.execute(_scoped_select(model).where(model.id == entity_id))).first()
+    return ScopedRow(*row) if row else None
+
+
+def check_org(current, row: ScopedRow) -> None:
+    """403 unless the caller is superadmin or in the owning project's org."""
+    if "superadmin" not in (current.roles or []) and (
+        row.project_id is None or row.org_id != current.org_id
+    ):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+def _authorized(current, row: Optional[ScopedRow], detail: str, status_code: int):
+    if row is None:
+        raise HTTPException(status_code=status_code, detail=detail)
+    check_org(current, row)
+    return row.entity
+
+
+def load_scoped(
+    db: Session,
+    model,
+    entity_id: int,
+    current,
+    detail: str = "Not found",
+    status_code: int = 404,
+):
+    return _authorized(current, scoped_row(db, model, entity_id), detail, status_code)
+
+
+async def load_scoped_async(
+    db: AsyncSession,
+    model,
+    entity_id: int,
+    current,
+    detail: str = "Not found",
+    status_code: int = 404,
+):
+    row = await scoped_row_async(db, model, entity_id)
+    return _authorized(current, row, detail, status_code)
+
+
+def _project_org_select(project_id: int):
+    project = models.Project
+    return select(project.id, project.org_id).where(project.id == project_id)
+
+
+def _project_row(row) -> Optional[ScopedRow]:
+    return ScopedRow(None, row.id, row.org_id) if row else None
+
+
+def authorize_project(
+    db: Session,
+    project_id: int,
+    current,
+    detail: str = "Not found",
+    status_code: int = 404,
+) -> None:
+    """Scope check by project id, reading only its ``org_id``."""
+    row = db.execute(_project_org_select(project_id)).first()
+    _authorized(current, _project_row(row), detail, status_code)
+
+
+async def authorize_project_async(
+    db: AsyncSession,
+    project_id: int,
+    current,
+    detail: str = "Not found",
+    status_code: int = 404,
+) -> None:
+    row = (await db.execute(_project_org_select(project_id))).first()
+    _authorized(current, _project_row(row), detail, status_code)
+
+
+def scoped_run(
+    evaluation_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+) -> models.EvaluationRun:
+    return load_scoped(db, models.EvaluationRun, evaluation_id, current)
+
+
+async def scoped_run_async(
+    evaluation_id: int,
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> models.EvaluationRun:
+    return await load_scoped_async(db, models.EvaluationRun, evaluation_id, current)
+
+
+def scoped_scenario(
+    scenario_id: int, current=Depends(get_current_user), db: Session = Depends(get_db)
+) -> models.SimulationScenario:
+    return load_scoped(db, models.SimulationScenario, scenario_id, current)
+
+
+async def scoped_artifact_async(
+    artifact_id: int,
+    current=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> models.DesignArtifact:
+    return await load_scoped_async(db, models.DesignArtifact, artifact_id, current)
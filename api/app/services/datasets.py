@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
 
 """
 distributions_json structure:
@@ -57,7 +61,18 @@ def _choose_segment(
     return best
 
 
-def interpolate_percentile(p5: float, p50: float, p95: float, p: float) -> float:
+def interpolate_percentile(p5: float, p50: float, p95: float, p: Any) -> Any:
+    """Piecewise-linear inverse CDF through (5, p5), (50, p50), (95, p95).
+
+    Any argument may be a NumPy array (the result broadcasts), which lets
+    simulations and batch queries interpolate many values in one call.
+    """
+    if any(isinstance(x, np.ndarray) for x in (p5, p50, p95, p)):
+        # Same piecewise formula, broadcast over arrays of knots and/or p
+        pc = np.clip(p, 5.0, 95.0)
+        lower = pc <= 50.0
+        t = np.where(lower, pc - 5.0, pc - 50.0) / 45.0
+        return np.where(lower, p5 + t * (p50 - p5), p50 + t * (p95 - p50))
     if p <= 5:
         return p5
     if p >= 95:
@@ -71,15 +86,15 @@ def interpolate_percentile(p5: float, p50: float, p95: float, p: float) -> float
         return p50 + t * (p95 - p50)
 
 
-def query_percentile(
+def segment_percentiles(
     distributions: Dict[str, list[dict]],
     metric: str,
-    percentile: float,
     *,
     region: Optional[str] = None,
     sex: Optional[str] = None,
     age: Optional[str] = None,
-) -> float:
+) -> Tuple[float, float, float]:
+    """Return (p5, p50, p95) of the best-matching segment for ``metric``."""
     entries = distributions.get(metric) or []
     if not entries:
         raise KeyError(f"Metric not found: {metric}")
@@ -94,7 +109,245 @@ def query_percentile(
         except Exception as exc:  # pragma: no cover - defensive
             raise KeyError(f"Missing or invalid percentile {name}") from exc
 
-    p5 = _as_float(ps.get("p5"), "p5")
-    p50 = _as_float(ps.get("p50"), "p50")
-    p95 = _as_float(ps.get("p95"), "p95")
+    return (
+        _as_float(ps.get("p5"), "p5"),
+        _as_float(ps.get("p50"), "p50"),
+        _as_float(ps.get("p95"), "p95"),
+    )
+
+
+def query_percentile(
+    distributions: Dict[str, list[dict]],
+    metric: str,
+    percentile: float,
+    *,
+    region: Optional[str] = None,
+    sex: Optional[str] = None,
+    age: Optional[str] = None,
+) -> float:
+    p5, p50, p95 = segment_percentiles(
+        distributions, metric, region=region, sex=sex, age=age
+    )
     return interpolate_percentile(p5, p50, p95, float(percentile))
+
+
+# ---------------------------------------------------------------------------
+# Precomputed segment index
+# ---------------------------------------------------------------------------
+
+_DIMS = ("region", "sex", "age")
+_WILDCARD = -1  # entry code for "all" (or missing key)
+_NO_MATCH = -2  # entry value that is neither "all" nor a hashable label
+# Resolve every (region, sex, age) combination ahead of time up to this many
+# cells per metric; beyond that, lookups are resolved on first use and memoized.
+PRECOMPUTE_MAX_CELLS = 1_000_000
+
+
+class MetricIndex:
+    """Best-segment lookup table for one metric.
+
+    A query label that no entry uses can only ever match wildcard entries,
+    exactly like an omitted filter, so each dimension collapses to
+    ``{None, "all"} | labels-present``. The ``_choose_segment`` scores for every
+    combination are computed with NumPy (argmax keeps the first best entry,
+    preserving its tie-breaking) and stored in a dense table.
+    """
+
+    def __init__(self, entries: list[dict[str, Any]]) -> None:
+        self.labels: list[dict[Any, int]] = []
+        columns = []
+        for dim in _DIMS:
+            labels: dict[Any, int] = {}
+            col = []
+            for e in entries:
+                v = e.get(dim, "all")
+                if v == "all":
+                    col.append(_WILDCARD)
+                    continue
+                try:
+                    col.append(labels.setdefault(v, len(labels)))
+                except TypeError:
+                    col.append(_NO_MATCH)
+            self.labels.append(labels)
+            columns.append(np.array(col, dtype=np.int64))
+        # Per dimension: score of each entry for each query row. Row 0 is no
+        # filter / unknown label, row 1 is a literal "all" (which matches
+        # wildcard entries exactly), rows 2.. are the labels present.
+        self._scores = []
+        for labels, col in zip(self.labels, columns):
+            wildcard = (col == _WILDCARD).astype(np.int8)
+            codes = np.arange(len(labels))[:, None]
+            exact = np.where(col == codes, 2, wildcard).astype(np.int8)
+            self._scores.append(np.vstack([wildcard, wildcard * 2, exact]))
+        self.percentiles = np.array(
+            [_percentile_row(e) for e in entries], dtype=float
+        ).reshape(len(entries), 3)
+        shape = tuple(len(labels) + 2 for labels in self.labels)
+        self._table: Optional[np.ndarray] = None
+        self._lazy: dict[Tuple[int, int, int], int] = {}
+        if entries and int(np.prod(shape)) <= PRECOMPUTE_MAX_CELLS:
+            region_s, sex_s, age_s = self._scores
+            table = np.empty(shape, dtype=np.int32)
+            for ri in range(shape[0]):
+                total = region_s[ri] + sex_s[:, None, :] + age_s[None, :, :]
+                table[ri] = total.argmax(axis=-1)
+            self._table = table
+
+    def _cell(self, region: Any, sex: Any, age: Any) -> Tuple[int, int, int]:
+        cell = []
+        for labels, q in zip(self.labels, (region, sex, age)):
+            code = None
+            if q:
+                try:
+                    code = -1 if q == "all" else labels.get(q)
+                except TypeError:
+                    code = None
+            cell.append(0 if code is None else code + 2)
+        return cell[0], cell[1], cell[2]
+
+    def segment(self, region: Any, sex: Any, age: Any) -> int:
+        cell = self._cell(region, sex, age)
+        if self._table is not None:
+            return int(self._table[cell])
+        seg = self._lazy.get(cell)
+        if seg is None:
+            total = sum(s[c] for s, c in zip(self._scores, cell))
+            seg = self._lazy[cell] = int(np.argmax(total))
+        return seg
+
+    def percentiles_for(
+        self, region: Any = None, sex: Any = None, age: Any = None
+    ) -> Tuple[float, float, float]:
+        row = self.percentiles[self.segment(region, sex, age)]
+        for name, val in zip(("p5", "p50", "p95"), row):
+            if np.isnan(val):
+                raise KeyError(f"Missing or invalid percentile {name}")
+        return float(row[0]), float(row[1]), float(row[2])
+
+
+def _percentile_row(entry: dict[str, Any]) -> list[float]:
+    ps = entry.get("percentiles") or {}
+    row = []
+    for name in ("p5", "p50", "p95"):
+        try:
+            row.append(float(ps.get(name)))
+        except Exception:
+            row.append(float("nan"))
+    return row
+
+
+class DatasetIndex:
+    """Per-dataset map of metric -> MetricIndex built from ``distributions``."""
+
+    def __init__(self, distributions: Dict[str, Any] | None) -> None:
+        self.metrics: dict[str, MetricIndex] = {}
+        for metric, entries in (distributions or {}).items():
+            if not isinstance(entries, list):
+                continue
+            segments = [e for e in entries if isinstance(e, dict)]
+            if segments:
+                self.metrics[metric] = MetricIndex(segments)
+
+    def __bool__(self) -> bool:
+        return bool(self.metrics)
+
+    def segment_percentiles(
+        self,
+        metric: str,
+        *,
+        region: Optional[str] = None,
+        sex: Optional[str] = None,
+        age: Optional[str] = None,
+    ) -> Tuple[float, float, float]:
+        idx = self.metrics.get(metric)
+        if idx is None:
+            raise KeyError(f"Metric not found: {metric}")
+        return idx.percentiles_for(region, sex, age)
+
+    def query(
+        self,
+        metric: str,
+        percentile: float,
+        *,
+        region: Optional[str] = None,
+        sex: Optional[str] = None,
+        age: Optional[str] = None,
+    ) -> float:
+        p5, p50, p95 = self.segment_percentiles(metric, region=region, sex=sex, age=age)
+        return interpolate_percentile(p5, p50, p95, float(percentile))
+
+    def query_many(
+        self, queries: list[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, list[Optional[str]]]:
+        """Evaluate many ``{metric, percentile, region?, sex?, age?}`` queries.
+
+        Segments are resolved through the precomputed tables and all values
+        are interpolated in one vectorized call. Returns the values (NaN where
+        a query failed) and a per-query error message (or None).
+        """
+        knots = np.full((len(queries), 3), np.nan)
+        errors: list[Optional[str]] = [None] * len(queries)
+        for i, q in enumerate(queries):
+            idx = self.metrics.get(str(q.get("metric")))
+            if idx is None:
+                errors[i] = f"Metric not found: {q.get('metric')}"
+                continue
+            seg = idx.segment(q.get("region"), q.get("sex"), q.get("age"))
+            row = idx.percentiles[seg]
+            missing = [n for n, v in zip(("p5", "p50", "p95"), row) if np.isnan(v)]
+            if missing:
+                errors[i] = f"Missing or invalid percentile {missing[0]}"
+                continue
+            knots[i] = row
+        ps = np.array([float(q.get("percentile", 0.0)) for q in queries])
+        values = interpolate_percentile(knots[:, 0], knots[:, 1], knots[:, 2], ps)
+        return values, errors
+
+
+class DatasetIndexCache:
+    """Thread-safe LRU of DatasetIndex keyed by (dataset id, updated_at)."""
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[Tuple[int, Any], DatasetIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        dataset_id: int,
+        updated_at: Any,
+        load_distributions: Callable[[], Dict[str, Any] | None],
+    ) -> DatasetIndex:
+        """Return the cached index, calling ``load_distributions`` only on a miss."""
+        index = self.peek(dataset_id, updated_at)
+        if index is None:
+            index = self.put(dataset_id, updated_at, load_distributions())
+        return index
+
+    def peek(self, dataset_id: int, updated_at: Any) -> DatasetIndex | None:
+        key = (dataset_id, updated_at)
+        with self._lock:
+            index = self._items.get(key)
+            if index is not None:
+                self._items.move_to_end(key)
+            return index
+
+    def put(
+        self, dataset_id: int, updated_at: Any, distributions: Dict[str, Any] | None
+    ) -> DatasetIndex:
+        index = DatasetIndex(distributions)
+        with self._lock:
+            # Older versions of this dataset can no longer be requested
+            for stale in [k for k in self._items if k[0] == dataset_id]:
+                del self._items[stale]
+            self._items[(dataset_id, updated_at)] = index
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+dataset_indexes = DatasetIndexCache()
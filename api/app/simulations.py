@@ -1,6 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .services.datasets import interpolate_percentile, segment_percentiles
+
+# Inclusivity Index component weights
+INDEX_WEIGHTS = {"reach": 0.4, "strength": 0.3, "visual": 0.3}
 
 
 def contrast_ratio(l1: float, l2: float) -> float:
@@ -35,7 +42,7 @@ def inclusivity_index(
     reach_ok: bool, strength_ok: bool, visual_ok: bool
 ) -> Dict[str, Any]:
     # Weighted aggregate: reach 0.4, strength 0.3, visual 0.3
-    weights = {"reach": 0.4, "strength": 0.3, "visual": 0.3}
+    weights = dict(INDEX_WEIGHTS)
     score = (
         (1.0 if reach_ok else 0.0) * weights["reach"]
         + (1.0 if strength_ok else 0.0) * weights["strength"]
@@ -46,3 +53,114 @@ def inclusivity_index(
         "weights": weights,
         "components": {"reach": reach_ok, "strength": strength_ok, "visual": visual_ok},
     }
+
+
+def reach_limit_cm(posture: str = "seated") -> float:
+    return 60.0 if posture == "seated" else 75.0
+
+
+def sample_metric(
+    distributions: Dict[str, Any],
+    metric: str,
+    n: int,
+    rng: np.random.Generator,
+    *,
+    region: Optional[str] = None,
+    sex: Optional[str] = None,
+    age: Optional[str] = None,
+) -> np.ndarray:
+    """Draw ``n`` values of ``metric`` by inverse-CDF sampling.
+
+    Uniform percentiles in [5, 95] are mapped through the segment's
+    percentile table with ``interpolate_percentile``: the distribution is
+    truncated to the range the table fits, rather than clamping the tails,
+    which would pile 5% of users onto each of p5 and p95.
+    """
+    p5, p50, p95 = segment_percentiles(
+        distributions, metric, region=region, sex=sex, age=age
+    )
+    u = rng.uniform(5.0, 95.0, n)
+    return interpolate_percentile(p5, p50, p95, u)
+
+
+def simulate_population(
+    distributions: Dict[str, Any],
+    *,
+    n: int = 100_000,
+    distance_cm: float,
+    posture: str = "seated",
+    required_force_N: float,
+    capability_N: float,
+    contrast: float,
+    reach_metric: str = "forward_reach_cm",
+    strength_metric: str = "strength_N",
+    visual_metric: str = "min_contrast_ratio",
+    region: Optional[str] = None,
+    sex: Optional[str] = None,
+    age: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Monte Carlo version of the reach/strength/visual checks.
+
+    Samples ``n`` virtual users from the dataset's percentile tables and
+    evaluates every check with array operations. Metrics missing from the
+    dataset fall back to the fixed single-user rule (reach limit by posture,
+    ``capability_N``, WCAG 4.5:1), so such checks accommodate all or none.
+    Metrics are sampled independently of each other, within their 5th-95th
+    percentile range (see ``sample_metric``).
+    """
+    if n <= 0:
+        raise ValueError("Population size n must be positive")
+    rng = np.random.default_rng(seed)
+    seg = {"region": region, "sex": sex, "age": age}
+
+    def _sample(metric: str) -> Optional[np.ndarray]:
+        if not distributions.get(metric):
+            return None
+        return sample_metric(distributions, metric, n, rng, **seg)
+
+    reach = _sample(reach_metric)
+    strength = _sample(strength_metric)
+    min_contrast = _sample(visual_metric)
+
+    reach_ok = np.broadcast_to(
+        distance_cm <= (reach if reach is not None else reach_limit_cm(posture)), (n,)
+    )
+    strength_ok = np.broadcast_to(
+        (strength if strength is not None else capability_N) >= required_force_N, (n,)
+    )
+    visual_ok = np.broadcast_to(
+        contrast >= (min_contrast if min_contrast is not None else 4.5), (n,)
+    )
+    score = (
+        reach_ok * INDEX_WEIGHTS["reach"]
+        + strength_ok * INDEX_WEIGHTS["strength"]
+        + visual_ok * INDEX_WEIGHTS["visual"]
+    )
+
+    def _check(
+        ok: np.ndarray, metric: str, sampled: Optional[np.ndarray]
+    ) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "accommodated": float(ok.mean()),
+            "metric": metric if sampled is not None else None,
+        }
+        if sampled is not None:
+            out["p5"], out["p50"], out["p95"] = (
+                float(x) for x in np.percentile(sampled, [5, 50, 95])
+            )
+        return out
+
+    return {
+        "n": n,
+        "seed": seed,
+        "reach": _check(reach_ok, reach_metric, reach),
+        "strength": _check(strength_ok, strength_metric, strength),
+        "visual": _check(visual_ok, visual_metric, min_contrast),
+        "inclusivity_index": {
+            "mean_score": float(score.mean()),
+            # Share of users passing every check
+            "accommodated": float((reach_ok & strength_ok & visual_ok).mean()),
+            "weights": dict(INDEX_WEIGHTS),
+        },
+    }
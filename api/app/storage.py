@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import hashlib
 import io
+import os
+import threading
+import time
 import uuid
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Optional, Set, Tuple
 
 import boto3
 from botocore.config import Config as BotoConfig
@@ -10,26 +15,70 @@ from botocore.config import Config as BotoConfig
 from .config import settings
 
 
-def get_s3_client(endpoint_url: str | None = None):
-    return boto3.client(
+# boto3 clients are thread-safe once built, but building one is slow
+# (credential resolution, endpoint setup, a fresh connection pool) and not
+# thread-safe; keep one per endpoint and process.
+_clients: Dict[Tuple[int, str], Any] = {}
+_clients_lock = threading.Lock()
+# Buckets already created/configured by this process
+_ready_buckets: Set[Tuple[int, str]] = set()
+_bucket_lock = threading.Lock()
+
+
+def _build_client(endpoint_url: str):
+    session = boto3.session.Session()
+    return session.client(
         "s3",
-        endpoint_url=endpoint_url or settings.s3_endpoint_url,
+        endpoint_url=endpoint_url,
         aws_access_key_id=settings.s3_access_key,
         aws_secret_access_key=settings.s3_secret_key,
         region_name=settings.s3_region,
         use_ssl=settings.s3_use_ssl,
-        config=BotoConfig(signature_version="s3v4", s3={"addressing_style": "path"}),
+        config=BotoConfig(
+            signature_version="s3v4",
+            s3={"addressing_style": "path"},
+            max_pool_connections=settings.s3_max_pool_connections,
+            tcp_keepalive=True,
+        ),
     )
 
 
+def get_s3_client(endpoint_url: str | None = None):
+    """Process-wide client for ``endpoint_url`` (default: internal endpoint)."""
+    # Keyed by pid: connection pools must not be shared with forked children
+    key = (os.getpid(), endpoint_url or settings.s3_endpoint_url)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _build_client(key[1])
+    return client
+
+
 def get_public_s3_client():
-    ep = settings.s3_public_endpoint_url or settings.s3_endpoint_url
+    ep = settings.s3_public_endpoint_url
+    if not ep or ep == settings.s3_endpoint_url:
+        return get_s3_client()
     return get_s3_client(endpoint_url=ep)
 
 
-def ensure_bucket_exists(client=None, bucket: Optional[str] = None):
-    client = client or get_s3_client()
+def ensure_bucket_exists(
+    client=None, bucket: Optional[str] = None, force: bool = False
+):
+    """Create the bucket and apply CORS once per process (or at deploy time)."""
     bucket = bucket or settings.s3_bucket
+    key = (os.getpid(), bucket)
+    if key in _ready_buckets and not force:
+        return
+    with _bucket_lock:
+        if key in _ready_buckets and not force:
+            return
+        _bootstrap_bucket(client or get_s3_client(), bucket)
+        _ready_buckets.add(key)
+
+
+def _bootstrap_bucket(client, bucket: str) -> None:
     try:
         client.head_bucket(Bucket=bucket)
     except Exception:
@@ -78,16 +127,139 @@ def upload_bytes(
     )
 
 
+class UploadTooLarge(ValueError):
+    pass
+
+
+def _read_part(fileobj: BinaryIO, size: int) -> bytes:
+    # UploadFile.file may return short reads; fill the part up to ``size``
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = fileobj.read(size - len(buf))
+        if not chunk:
+            break
+        buf += chunk
+    return bytes(buf)
+
+
+def upload_stream(
+    key: str,
+    fileobj: BinaryIO,
+    content_type: str | None = None,
+    max_bytes: Optional[int] = None,
+    part_size: Optional[int] = None,
+    client=None,
+    bucket: Optional[str] = None,
+) -> Tuple[int, str]:
+    """Upload ``fileobj`` in fixed-size parts; returns (size, sha256 hex).
+
+    At most one part is held in memory. Objects that fit in a single part
+    use a plain PUT. Raises ``UploadTooLarge`` (after aborting the multipart
+    upload) as soon as more than ``max_bytes`` have been read.
+    """
+    client = client or get_s3_client()
+    bucket = bucket or settings.s3_bucket
+    part_size = part_size or settings.s3_multipart_part_mb * 1024 * 1024
+    content_type = content_type or "application/octet-stream"
+    digest = hashlib.sha256()
+    size = 0
+
+    def next_part() -> bytes:
+        nonlocal size
+        data = _read_part(fileobj, part_size)
+        size += len(data)
+        if max_bytes is not None and size > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        digest.update(data)
+        return data
+
+    data = next_part()
+    ensure_bucket_exists(client, bucket)
+    if len(data) < part_size:
+        client.put_object(Bucket=bucket, Key=key, Body=data, ContentType=content_type)
+        return size, digest.hexdigest()
+
+    upload_id = client.create_multipart_upload(
+        Bucket=bucket, Key=key, ContentType=content_type
+    )["UploadId"]
+    parts = []
+    try:
+        while data:
+            number = len(parts) + 1
+            res = client.upload_part(
+                Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=data
+            )
+            parts.append({"ETag": res["ETag"], "PartNumber": number})
+            data = next_part()
+        client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        try:
+            client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        except Exception:
+            pass
+        raise
+    return size, digest.hexdigest()
+
+
+class PresignCache:
+    """LRU of presigned GET URLs, keyed by (client, bucket, key, expiry, window).
+
+    A URL is reused only inside the time window it was signed in; windows are
+    a quarter of the URL lifetime, so a cached URL always has at least 75% of
+    its validity left when handed out.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            url = self._entries.get(key)
+            if url is not None:
+                self._entries.move_to_end(key)
+            return url
+
+    def put(self, key: tuple, url: str) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = url
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+presign_cache = PresignCache(settings.presign_cache_size)
+
+
 def presigned_get(
     key: str, expires: Optional[int] = None, client=None, bucket: Optional[str] = None
 ) -> str:
     client = client or get_public_s3_client()
     bucket = bucket or settings.s3_bucket
-    return client.generate_presigned_url(
-        "get_object",
-        Params={"Bucket": bucket, "Key": key},
-        ExpiresIn=expires or settings.download_url_expire_seconds,
-    )
+    expires = expires or settings.download_url_expire_seconds
+    window = max(expires // 4, 1)
+    cache_key = (id(client), bucket, key, expires, int(time.time() // window))
+    url = presign_cache.get(cache_key)
+    if url is None:
+        url = client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=expires,
+        )
+        presign_cache.put(cache_key, url)
+    return url
 
 
 def presigned_put(
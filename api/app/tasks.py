@@ -4,19 +4,36 @@ import logging
 import os
 from datetime import datetime, timezone
 import traceback
-from typing import Any, Dict
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
 
 import requests
+from celery.signals import worker_process_init, worker_process_shutdown
 from sqlalchemy.orm import Session
 
-from . import models
+from . import events, models, reporting
 from .celery_app import celery_app
+from .config import settings
 from .db import SessionLocal
-from .rules import evaluate_rule, UnsafeExpression
-from .storage import upload_bytes, new_object_key
+from .evaluation_cache import (
+    copy_cached_results,
+    dataset_versions,
+    evaluation_cache_key,
+    find_cached_run,
+    is_cacheable,
+)
+from .rules import CompiledRulePack, get_compiled_rulepack, UnsafeExpression
+from .rollups import record_finished_runs
+from .report_cache import find_cached_report, report_cache_key, report_context
+from .pdf_pool import get_renderer_pool, shutdown_renderer_pool
+from .reporting import render_html, render_pdf, sha256_bytes
+from .storage import ensure_bucket_exists, get_s3_client, upload_bytes, new_object_key
 from .simulations import (
     inclusivity_index,
     reach_envelope_ok,
+    simulate_population,
     strength_feasible,
     wcag_contrast_from_rgb,
 )
@@ -24,192 +41,530 @@ from .simulations import (
 logger = logging.getLogger(__name__)
 
 
+def _load_shared_entities(db: Session, runs: list[models.EvaluationRun]):
+    """Load the scenarios, rulepacks and artifacts of many runs, once each."""
+
+    def _by_id(model, ids):
+        ids = {i for i in ids if i is not None}
+        if not ids:
+            return {}
+        return {o.id: o for o in db.query(model).filter(model.id.in_(ids))}
+
+    return (
+        _by_id(models.SimulationScenario, [r.scenario_id for r in runs]),
+        _by_id(models.RulePack, [r.input_ref("rulepack_id") for r in runs]),
+        _by_id(models.DesignArtifact, [r.input_ref("artifact_id") for r in runs]),
+    )
+
+
 def _load_entities(db: Session, evaluation_id: int):
     run = db.get(models.EvaluationRun, evaluation_id)
     if not run:
         raise RuntimeError("EvaluationRun not found")
     scenario = db.get(models.SimulationScenario, run.scenario_id)
-    rulepack = (
-        db.get(models.RulePack, run.metrics.get("rulepack_id")) if run.metrics else None
+    rulepack_id = run.input_ref("rulepack_id")
+    artifact_id = run.input_ref("artifact_id")
+    rulepack = db.get(models.RulePack, rulepack_id) if rulepack_id else None
+    artifact = db.get(models.DesignArtifact, artifact_id) if artifact_id else None
+    return run, scenario, rulepack, artifact
+
+
+def _config_value(value: Any) -> Any:
+    try:
+        return float(value) if isinstance(value, (int, float, str)) else value
+    except Exception:
+        return value
+
+
+def _resolve_rule_scope(
+    compiled: CompiledRulePack,
+    cfg: Dict[str, Any],
+    distance_cm: float,
+    required_force_N: float,
+    contrast: float,
+) -> Tuple[Mapping[str, Any], Dict[str, Any]]:
+    """Resolve rule inputs once per run.
+
+    Returns an immutable base scope holding only the names the rulepack's
+    conditions reference, plus scenario config overrides for declared rule
+    variables (layered per rule by the caller).
+    """
+    base_w = float(cfg.get("button_w_mm", cfg.get("w_mm", cfg.get("w", 10))))
+    base_h = float(cfg.get("button_h_mm", cfg.get("h_mm", cfg.get("h", 10))))
+    available = {
+        # generic environment metrics
+        "distance_cm": distance_cm,
+        "required_force_N": required_force_N,
+        "contrast_ratio": contrast,
+        # width/height aliases commonly used across rulepacks
+        "w": base_w,
+        "h": base_h,
+        "w_mm": base_w,
+        "h_mm": base_h,
+        "button_w_mm": base_w,
+        "button_h_mm": base_h,
+        "button_width_mm": base_w,
+        "button_height_mm": base_h,
+    }
+    base = MappingProxyType(
+        {k: v for k, v in available.items() if k in compiled.requires}
     )
-    artifact = (
-        db.get(models.DesignArtifact, run.metrics.get("artifact_id"))
-        if run.metrics
-        else None
+    declared = {v for r in compiled.rules for v in r.variables}
+    overrides = {
+        var: _config_value(cfg[var])
+        for var in declared
+        if var in cfg and var in compiled.requires
+    }
+    return base, overrides
+
+
+MAX_POPULATION = 1_000_000
+
+
+def _simulate_population(
+    db: Session,
+    scenario: models.SimulationScenario,
+    pop_cfg: Dict[str, Any],
+    distance_cm: float,
+    posture: str,
+    required_force_N: float,
+    capability_N: float,
+    contrast: float,
+) -> Dict[str, Any]:
+    """Run the Monte Carlo checks against the scenario's anthropometric dataset.
+
+    ``scenario.config["population"]`` holds ``dataset_id`` and optionally
+    ``n``, ``seed``, ``region``/``sex``/``age`` and metric names.
+    """
+    ds = db.get(models.AnthropometricDataset, int(pop_cfg["dataset_id"]))
+    project = db.get(models.Project, scenario.project_id)
+    if not ds or not project or ds.org_id != project.org_id:
+        raise RuntimeError("Anthropometric dataset not found")
+    n = min(int(pop_cfg.get("n", 100_000)), MAX_POPULATION)
+    if n <= 0:
+        raise RuntimeError("Population size n must be positive")
+    metric_opts = {
+        k: str(pop_cfg[k])
+        for k in ("reach_metric", "strength_metric", "visual_metric")
+        if pop_cfg.get(k)
+    }
+    return simulate_population(
+        ds.distributions or {},
+        n=n,
+        distance_cm=distance_cm,
+        posture=posture,
+        required_force_N=required_force_N,
+        capability_N=capability_N,
+        contrast=contrast,
+        region=pop_cfg.get("region"),
+        sex=pop_cfg.get("sex"),
+        age=pop_cfg.get("age"),
+        seed=pop_cfg.get("seed"),
+        **metric_opts,
     )
-    return run, scenario, rulepack, artifact
 
 
-@celery_app.task(name="app.tasks.run_evaluation")
-def run_evaluation(evaluation_id: int) -> Dict[str, Any]:
-    logger.info(f"Starting evaluation {evaluation_id}")
-    with SessionLocal() as db:
-        run, scenario, rulepack, artifact = _load_entities(db, evaluation_id)
-        run.status = "running"
-        db.add(run)
-        db.commit()
+def _post_webhook(run: models.EvaluationRun) -> None:
+    webhook_url = run.input_ref("webhook_url")
+    secret = os.getenv("WEBHOOK_SECRET", "")
+    if not (webhook_url and secret):
+        return
+    try:
+        logger.info("Posting webhook ...")
+        requests.post(
+            webhook_url,
+            json={
+                "id": run.id,
+                "status": run.status,
+                "results": run.results_json,
+                "index": run.inclusivity_index_json,
+            },
+            timeout=5,
+            headers={"X-IDP-Webhook": secret},
+        )
+    except Exception as e:
+        logger.warning(f"Webhook failed: {e}")
+
 
-        debug = bool((run.metrics or {}).get("debug"))
-        def dbg(msg: str) -> None:
-            try:
-                if debug:
-                    run.metrics.setdefault("log", []).append({
-                        "t": datetime.now(timezone.utc).isoformat(),
-                        "msg": msg,
-                    })
-            except Exception:
-                pass
-            logger.info(msg)
+def _evaluate_run(
+    db: Session,
+    run: models.EvaluationRun,
+    scenario: models.SimulationScenario | None,
+    rulepack: models.RulePack | None,
+) -> None:
+    """Compute ``run``'s results in place and mark it done/error.
 
+    Does not commit; callers decide the transaction boundary (one run per
+    transaction for ``run_evaluation``, one chunk for ``run_evaluation_batch``).
+    """
+    debug = bool((run.metrics or {}).get("debug"))
+
+    def dbg(msg: str) -> None:
+        logger.info(msg)
+        if not debug:
+            return
+        # Log events are only streamed for debug runs; status transitions
+        # are published by the callers regardless
+        entry = {"t": datetime.now(timezone.utc).isoformat(), "msg": msg}
         try:
-            # Simulations (very simplified, pull inputs from scenario.config or defaults)
-            cfg = (scenario.config or {}) if scenario else {}
-            distance_cm = float(cfg.get("distance_to_control_cm", 55.0))
-            posture = str(cfg.get("posture", "seated"))
-            required_force_N = float(cfg.get("required_force_N", 20.0))
-            capability_N = float(cfg.get("capability_N", 25.0))
-            fg_rgb = tuple(cfg.get("fg_rgb", [255, 255, 255]))
-            bg_rgb = tuple(cfg.get("bg_rgb", [0, 0, 0]))
-
-            dbg("Sim: reach envelope check ...")
-            reach_ok = reach_envelope_ok(distance_cm, posture)
-            dbg("Sim: strength feasibility ...")
-            strength_ok = strength_feasible(required_force_N, capability_N)
-            dbg("Sim: visual contrast ...")
-            contrast = wcag_contrast_from_rgb(fg_rgb, bg_rgb)
-            visual_ok = contrast >= 4.5
-
-            # Rules evaluation
-            dbg("Evaluating rules ...")
-            per_rule = []
-            rule_debug = [] if debug else None
-            if rulepack and (rulepack.rules or {}).get("rules"):
-                for rule in rulepack.rules["rules"]:
-                    # Provide a variable set drawn from scenario with common aliases
-                    base_w = float(cfg.get("button_w_mm", cfg.get("w_mm", cfg.get("w", 10))))
-                    base_h = float(cfg.get("button_h_mm", cfg.get("h_mm", cfg.get("h", 10))))
-                    inputs = {
-                        # generic environment metrics
-                        "distance_cm": distance_cm,
-                        "required_force_N": required_force_N,
-                        "contrast_ratio": contrast,
-                        # width/height aliases commonly used across rulepacks
-                        "w": base_w,
-                        "h": base_h,
-                        "w_mm": base_w,
-                        "h_mm": base_h,
-                        "button_w_mm": base_w,
-                        "button_h_mm": base_h,
-                        "button_width_mm": base_w,
-                        "button_height_mm": base_h,
-                    }
-                    # If specific variables are requested by the rule, try config overrides
-                    for var in (rule.get("variables") or []):
-                        if var in cfg:
-                            try:
-                                inputs[var] = float(cfg[var]) if isinstance(cfg[var], (int, float, str)) else cfg[var]
-                            except Exception:
-                                inputs[var] = cfg[var]
-                    try:
-                        res = evaluate_rule(rule, inputs)
-                        per_rule.append({
+            run.metrics.setdefault("log", []).append(entry)
+        except Exception:
+            pass
+        events.publish(run.id, "log", entry)
+
+    try:
+        # Simulations (very simplified, pull inputs from scenario.config or defaults)
+        cfg = (scenario.config or {}) if scenario else {}
+        distance_cm = float(cfg.get("distance_to_control_cm", 55.0))
+        posture = str(cfg.get("posture", "seated"))
+        required_force_N = float(cfg.get("required_force_N", 20.0))
+        capability_N = float(cfg.get("capability_N", 25.0))
+        fg_rgb = tuple(cfg.get("fg_rgb", [255, 255, 255]))
+        bg_rgb = tuple(cfg.get("bg_rgb", [0, 0, 0]))
+
+        dbg("Sim: reach envelope check ...")
+        reach_ok = reach_envelope_ok(distance_cm, posture)
+        dbg("Sim: strength feasibility ...")
+        strength_ok = strength_feasible(required_force_N, capability_N)
+        dbg("Sim: visual contrast ...")
+        contrast = wcag_contrast_from_rgb(fg_rgb, bg_rgb)
+        visual_ok = contrast >= 4.5
+
+        population = None
+        pop_cfg = cfg.get("population")
+        if isinstance(pop_cfg, dict) and pop_cfg.get("dataset_id"):
+            dbg("Sim: population accommodation ...")
+            population = _simulate_population(
+                db,
+                scenario,
+                pop_cfg,
+                distance_cm,
+                posture,
+                required_force_N,
+                capability_N,
+                contrast,
+            )
+
+        # Rules evaluation
+        dbg("Evaluating rules ...")
+        per_rule = []
+        rule_debug = [] if debug else None
+        if rulepack and (rulepack.rules or {}).get("rules"):
+            # Parsed/validated conditions are cached per (id, version, updated_at)
+            compiled = get_compiled_rulepack(
+                rulepack.id, rulepack.version, rulepack.rules, rulepack.updated_at
+            )
+            base, overrides = _resolve_rule_scope(
+                compiled, cfg, distance_cm, required_force_N, contrast
+            )
+            for crule in compiled.rules:
+                rule = crule.rule
+                # Config overrides only apply to variables the rule declares
+                layer = {v: overrides[v] for v in crule.variables if v in overrides}
+                inputs = ChainMap(layer, base) if layer else base
+                try:
+                    res = crule.evaluate(inputs)
+                    per_rule.append(
+                        {
                             "id": res.id,
                             "passed": res.passed,
                             "severity": res.severity,
-                        })
-                        if debug:
-                            rule_debug.append({
+                        }
+                    )
+                    if debug:
+                        rule_debug.append(
+                            {
                                 "rule": rule.get("id"),
-                                "inputs": inputs,
+                                "inputs": dict(inputs),
                                 "passed": res.passed,
                                 "severity": res.severity,
-                            })
-                    except UnsafeExpression as ue:
-                        # Missing/invalid variables: treat as rule failure but continue overall evaluation
-                        per_rule.append({
+                            }
+                        )
+                except UnsafeExpression as ue:
+                    # Missing/invalid variables: treat as rule failure but continue overall evaluation
+                    per_rule.append(
+                        {
                             "id": str(rule.get("id")),
                             "passed": False,
                             "severity": str(rule.get("severity", "info")),
-                        })
-                        if debug:
-                            rule_debug.append({
+                        }
+                    )
+                    if debug:
+                        rule_debug.append(
+                            {
                                 "rule": rule.get("id"),
-                                "inputs": inputs,
+                                "inputs": dict(inputs),
                                 "error": str(ue),
                                 "passed": False,
                                 "severity": str(rule.get("severity", "info")),
-                            })
-
-            index = inclusivity_index(reach_ok, strength_ok, visual_ok)
-
-            results = {
-                "reach": {"ok": reach_ok, "distance_cm": distance_cm, "posture": posture},
-                "strength": {
-                    "ok": strength_ok,
-                    "required_force_N": required_force_N,
-                    "capability_N": capability_N,
-                },
-                "visual": {"ok": visual_ok, "contrast_ratio": contrast},
-                "rules": per_rule,
+                            }
+                        )
+
+        index = inclusivity_index(reach_ok, strength_ok, visual_ok)
+
+        results = {
+            "reach": {"ok": reach_ok, "distance_cm": distance_cm, "posture": posture},
+            "strength": {
+                "ok": strength_ok,
+                "required_force_N": required_force_N,
+                "capability_N": capability_N,
+            },
+            "visual": {"ok": visual_ok, "contrast_ratio": contrast},
+            "rules": per_rule,
+        }
+        if population is not None:
+            results["population"] = population
+        if debug:
+            results["debug"] = {
+                "scenario_config": cfg,
+                "rulepack_id": run.rulepack_id,
+                "artifact_id": run.artifact_id,
+                "fg_rgb": fg_rgb,
+                "bg_rgb": bg_rgb,
+                "contrast_ratio": contrast,
+                "rule_details": rule_debug,
             }
-            if debug:
-                results["debug"] = {
-                    "scenario_config": cfg,
-                    "rulepack_id": (run.metrics or {}).get("rulepack_id"),
-                    "artifact_id": (run.metrics or {}).get("artifact_id"),
-                    "fg_rgb": fg_rgb,
-                    "bg_rgb": bg_rgb,
-                    "contrast_ratio": contrast,
-                    "rule_details": rule_debug,
-                }
-
-            run.metrics = run.metrics or {}
-            run.metrics.update({
-                "artifact_id": run.metrics.get("artifact_id"),
-                "rulepack_id": run.metrics.get("rulepack_id"),
-            })
-
-            run.status = "done"
-            run.completed_at = datetime.now(timezone.utc)
-            setattr(run, "results_json", results)
-            setattr(run, "inclusivity_index_json", index)
+
+        run.metrics = run.metrics or {}
+        run.metrics.update(
+            {
+                "artifact_id": run.artifact_id,
+                "rulepack_id": run.rulepack_id,
+            }
+        )
+
+        run.status = "done"
+        run.completed_at = datetime.now(timezone.utc)
+        setattr(run, "results_json", results)
+        setattr(run, "inclusivity_index_json", index)
+        logger.info(f"Evaluation {run.id} completed")
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error(f"Evaluation {run.id} failed: {e}\n{tb}")
+        run.status = "error"
+        run.completed_at = datetime.now(timezone.utc)
+        run.metrics = run.metrics or {}
+        run.metrics["error"] = str(e)
+        if debug:
+            run.metrics["traceback"] = tb
+
+
+@celery_app.task(name="app.tasks.run_evaluation")
+def run_evaluation(evaluation_id: int) -> Dict[str, Any]:
+    logger.info(f"Starting evaluation {evaluation_id}")
+    with SessionLocal() as db:
+        run, scenario, rulepack, artifact = _load_entities(db, evaluation_id)
+        # Identical inputs were already evaluated: reuse those results
+        # (debug runs always recompute to capture their log).
+        cacheable = is_cacheable(run)
+        run.cache_key = None
+        if cacheable:
+            run.cache_key = evaluation_cache_key(
+                scenario, rulepack, artifact, dataset_versions(db, [scenario])
+            )
+        cached = None
+        if cacheable and scenario is not None:
+            cached = find_cached_run(db, run.cache_key, scenario.project_id, run.id)
+        if cached is not None:
+            copy_cached_results(run, cached)
             db.add(run)
+            record_finished_runs(db, [run])
             db.commit()
+            events.publish_status(run)
+            _post_webhook(run)
+            logger.info(f"Evaluation {evaluation_id} served from run {cached.id}")
+            return {"id": run.id, "status": run.status, "cached": True}
 
-            # Webhook (optional)
-            webhook_url = (run.metrics or {}).get("webhook_url")
-            secret = os.getenv("WEBHOOK_SECRET", "")
-            if webhook_url and secret:
-                try:
-                    dbg("Posting webhook ...")
-                    requests.post(
-                        webhook_url,
-                        json={
-                            "id": run.id,
-                            "status": run.status,
-                            "results": results,
-                            "index": index,
-                        },
-                        timeout=5,
-                        headers={"X-IDP-Webhook": secret},
-                    )
-                except Exception as e:
-                    logger.warning(f"Webhook failed: {e}")
+        run.status = "running"
+        db.add(run)
+        db.commit()
+        events.publish_status(run)
+
+        _evaluate_run(db, run, scenario, rulepack)
+        db.add(run)
+        record_finished_runs(db, [run])
+        db.commit()
+        events.publish_status(run)
+        if run.status == "done":
+            _post_webhook(run)
+        return {"id": run.id, "status": run.status}
+
+
+@celery_app.task(name="app.tasks.run_evaluation_batch")
+def run_evaluation_batch(evaluation_ids: list[int]) -> Dict[str, Any]:
+    """Evaluate a chunk of runs with shared loads and a single results commit."""
+    logger.info(f"Starting evaluation batch of {len(evaluation_ids)}")
+    with SessionLocal() as db:
+        # Mark the chunk running with one UPDATE, before anything is loaded
+        # (a commit would expire loaded rows and force per-row refreshes)
+        db.query(models.EvaluationRun).filter(
+            models.EvaluationRun.id.in_(evaluation_ids)
+        ).update({"status": "running"}, synchronize_session=False)
+        db.commit()
+        for run_id in evaluation_ids:
+            events.publish(run_id, "status", {"id": run_id, "status": "running"})
 
-            logger.info(f"Evaluation {evaluation_id} completed")
-            return {"id": run.id, "status": run.status}
+        runs = (
+            db.query(models.EvaluationRun)
+            .filter(models.EvaluationRun.id.in_(evaluation_ids))
+            .order_by(models.EvaluationRun.id)
+            .all()
+        )
+        scenarios, rulepacks, artifacts = _load_shared_entities(db, runs)
+        datasets = dataset_versions(db, scenarios.values())
+        project_ids = {s.project_id for s in scenarios.values()}
+        orgs = dict(
+            db.query(models.Project.id, models.Project.org_id).filter(
+                models.Project.id.in_(project_ids)
+            )
+        )
+
+        pending = []
+        for run in runs:
+            scenario = scenarios.get(run.scenario_id)
+            rulepack = rulepacks.get(run.input_ref("rulepack_id"))
+            artifact = artifacts.get(run.input_ref("artifact_id"))
+            run.cache_key = None
+            if is_cacheable(run):
+                run.cache_key = evaluation_cache_key(
+                    scenario, rulepack, artifact, datasets
+                )
+            org_id = orgs.get(scenario.project_id) if scenario else None
+            pending.append((run, scenario, rulepack, org_id))
+        # One lookup for every cache key in the chunk; results are only
+        # reused within the org that produced them
+        keys = {run.cache_key for run, *_ in pending if run.cache_key}
+        cached: Dict[tuple, models.EvaluationRun] = {}
+        for prev, org_id in (
+            db.query(models.EvaluationRun, models.Project.org_id)
+            .join(
+                models.SimulationScenario,
+                models.SimulationScenario.id == models.EvaluationRun.scenario_id,
+            )
+            .join(
+                models.Project,
+                models.Project.id == models.SimulationScenario.project_id,
+            )
+            .filter(
+                models.EvaluationRun.cache_key.in_(keys),
+                models.EvaluationRun.status == "done",
+                models.EvaluationRun.id.notin_(evaluation_ids),
+                models.Project.org_id.in_(set(orgs.values())),
+            )
+            .order_by(models.EvaluationRun.id)
+        ):
+            cached[(org_id, prev.cache_key)] = prev
+
+        statuses: Dict[int, str] = {}
+        for run, scenario, rulepack, org_id in pending:
+            key = (org_id, run.cache_key)
+            hit = None
+            if org_id is not None and run.cache_key:
+                hit = cached.get(key)
+            if hit is not None:
+                copy_cached_results(run, hit)
+            else:
+                _evaluate_run(db, run, scenario, rulepack)
+                # Later duplicates within the chunk reuse this result
+                if run.status == "done" and run.cache_key:
+                    cached[key] = run
+            statuses[run.id] = run.status
+        record_finished_runs(db, runs)
+        db.commit()
+
+        for run_id, status in statuses.items():
+            events.publish(run_id, "status", {"id": run_id, "status": status})
+        for run, *_ in pending:
+            if statuses[run.id] == "done":
+                _post_webhook(run)
+        return {"ids": list(statuses), "statuses": statuses}
+
+
+def _upload_report(base: str, html: str, pdf: bytes, checksum: str) -> Tuple[str, str]:
+    """Upload HTML, PDF and the PDF's ``.sha256`` sidecar concurrently."""
+    html_key, pdf_key = f"{base}.html", f"{base}.pdf"
+    pdf_name = pdf_key.rsplit("/", 1)[-1]
+    client = get_s3_client()  # boto3 clients are thread-safe; creation is not
+    ensure_bucket_exists(client)
+    uploads = [
+        (html_key, html.encode("utf-8"), "text/html"),
+        (pdf_key, pdf, "application/pdf"),
+        # sha256sum format so `sha256sum -c` can verify a download
+        (f"{pdf_key}.sha256", f"{checksum}  {pdf_name}\n".encode(), "text/plain"),
+    ]
+    with ThreadPoolExecutor(max_workers=len(uploads)) as pool:
+        futures = [
+            pool.submit(
+                client.put_object,
+                Bucket=settings.s3_bucket,
+                Key=key,
+                Body=data,
+                ContentType=content_type,
+            )
+            for key, data, content_type in uploads
+        ]
+        for f in futures:
+            f.result()
+    return html_key, pdf_key
+
+
+@worker_process_init.connect
+def _start_pdf_renderers(**_: Any) -> None:
+    # Warm the renderers at boot so the first report is not a cold render
+    if settings.pdf_pool_size > 0 and reporting.HTML is not None:
+        try:
+            get_renderer_pool()
         except Exception as e:
-            tb = traceback.format_exc()
-            logger.error(f"Evaluation {evaluation_id} failed: {e}\n{tb}")
-            run.status = "error"
-            run.completed_at = datetime.now(timezone.utc)
-            run.metrics = run.metrics or {}
-            run.metrics["error"] = str(e)
-            if debug:
-                run.metrics["traceback"] = tb
-            db.add(run)
-            db.commit()
-            return {"id": run.id, "status": run.status}
+            logger.warning(f"PDF renderer pool not started: {e}")
+
+
+@worker_process_shutdown.connect
+def _stop_pdf_renderers(**_: Any) -> None:
+    shutdown_renderer_pool()
+
+
+@celery_app.task(name="app.tasks.build_report")
+def build_report(report_id: int) -> Dict[str, Any]:
+    logger.info(f"Building report {report_id}")
+    with SessionLocal() as db:
+        report = db.get(models.Report, report_id)
+        if not report:
+            return {"id": report_id, "status": "missing"}
+        report.status = "building"
+        db.commit()
+        try:
+            run = db.get(models.EvaluationRun, report.evaluation_id)
+            if not run or run.status != "done":
+                raise RuntimeError("Evaluation not ready")
+            context = report_context(db, run)
+            report.cache_key = report_cache_key(context)
+            cached = find_cached_report(
+                db, report.project_id, report.cache_key, exclude_id=report.id
+            )
+            if cached is not None:
+                # Built meanwhile by an identical request: share its objects
+                report.html_key, report.pdf_key = cached.html_key, cached.pdf_key
+                report.checksum_sha256 = cached.checksum_sha256
+            else:
+                base = f"projects/{report.project_id}/reports/{run.id}"
+                context["checksum_file"] = f"{run.id}.pdf.sha256"
+                # Rendered once: the checksum lives in the sidecar and on the
+                # row, not inside the document it describes
+                html = render_html(context)
+                pdf = render_pdf(html)
+                checksum = sha256_bytes(pdf)
+                report.html_key, report.pdf_key = _upload_report(
+                    base, html, pdf, checksum
+                )
+                report.checksum_sha256 = checksum
+            report.status = "done"
+            report.error = None
+        except Exception as e:
+            logger.error(f"Report {report_id} failed: {e}\n{traceback.format_exc()}")
+            report.status = "error"
+            report.error = str(e)
+        db.commit()
+        return {"id": report.id, "status": report.status}
 
 
 @celery_app.task(name="app.tasks.convert_artifact")
@@ -221,7 +576,7 @@ def convert_artifact(artifact_id: int) -> Dict[str, Any]:
         art = db.get(models.DesignArtifact, artifact_id)
         if not art:
             return {"status": "not_found"}
-        ext = (art.type or '').lower()
+        ext = (art.type or "").lower()
         if ext in ("gltf", "glb"):
             return {"status": "skipped", "reason": "already glTF"}
         # Generate minimal glTF JSON
@@ -22,6 +22,8 @@ app.add_typer(datasets_app, name="datasets")
 
 CONF_DIR = Path(user_config_dir("idp-cli", "idp"))
 CONF_FILE = CONF_DIR / "config.json"
+# Largest page the list endpoints serve
+MAX_PAGE = 500
 
 
 def load_config() -> dict:
@@ -49,6 +51,21 @@ def _headers(token: Optional[str]) -> dict:
     return h
 
 
+def _get_all(url: str, token: Optional[str]) -> list:
+    """Every row of a paginated listing, following ``X-Next-Cursor``."""
+    items: list = []
+    params = {"limit": MAX_PAGE}
+    while True:
+        r = requests.get(url, headers=_headers(token), params=params, timeout=30)
+        if not r.ok:
+            raise RuntimeError(f"{r.status_code}:{r.text}")
+        items.extend(r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return items
+        params = {"limit": MAX_PAGE, "after": cursor}
+
+
 @app.command()
 def login(
     base_url: str = typer.Option("http://localhost:8000", help="API base URL"),
@@ -101,16 +118,67 @@ def eval_submit(
         raise SystemExit(1)
 
 
+def _sse_events(resp: requests.Response):
+    """Yield ``(event, data)`` pairs from a text/event-stream response."""
+    event, data = "message", []
+    for line in resp.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith(":"):
+            continue  # keep-alive comment
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+
+
+def _wait_stream(url: str, token: Optional[str], json_out: bool) -> None:
+    """Follow the run's event stream until it reaches a terminal status.
+
+    Returns early if streaming is unavailable; the caller then polls (which
+    also fetches the final run after a successful stream).
+    """
+    try:
+        with requests.get(
+            f"{url}/events",
+            headers={**_headers(token), "Accept": "text/event-stream"},
+            stream=True,
+            timeout=(10, 60),
+        ) as r:
+            if not r.ok:
+                return
+            for event, data in _sse_events(r):
+                if event == "log" and not json_out:
+                    typer.echo(data.get("msg", ""))
+                elif event == "status":
+                    status = data.get("status")
+                    if status in ("done", "failed", "error"):
+                        return
+                    if not json_out:
+                        typer.echo(f"Status: {status}")
+    except requests.RequestException:
+        return
+
+
 @eval_app.command("wait")
 def eval_wait(
     id: int = typer.Option(..., "--id", help="Evaluation run ID"),
     interval: float = typer.Option(2.0, help="Polling interval seconds"),
+    poll: bool = typer.Option(
+        False, "--poll", help="Poll instead of following the event stream"
+    ),
     json_out: bool = typer.Option(False, "--json", help="JSON output"),
 ):
     """Wait for an evaluation to finish and print final status."""
     cfg = load_config()
     url = f"{cfg['base_url'].rstrip('/')}/api/v1/evaluations/{id}"
     try:
+        if not poll:
+            _wait_stream(url, cfg.get("token"), json_out)
         while True:
             r = requests.get(url, headers=_headers(cfg.get("token")), timeout=30)
             if not r.ok:
@@ -136,6 +204,8 @@ def eval_wait(
 def report_fetch(
     id: int = typer.Option(..., "--id", help="Evaluation run ID"),
     out: Path = typer.Option(Path("reports"), "--out", help="Output directory"),
+    interval: float = typer.Option(1.0, help="Polling interval seconds"),
+    timeout: float = typer.Option(300.0, help="Max seconds to wait for the build"),
     json_out: bool = typer.Option(False, "--json", help="JSON output"),
 ):
     """Generate and download HTML/PDF report for a run."""
@@ -152,6 +222,25 @@ def report_fetch(
             typer.echo(r.text, err=True)
             raise SystemExit(1)
         rep = r.json()
+        # built by a worker; poll until it is ready
+        deadline = time.monotonic() + timeout
+        while rep.get("status") not in ("done", "error"):
+            if time.monotonic() > deadline:
+                typer.echo("Timed out waiting for report", err=True)
+                raise SystemExit(2)
+            time.sleep(interval)
+            r = requests.get(
+                f"{base}/api/v1/evaluations/{id}/report",
+                headers=_headers(cfg.get("token")),
+                timeout=30,
+            )
+            if not r.ok:
+                typer.echo(r.text, err=True)
+                raise SystemExit(1)
+            rep = r.json()
+        if rep["status"] == "error":
+            typer.echo(f"Report failed: {rep.get('error')}", err=True)
+            raise SystemExit(2)
         out.mkdir(parents=True, exist_ok=True)
         html_path = out / f"run_{id}.html"
         pdf_path = out / f"run_{id}.pdf"
@@ -184,22 +273,14 @@ def datasets_list(json_out: bool = typer.Option(False, "--json", help="JSON outp
     cfg = load_config()
     base = cfg["base_url"].rstrip("/")
     try:
-        r1 = requests.get(
-            f"{base}/api/v1/datasets/anthropometrics",
-            headers=_headers(cfg.get("token")),
-            timeout=30,
-        )
-        r2 = requests.get(
-            f"{base}/api/v1/datasets/abilities",
-            headers=_headers(cfg.get("token")),
-            timeout=30,
-        )
-        if not r1.ok or not r2.ok:
-            typer.echo(
-                f"{r1.status_code}:{r1.text} {r2.status_code}:{r2.text}", err=True
-            )
-            raise SystemExit(1)
-        data = {"anthropometrics": r1.json(), "abilities": r2.json()}
+        data = {
+            "anthropometrics": _get_all(
+                f"{base}/api/v1/datasets/anthropometrics", cfg.get("token")
+            ),
+            "abilities": _get_all(
+                f"{base}/api/v1/datasets/abilities", cfg.get("token")
+            ),
+        }
         if json_out:
             typer.echo(json.dumps(data))
         else:
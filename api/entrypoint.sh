@@ -37,5 +37,11 @@ try:
     print("[bootstrap] default superadmin check complete")
 except Exception as e:
     print("[bootstrap] skipped or failed:", e)
+try:
+    from app.bootstrap import bootstrap_storage
+    bootstrap_storage()
+    print("[bootstrap] object storage bucket ready")
+except Exception as e:
+    print("[bootstrap] storage skipped or failed:", e)
 PY
 exec gunicorn -k uvicorn.workers.UvicornWorker -w 2 -b 0.0.0.0:8000 app.main:app
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""Compare cold and warm PDF render latency.
+
+cold: a fresh Python process renders one report (imports, font discovery and
+      CSS parsing included) -- what every new API/worker process paid before.
+warm: the same report rendered by a pre-warmed ``RendererPool``.
+
+Usage: python scripts/bench_pdf_render.py [--runs 5] [--jobs 50] [--size 2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.pdf_pool import RendererPool
+from app.reporting import render_html
+
+COLD_SNIPPET = """
+import sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+from weasyprint import HTML
+HTML(string=sys.stdin.read()).write_pdf()
+print(time.perf_counter() - t0)
+"""
+
+
+def sample_html(n_rules: int = 40) -> str:
+    rules = [
+        {"id": f"rule_{i}", "passed": i % 3 != 0, "severity": "medium"}
+        for i in range(n_rules)
+    ]
+    return render_html(
+        {
+            "run": {"id": 1},
+            "project": {"name": "Benchmark"},
+            "scenario": {"name": "Seated kiosk"},
+            "artifact": {"name": "kiosk.glb"},
+            "rulepack": {"name": "general_eu", "version": "1.0.0"},
+            "results": {"rules": rules},
+            "index": {
+                "score": 0.7,
+                "components": {"reach": True, "strength": True, "visual": False},
+            },
+            "delta": 0.05,
+            "date": "2026-01-01T00:00:00",
+            "checksum_file": "1.pdf.sha256",
+        }
+    )
+
+
+def pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def summary(values: list[float]) -> dict:
+    return {
+        "n": len(values),
+        "mean_ms": round(statistics.fmean(values) * 1e3, 1),
+        "p50_ms": round(pct(values, 50) * 1e3, 1),
+        "p95_ms": round(pct(values, 95) * 1e3, 1),
+    }
+
+
+def bench_cold(html: str, runs: int) -> list[float]:
+    out = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", COLD_SNIPPET.format(root=str(ROOT))],
+            input=html,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        out.append(float(proc.stdout.strip().splitlines()[-1]))
+    return out
+
+
+def bench_warm(html: str, jobs: int, size: int) -> tuple[list[float], float]:
+    pool = RendererPool(size=size, max_jobs=max(jobs, 1) * 2, timeout=120)
+    try:
+        # Wait for every renderer's warm-up before timing
+        with ThreadPoolExecutor(max_workers=size) as ex:
+            list(ex.map(lambda _: pool.render(html), range(size)))
+
+        def timed(_):
+            t0 = time.perf_counter()
+            pool.render(html)
+            return time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=size) as ex:
+            latencies = list(ex.map(timed, range(jobs)))
+        return latencies, time.perf_counter() - t0
+    finally:
+        pool.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5, help="cold renders")
+    ap.add_argument("--jobs", type=int, default=50, help="warm renders")
+    ap.add_argument("--size", type=int, default=2, help="renderer processes")
+    args = ap.parse_args()
+
+    html = sample_html()
+    cold = bench_cold(html, args.runs)
+    warm, wall = bench_warm(html, args.jobs, args.size)
+    print(
+        json.dumps(
+            {
+                "cold": summary(cold),
+                "warm": {
+                    **summary(warm),
+                    "pool_size": args.size,
+                    "throughput_per_s": round(len(warm) / wall, 1),
+                },
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -159,6 +159,9 @@ def main():
 
     # Generate report
     rep = api("POST", f"/api/v1/evaluations/{run_id}/report", token).json()
+    while rep.get("status") not in ("done", "error"):
+        time.sleep(1)
+        rep = api("GET", f"/api/v1/evaluations/{run_id}/report", token).json()
     print(rep.get("presigned_pdf_url"))
 
 
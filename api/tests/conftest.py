@@ -0,0 +1,85 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _reset_principal_cache():
+    # Each test starts a fresh database whose user ids repeat
+    from app.principals import principal_cache
+
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _sync_audit_log(monkeypatch):
+    # Fixtures share one session with the app; write audit rows inline
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "audit_write_behind", False)
+
+
+@pytest.fixture(autouse=True)
+def _reset_presign_cache():
+    from app.storage import presign_cache
+
+    presign_cache.clear()
+    yield
+    presign_cache.clear()
+
+
+class _SharedConnection:
+    """A sqlite3 connection owned by the sync engine; ``close`` leaves it open."""
+
+    def __init__(self, conn):
+        object.__setattr__(self, "_conn", conn)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _async_db(request):
+    """Serve ``get_async_db`` from the test module's in-memory database.
+
+    The aiosqlite connection wraps the sqlite3 connection behind the sync
+    engine's StaticPool, so async routes see the rows fixtures commit.
+    """
+    if "db_session" not in request.fixturenames:
+        yield
+        return
+    import asyncio
+
+    import aiosqlite
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import StaticPool
+
+    from app.db import get_async_db
+    from app.main import app
+
+    db_session = request.getfixturevalue("db_session")
+    raw = _SharedConnection(db_session.get_bind().raw_connection().driver_connection)
+
+    async def creator():
+        return await aiosqlite.Connection(lambda: raw, 64)
+
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", async_creator=creator, poolclass=StaticPool
+    )
+    sessions = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    yield
+    app.dependency_overrides.pop(get_async_db, None)
+    # Closes the aiosqlite connection and stops its thread
+    asyncio.run(engine.dispose())
@@ -26,8 +26,58 @@ class FakeS3:
         }
 
     def generate_presigned_url(self, op, Params, ExpiresIn):
+        self.signed = getattr(self, "signed", 0) + 1
         return f"https://example.com/{Params['Bucket']}/{Params['Key']}?expires={ExpiresIn}"
 
+    def get_object(self, Bucket, Key, Range=None, IfNoneMatch=None):
+        import hashlib
+
+        from botocore.exceptions import ClientError
+        from botocore.response import StreamingBody
+
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        obj = self.objects[(Bucket, Key)]
+        body = obj["Body"]
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if IfNoneMatch == etag:
+            meta = {"HTTPStatusCode": 304, "HTTPHeaders": {"etag": etag}}
+            raise ClientError(
+                {"Error": {"Code": "304"}, "ResponseMetadata": meta}, "GetObject"
+            )
+        out = {"ETag": etag, "ContentType": obj["ContentType"]}
+        if Range:
+            start, end = Range.split("=")[1].split("-")
+            if start == "":
+                start, end = len(body) - int(end), len(body) - 1
+            start, end = int(start), int(end) if end else len(body) - 1
+            if start >= len(body):
+                raise ClientError({"Error": {"Code": "InvalidRange"}}, "GetObject")
+            end = min(end, len(body) - 1)
+            out["ContentRange"] = f"bytes {start}-{end}/{len(body)}"
+            body = body[start : end + 1]
+        out["ContentLength"] = len(body)
+        out["Body"] = StreamingBody(BytesIO(body), len(body))
+        return out
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None):
+        self.uploads = getattr(self, "uploads", {})
+        self.uploads["u1"] = {"Key": Key, "ContentType": ContentType, "Parts": {}}
+        return {"UploadId": "u1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId]["Parts"][PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        up = self.uploads.pop(UploadId)
+        body = b"".join(up["Parts"][p["PartNumber"]] for p in MultipartUpload["Parts"])
+        self.objects[(Bucket, Key)] = {"Body": body, "ContentType": up["ContentType"]}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId)
+        self.aborted = UploadId
+
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -73,6 +123,9 @@ def client(db_session, monkeypatch):
     import app.routers.artifacts as artifacts_router
 
     monkeypatch.setattr(artifacts_router, "get_s3_client", lambda: fake)
+    import app.routers.files as files_router
+
+    monkeypatch.setattr(files_router, "get_s3_client", lambda: fake)
     monkeypatch.setattr(
         storage_mod, "ensure_bucket_exists", lambda client=None, bucket=None: None
     )
@@ -140,3 +193,179 @@ def test_upload_artifact_flow(client, db_session):
     assert body["id"] > 0
     assert body["object_key"]
     assert body["presigned_url"].startswith("https://example.com/")
+
+
+def test_upload_stream_multipart_and_limit(monkeypatch):
+    import hashlib
+
+    monkeypatch.setattr(
+        storage_mod, "ensure_bucket_exists", lambda client=None, bucket=None: None
+    )
+
+    class ShortReads(BytesIO):
+        # Mimic sockets/spooled files returning less than asked for
+        def read(self, n=-1):
+            return super().read(min(n, 3) if n and n > 0 else n)
+
+    fake = FakeS3()
+    data = bytes(range(256)) * 10  # 2560 bytes -> 3 parts of 1 KiB
+    size, sha = storage_mod.upload_stream(
+        "k.step",
+        ShortReads(data),
+        "application/step",
+        part_size=1024,
+        client=fake,
+        bucket="b",
+    )
+    assert size == len(data)
+    assert sha == hashlib.sha256(data).hexdigest()
+    assert fake.objects[("b", "k.step")]["Body"] == data
+
+    # Small objects use a single PUT
+    size, _ = storage_mod.upload_stream(
+        "s.glb", BytesIO(b"abc"), part_size=1024, client=fake, bucket="b"
+    )
+    assert size == 3 and fake.objects[("b", "s.glb")]["Body"] == b"abc"
+
+    # Over the limit: multipart upload aborted, nothing stored
+    with pytest.raises(storage_mod.UploadTooLarge):
+        storage_mod.upload_stream(
+            "big.step",
+            BytesIO(data),
+            part_size=1024,
+            max_bytes=2000,
+            client=fake,
+            bucket="b",
+        )
+    assert fake.aborted == "u1" and not fake.uploads
+    assert ("b", "big.step") not in fake.objects
+
+
+def test_s3_client_shared_and_bucket_bootstrapped_once(monkeypatch):
+    built = []
+    monkeypatch.setattr(storage_mod, "_clients", {})
+    monkeypatch.setattr(
+        storage_mod, "_build_client", lambda ep: built.append(ep) or FakeS3()
+    )
+    c1 = storage_mod.get_s3_client()
+    assert storage_mod.get_s3_client() is c1
+    assert storage_mod.get_public_s3_client() is c1  # same endpoint
+    assert len(built) == 1
+
+    calls = []
+
+    class CountingS3(FakeS3):
+        def head_bucket(self, Bucket):
+            calls.append("head")
+
+        def put_bucket_cors(self, Bucket, CORSConfiguration):
+            calls.append("cors")
+
+    fake = CountingS3()
+    monkeypatch.setattr(storage_mod, "_ready_buckets", set())
+    for i in range(3):
+        storage_mod.upload_bytes(f"k{i}", b"x", client=fake, bucket="once")
+    assert calls == ["head", "cors"]
+    assert len(fake.objects) == 3
+
+
+def test_file_proxy_streams_ranges_and_etags(client, db_session):
+    headers, org = auth_headers(client, db_session)
+    project = client.post(
+        "/api/v1/projects", json={"name": "projF"}, headers=headers
+    ).json()
+    blob = bytes(range(256)) * 4
+    art = client.post(
+        f"/api/v1/projects/{project['id']}/artifacts",
+        files={"file": ("model.glb", blob, "model/gltf-binary")},
+        headers=headers,
+    ).json()
+    url = f"/api/v1/files/get?key={art['object_key']}"
+
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200
+    assert r.content == blob
+    assert r.headers["accept-ranges"] == "bytes"
+    assert r.headers["content-type"] == "model/gltf-binary"
+    etag = r.headers["etag"]
+
+    r = client.get(url, headers={**headers, "Range": "bytes=10-19"})
+    assert r.status_code == 206
+    assert r.content == blob[10:20]
+    assert r.headers["content-range"] == f"bytes 10-19/{len(blob)}"
+    r = client.get(url, headers={**headers, "Range": "bytes=-4"})
+    assert r.status_code == 206 and r.content == blob[-4:]
+    r = client.get(url, headers={**headers, "Range": "bytes=5000-"})
+    assert r.status_code == 416
+    # Multi-range is not supported: whole object
+    r = client.get(url, headers={**headers, "Range": "bytes=0-1,4-5"})
+    assert r.status_code == 200 and r.content == blob
+
+    r = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert r.content == b""
+    r = client.get(url, headers={**headers, "If-None-Match": '"stale"'})
+    assert r.status_code == 200 and r.content == blob
+
+
+def test_listing_omits_urls_and_batch_presign(client, db_session):
+    from app.storage import get_s3_client
+
+    headers, org = auth_headers(client, db_session)
+    project = client.post(
+        "/api/v1/projects", json={"name": "projU"}, headers=headers
+    ).json()
+    base = f"/api/v1/projects/{project['id']}/artifacts"
+    keys = []
+    for i in range(3):
+        r = client.post(
+            base,
+            files={"file": (f"m{i}.glb", b"glb", "model/gltf-binary")},
+            headers=headers,
+        )
+        keys.append(r.json()["object_key"])
+    fake = get_s3_client()
+    signed = fake.signed
+
+    items = client.get(base, headers=headers).json()
+    assert [a["presigned_url"] for a in items] == [None] * 3
+    assert fake.signed == signed
+
+    # Presigned URLs are cached per (key, expiry window): the upload
+    # responses already signed these keys
+    items = client.get(base, params={"urls": True}, headers=headers).json()
+    assert all(a["presigned_url"].startswith("https://example.com/") for a in items)
+    again = client.get(base, params={"urls": True}, headers=headers).json()
+    assert [a["presigned_url"] for a in again] == [a["presigned_url"] for a in items]
+
+    r = client.post("/api/v1/files/presign", json={"keys": keys}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert set(r.json()["urls"]) == set(keys)
+    assert fake.signed == signed
+
+    db_session.add(models.Org(name="orgOther"))
+    db_session.commit()
+    other_org = db_session.query(models.Org).filter(models.Org.name == "orgOther").one()
+    other = models.Project(org_id=other_org.id, name="theirs")
+    db_session.add(other)
+    db_session.commit()
+    foreign = f"projects/{other.id}/artifacts/x.glb"
+    assert (
+        client.post(
+            "/api/v1/files/presign", json={"keys": [keys[0], foreign]}, headers=headers
+        ).status_code
+        == 403
+    )
+    assert (
+        client.post(
+            "/api/v1/files/presign", json={"keys": ["nope"]}, headers=headers
+        ).status_code
+        == 400
+    )
+    assert (
+        client.post(
+            "/api/v1/files/presign", json={"keys": ["projects/9999/a"]}, headers=headers
+        ).status_code
+        == 404
+    )
@@ -123,3 +123,109 @@ def test_anthro_percentiles(client, db_session):
     r = client.get("/api/v1/datasets/anthropometrics", headers=headers)
     assert r.status_code == 200
     assert any(item["id"] == dataset["id"] for item in r.json())
+
+    # Updating distributions must not serve the cached index of the old version
+    ds["distributions"]["stature"][0]["percentiles"]["p50"] = 180.0
+    r = client.patch(
+        f"/api/v1/datasets/anthropometrics/{dataset['id']}",
+        json={"distributions": ds["distributions"]},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    r = client.get(
+        f"/api/v1/datasets/anthropometrics/{dataset['id']}/percentile",
+        params={"metric": "stature", "percentile": 50, "sex": "M"},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    assert abs(r.json()["value"] - 180.0) < 1e-6
+
+
+def test_segment_index_matches_linear_scoring():
+    import random
+
+    from app.services.datasets import DatasetIndex, _choose_segment
+
+    rnd = random.Random(3)
+    regions = ["all", "PT", "ES", "FR"]
+    sexes = ["all", "M", "F"]
+    ages = ["all", "18-25", "26-40", "41-65"]
+    entries = []
+    for i in range(60):
+        e = {"percentiles": {"p5": i, "p50": i + 1, "p95": i + 2}}
+        for key, pool in (("region", regions), ("sex", sexes), ("age", ages)):
+            choice = rnd.choice(pool + [None])
+            if choice is not None:
+                e[key] = choice
+        entries.append(e)
+    index = DatasetIndex({"stature": entries})
+    for region in regions + [None, "XX", ""]:
+        for sex in sexes + [None]:
+            for age in ages + [None, "90+"]:
+                best = _choose_segment(entries, region, sex, age)
+                expected = float(best["percentiles"]["p50"])
+                got = index.segment_percentiles(
+                    "stature", region=region, sex=sex, age=age
+                )
+                assert got[1] == expected
+
+
+def test_anthro_percentiles_batch(client, db_session):
+    headers = get_auth_headers(client, db_session)
+    ds = {
+        "name": "Anthro Batch",
+        "distributions": {
+            "stature": [
+                {
+                    "sex": "all",
+                    "percentiles": {"p5": 160.0, "p50": 170.0, "p95": 180.0},
+                },
+                {"sex": "F", "percentiles": {"p5": 150.0, "p50": 160.0, "p95": 170.0}},
+            ]
+        },
+    }
+    dataset = client.post(
+        "/api/v1/datasets/anthropometrics", json=ds, headers=headers
+    ).json()
+    url = f"/api/v1/datasets/anthropometrics/{dataset['id']}/percentiles:batch"
+
+    r = client.post(
+        url,
+        json={
+            "queries": [
+                {"metric": "stature", "percentile": 27.5, "sex": "F"},
+                {"metric": "weight", "percentile": 50},
+            ],
+            "cartesian": {
+                "metrics": ["stature"],
+                "percentiles": [0, 50, 100],
+                "sexes": [None, "F"],
+            },
+        },
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    results = r.json()["results"]
+    assert len(results) == 2 + 6
+    assert abs(results[0]["value"] - 155.0) < 1e-6
+    assert results[1]["value"] is None
+    assert "Metric not found" in results[1]["error"]
+    values = [(x["percentile"], x["sex"], x["value"]) for x in results[2:]]
+    assert values == [
+        (0, None, 160.0),
+        (0, "F", 150.0),
+        (50, None, 170.0),
+        (50, "F", 160.0),
+        (100, None, 180.0),
+        (100, "F", 170.0),
+    ]
+    # Each value matches the single-query endpoint
+    r = client.get(
+        f"/api/v1/datasets/anthropometrics/{dataset['id']}/percentile",
+        params={"metric": "stature", "percentile": 27.5, "sex": "F"},
+        headers=headers,
+    )
+    assert abs(r.json()["value"] - results[0]["value"]) < 1e-9
+
+    r = client.post(url, json={"queries": []}, headers=headers)
+    assert r.status_code == 400
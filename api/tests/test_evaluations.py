@@ -178,3 +178,564 @@ def test_evaluation_happy_path(client, db_session):
     assert body["status"] == "done"
     assert body["results"]["visual"]["ok"] is True
     assert body["inclusivity_index"]["score"] >= 0.0
+
+
+def _prepare_evaluation(client, db_session):
+    from app import models
+
+    org = models.Org(name="orgC")
+    db_session.add(org)
+    db_session.commit()
+    email, password = "c@example.com", "secret123"
+    client.post(
+        "/auth/register", json={"email": email, "password": password, "org_id": org.id}
+    )
+    user = db_session.query(models.User).filter(models.User.email == email).first()
+    user.roles = ["researcher", "designer"]
+    db_session.add(user)
+    db_session.commit()
+    tok = client.post(
+        "/auth/token",
+        data={"username": email, "password": password},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {tok}"}
+    proj = client.post(
+        "/api/v1/projects", json={"name": "projC"}, headers=headers
+    ).json()
+    sc = models.SimulationScenario(
+        project_id=proj["id"], name="s", config={"distance_to_control_cm": 50}
+    )
+    art = models.DesignArtifact(
+        project_id=proj["id"], name="a", type="gltf", sha256="ab" * 32
+    )
+    db_session.add_all([sc, art])
+    db_session.commit()
+    rp = client.post(
+        "/api/v1/rulepacks",
+        json={
+            "name": "packC",
+            "version": "1.0.0",
+            "rules": {"rules": [{"id": "r", "condition": "w >= 5", "severity": "low"}]},
+        },
+        headers=headers,
+    ).json()
+    payload = {"artifact_id": art.id, "scenario_id": sc.id, "rulepack_id": rp["id"]}
+    return headers, payload, sc
+
+
+def test_identical_evaluation_is_served_from_cache(client, db_session):
+    headers, payload, sc = _prepare_evaluation(client, db_session)
+
+    first = client.post("/api/v1/evaluations", json=payload, headers=headers)
+    assert first.status_code == 202, first.text
+    second = client.post("/api/v1/evaluations", json=payload, headers=headers)
+    assert second.status_code == 200, second.text
+    assert second.json()["status"] == "done"
+    assert second.json()["cached"] is True
+
+    a = client.get(f"/api/v1/evaluations/{first.json()['id']}", headers=headers).json()
+    b = client.get(f"/api/v1/evaluations/{second.json()['id']}", headers=headers).json()
+    assert b["results"] == a["results"]
+    assert b["metrics"]["cached_from"] == a["id"]
+
+    # Forcing a recompute or changing the scenario bypasses the cache
+    forced = client.post(
+        "/api/v1/evaluations", json={**payload, "no_cache": True}, headers=headers
+    )
+    assert forced.status_code == 202
+    sc.config = {"distance_to_control_cm": 70}
+    db_session.add(sc)
+    db_session.commit()
+    changed = client.post("/api/v1/evaluations", json=payload, headers=headers)
+    assert changed.status_code == 202
+    body = client.get(
+        f"/api/v1/evaluations/{changed.json()['id']}", headers=headers
+    ).json()
+    assert body["results"]["reach"]["ok"] is False
+
+
+def test_debug_runs_do_not_seed_the_cache(client, db_session):
+    from app import models
+    from app.evaluation_cache import copy_cached_results
+
+    headers, payload, sc = _prepare_evaluation(client, db_session)
+    debug = client.post(
+        "/api/v1/evaluations", json={**payload, "debug": True}, headers=headers
+    ).json()
+    normal = client.post("/api/v1/evaluations", json=payload, headers=headers)
+    assert normal.status_code == 202
+    body = client.get(
+        f"/api/v1/evaluations/{normal.json()['id']}", headers=headers
+    ).json()
+    assert "debug" not in body["results"]
+    assert "cached_from" not in body["metrics"]
+
+    debug_run = db_session.get(models.EvaluationRun, debug["id"])
+    assert debug_run.status == "done" and "debug" in debug_run.results_json
+    assert debug_run.cache_key is None
+
+    # Results copied from a legacy debug-keyed run lose the debug block
+    target = models.EvaluationRun(status="queued", metrics={})
+    copy_cached_results(target, debug_run)
+    assert "debug" not in target.results_json
+    assert "debug" in debug_run.results_json
+
+
+def test_batch_evaluations_run_in_chunks(client, db_session):
+    from app import models
+
+    headers, payload, sc = _prepare_evaluation(client, db_session)
+    sc2 = models.SimulationScenario(
+        project_id=sc.project_id, name="s2", config={"distance_to_control_cm": 90}
+    )
+    db_session.add(sc2)
+    db_session.commit()
+    items = [payload, {**payload, "scenario_id": sc2.id}, payload]
+
+    r = client.post(
+        "/api/v1/evaluations/batch",
+        json={"items": items, "chunk_size": 2},
+        headers=headers,
+    )
+    assert r.status_code == 202, r.text
+    body = r.json()
+    assert len(body["ids"]) == 3 and body["chunks"] == 2
+
+    runs = [
+        client.get(f"/api/v1/evaluations/{i}", headers=headers).json()
+        for i in body["ids"]
+    ]
+    assert all(run["status"] == "done" for run in runs)
+    assert runs[0]["results"]["reach"]["distance_cm"] == 50
+    assert runs[1]["results"]["reach"]["distance_cm"] == 90
+    # The third triple repeats the first and is served from its results
+    assert runs[2]["results"] == runs[0]["results"]
+    assert runs[2]["metrics"]["cached_from"] == runs[0]["id"]
+
+    bad = client.post(
+        "/api/v1/evaluations/batch",
+        json={"items": [{**payload, "rulepack_id": 9999}]},
+        headers=headers,
+    )
+    assert bad.status_code == 400
+
+    # Another org's artifact or rulepack cannot be referenced
+    other_org = models.Org(name="orgOther")
+    db_session.add(other_org)
+    db_session.commit()
+    other_project = models.Project(org_id=other_org.id, name="p")
+    db_session.add(other_project)
+    db_session.commit()
+    foreign_art = models.DesignArtifact(
+        project_id=other_project.id, name="x", type="gltf"
+    )
+    foreign_rp = models.RulePack(org_id=other_org.id, name="x", rules={"rules": []})
+    db_session.add_all([foreign_art, foreign_rp])
+    db_session.commit()
+    for item in (
+        {**payload, "artifact_id": foreign_art.id},
+        {**payload, "rulepack_id": foreign_rp.id},
+    ):
+        batch = client.post(
+            "/api/v1/evaluations/batch", json={"items": [item]}, headers=headers
+        )
+        assert batch.status_code == 403
+        single = client.post("/api/v1/evaluations", json=item, headers=headers)
+        assert single.status_code == 403
+
+
+def test_evaluation_event_stream(client, db_session, monkeypatch):
+    import json
+
+    from app import events as events_mod
+    from app import models
+    from app.routers import evaluations as ev_router
+
+    published = []
+    monkeypatch.setattr(
+        events_mod,
+        "publish",
+        lambda run_id, event, data: published.append((run_id, event, data)),
+    )
+    monkeypatch.setattr(ev_router, "SessionLocal", lambda: db_session)
+    headers, payload, sc = _prepare_evaluation(client, db_session)
+    scenario_id = sc.id
+
+    run_id = client.post("/api/v1/evaluations", json=payload, headers=headers).json()[
+        "id"
+    ]
+    # The worker published its transitions; progress lines only for debug runs
+    statuses = [d["status"] for i, e, d in published if i == run_id and e == "status"]
+    assert statuses == ["running", "done"]
+    assert not any(i == run_id and e == "log" for i, e, d in published)
+    debug_id = client.post(
+        "/api/v1/evaluations", json={**payload, "debug": True}, headers=headers
+    ).json()["id"]
+    assert any(i == debug_id and e == "log" and d["msg"] for i, e, d in published)
+
+    def parse(text):
+        out = []
+        for block in text.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            out.append((lines["event"], json.loads(lines["data"])))
+        return out
+
+    # Finished run: current status only, then the stream ends.
+    # EventSource cannot send headers, so the token may come as a query param.
+    token = headers["Authorization"].split(" ", 1)[1]
+    r = client.get(f"/api/v1/evaluations/{run_id}/events?access_token={token}")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert parse(r.text) == [("status", {"id": run_id, "status": "done"})]
+    assert client.get(f"/api/v1/evaluations/{run_id}/events").status_code == 401
+    # ... and is redacted from access log lines
+    from app.middleware import redact_query
+
+    assert (
+        redact_query(f"/events?x=1&access_token={token}")
+        == "/events?x=1&access_token=***"
+    )
+
+    # In-flight run: relays pub/sub events until a terminal status
+    queued = models.EvaluationRun(scenario_id=scenario_id, status="queued", metrics={})
+    db_session.add(queued)
+    db_session.commit()
+    qid = queued.id
+
+    async def fake_subscribe(run_id, poll_seconds=1.0):
+        yield None
+        yield {"event": "status", "data": {"id": run_id, "status": "running"}}
+        yield {"event": "log", "data": {"msg": "Sim: reach envelope check ..."}}
+        yield {"event": "status", "data": {"id": run_id, "status": "done"}}
+        yield {"event": "log", "data": {"msg": "not relayed"}}
+
+    monkeypatch.setattr(events_mod, "subscribe", fake_subscribe)
+    r = client.get(f"/api/v1/evaluations/{qid}/events", headers=headers)
+    assert parse(r.text) == [
+        ("status", {"id": qid, "status": "queued"}),
+        ("status", {"id": qid, "status": "running"}),
+        ("log", {"msg": "Sim: reach envelope check ..."}),
+        ("status", {"id": qid, "status": "done"}),
+    ]
+
+
+def test_runs_are_queryable_by_artifact_and_rulepack(client, db_session):
+    from app import models
+
+    headers, payload, sc = _prepare_evaluation(client, db_session)
+    project_id = sc.project_id
+    other = models.DesignArtifact(
+        project_id=project_id, name="b", type="gltf", sha256="cd" * 32
+    )
+    db_session.add(other)
+    db_session.commit()
+    other_id = other.id
+    first = client.post("/api/v1/evaluations", json=payload, headers=headers).json()
+    second = client.post(
+        "/api/v1/evaluations",
+        json={
+            **payload,
+            "artifact_id": other_id,
+            "webhook_url": "http://hook.invalid/x",
+        },
+        headers=headers,
+    ).json()
+
+    run = db_session.get(models.EvaluationRun, second["id"])
+    assert (run.artifact_id, run.rulepack_id) == (other_id, payload["rulepack_id"])
+    assert run.webhook_url == "http://hook.invalid/x"
+    body = client.get(f"/api/v1/evaluations/{first['id']}", headers=headers).json()
+    assert body["artifact_id"] == payload["artifact_id"]
+
+    url = f"/api/v1/projects/{project_id}/evaluations"
+    by_art = client.get(url, params={"artifact_id": other_id}, headers=headers).json()
+    assert [r["id"] for r in by_art] == [second["id"]]
+    by_rp = client.get(
+        url, params={"rulepack_id": payload["rulepack_id"]}, headers=headers
+    ).json()
+    assert {r["id"] for r in by_rp} == {first["id"], second["id"]}
+
+    # Runs enqueued by pre-000015 code only carry their refs in metrics
+    from app.tasks import run_evaluation
+
+    legacy = models.EvaluationRun(
+        scenario_id=payload["scenario_id"],
+        status="queued",
+        metrics={"rulepack_id": payload["rulepack_id"], "no_cache": True},
+    )
+    db_session.add(legacy)
+    db_session.commit()
+    legacy_id = legacy.id
+    run_evaluation.delay(legacy_id)
+    body = client.get(f"/api/v1/evaluations/{legacy_id}", headers=headers).json()
+    assert body["status"] == "done"
+    assert (
+        body["results"]
+        == client.get(f"/api/v1/evaluations/{first['id']}", headers=headers).json()[
+            "results"
+        ]
+    )
+
+
+def test_rule_results_feed_analytics(client, db_session):
+    headers, payload, sc = _prepare_evaluation(client, db_session)
+    project_id = sc.project_id
+    first = client.post("/api/v1/evaluations", json=payload, headers=headers).json()
+    # Served from cache: its rule rows are written too
+    second = client.post("/api/v1/evaluations", json=payload, headers=headers).json()
+    assert second["cached"] is True
+    run = client.get(f"/api/v1/evaluations/{first['id']}", headers=headers).json()
+    [outcome] = run["results"]["rules"]
+    failed = 0 if outcome["passed"] else 2
+
+    r = client.get("/api/v1/analytics/rules", headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.json() == [
+        {"rule_id": "r", "total": 2, "failed": failed, "fail_rate": failed / 2}
+    ]
+    other = client.get(
+        "/api/v1/analytics/rules",
+        params={"project_id": project_id + 1},
+        headers=headers,
+    )
+    assert other.json() == []
+    # Scoped and windowed on the rows' own org and finish time
+    from app import models
+
+    org_id = db_session.get(models.Project, project_id).org_id
+    rows = db_session.query(models.RuleResult).all()
+    assert {(r.org_id, r.project_id) for r in rows} == {(org_id, project_id)}
+    assert all(r.completed_at is not None for r in rows)
+    later = client.get(
+        "/api/v1/analytics/rules",
+        params={"since": "2999-01-01T00:00:00"},
+        headers=headers,
+    )
+    assert later.json() == []
+
+    detail = client.get("/api/v1/analytics/rules/r", headers=headers).json()
+    assert detail["total"] == 2
+    assert [p["project_id"] for p in detail["projects"]] == [project_id]
+    assert (
+        client.get("/api/v1/analytics/rules/nope", headers=headers).status_code == 404
+    )
+
+    client.delete(f"/api/v1/evaluations/{second['id']}", headers=headers)
+    assert (
+        client.get("/api/v1/analytics/rules", headers=headers).json()[0]["total"] == 1
+    )
+
+
+def test_rollups_and_stored_score_delta(client, db_session):
+    from app import models
+    from app.report_cache import report_context
+
+    headers, payload, sc = _prepare_evaluation(client, db_session)
+    project_id, rulepack_id = sc.project_id, payload["rulepack_id"]
+    first = client.post("/api/v1/evaluations", json=payload, headers=headers).json()
+    sc.config = {"distance_to_control_cm": 90}
+    db_session.add(sc)
+    db_session.commit()
+    second = client.post("/api/v1/evaluations", json=payload, headers=headers).json()
+
+    a = client.get(f"/api/v1/evaluations/{first['id']}", headers=headers).json()
+    b = client.get(f"/api/v1/evaluations/{second['id']}", headers=headers).json()
+    scores = [a["inclusivity_index"]["score"], b["inclusivity_index"]["score"]]
+    run = db_session.get(models.EvaluationRun, second["id"])
+    assert run.score_delta == pytest.approx(scores[1] - scores[0])
+    assert db_session.get(models.EvaluationRun, first["id"]).score_delta is None
+    assert report_context(db_session, run)["delta"] == run.score_delta
+
+    r = client.get(f"/api/v1/projects/{project_id}/dashboard", headers=headers)
+    assert r.status_code == 200, r.text
+    dash = r.json()
+    assert (dash["runs"], dash["errors"]) == (2, 0)
+    assert dash["mean"] == pytest.approx(sum(scores) / 2, abs=1e-4)
+    assert dash["p90"] == pytest.approx(max(scores), abs=0.01)
+    [rule] = dash["rules"]
+    assert rule["rule_id"] == "r" and rule["total"] == 2
+    assert len(dash["buckets"]) == 1 and dash["buckets"][0]["runs"] == 2
+    pack = client.get(
+        f"/api/v1/rulepacks/{rulepack_id}/dashboard", headers=headers
+    ).json()
+    assert pack["runs"] == 2 and pack["rules"] == dash["rules"]
+
+    # Another org's runs of the same pack land in that org's rollup rows
+    from datetime import datetime, timezone
+
+    from app.rollups import update_rollups
+
+    other_org = models.Org(name="orgOther")
+    db_session.add(other_org)
+    db_session.commit()
+    other_project = models.Project(org_id=other_org.id, name="p")
+    db_session.add(other_project)
+    db_session.commit()
+    other_sc = models.SimulationScenario(
+        project_id=other_project.id, name="s", config={}
+    )
+    db_session.add(other_sc)
+    db_session.commit()
+    foreign = models.EvaluationRun(
+        scenario_id=other_sc.id,
+        rulepack_id=rulepack_id,
+        status="done",
+        completed_at=datetime.now(timezone.utc),
+        inclusivity_index_json={"score": 0.1},
+        results_json={"rules": [{"id": "r", "passed": False}]},
+    )
+    db_session.add(foreign)
+    db_session.flush()
+    update_rollups(db_session, [foreign])
+    db_session.commit()
+    pack = client.get(
+        f"/api/v1/rulepacks/{rulepack_id}/dashboard", headers=headers
+    ).json()
+    assert pack["runs"] == 2 and pack["rules"] == dash["rules"]
+
+    client.delete(f"/api/v1/evaluations/{second['id']}", headers=headers)
+    dash = client.get(
+        f"/api/v1/projects/{project_id}/dashboard", headers=headers
+    ).json()
+    assert dash["runs"] == 1
+    assert dash["mean"] == pytest.approx(scores[0], abs=1e-4)
+
+    bad = client.get(
+        f"/api/v1/projects/{project_id}/dashboard",
+        params={"since": "2026-01-02", "until": "2026-01-01"},
+        headers=headers,
+    )
+    assert bad.status_code == 400
+
+
+def test_score_delta_is_against_latest_finished_run(db_session):
+    from datetime import datetime, timedelta, timezone
+
+    from app import models
+    from app.rollups import record_score_deltas
+
+    org = models.Org(name="o")
+    db_session.add(org)
+    db_session.commit()
+    project = models.Project(org_id=org.id, name="p")
+    db_session.add(project)
+    db_session.commit()
+    sc = models.SimulationScenario(project_id=project.id, name="s", config={})
+    db_session.add(sc)
+    db_session.commit()
+    t0 = datetime.now(timezone.utc)
+
+    def run(score, finished):
+        return models.EvaluationRun(
+            scenario_id=sc.id,
+            status="done",
+            completed_at=finished,
+            inclusivity_index_json={"score": score},
+        )
+
+    # Submitted first but finished last: it is the baseline
+    late, early = (
+        run(0.8, t0 + timedelta(seconds=2)),
+        run(0.2, t0 + timedelta(seconds=1)),
+    )
+    db_session.add_all([late, early])
+    db_session.commit()
+    new = run(1.0, t0 + timedelta(seconds=3))
+    db_session.add(new)
+    db_session.flush()
+    record_score_deltas(db_session, [new])
+    assert new.score_delta == pytest.approx(0.2)
+
+
+def test_scoped_loaders_authorize_in_one_statement(client, db_session):
+    from fastapi import HTTPException
+    from sqlalchemy import event
+
+    from app import models
+    from app.principals import Principal
+    from app.scoping import load_scoped
+
+    headers, payload, sc = _prepare_evaluation(client, db_session)
+    scenario_id = sc.id
+    org_id = db_session.get(models.Project, sc.project_id).org_id
+    run_id = client.post("/api/v1/evaluations", json=payload, headers=headers).json()[
+        "id"
+    ]
+    member = Principal(id=0, email="m@example.com", org_id=org_id, roles=("designer",))
+    outsider = Principal(id=0, email="o@example.com", org_id=org_id + 1, roles=())
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        db_session.expunge_all()
+        run = load_scoped(db_session, models.EvaluationRun, run_id, member)
+        assert run.id == run_id and len(statements) == 1
+        with pytest.raises(HTTPException) as forbidden:
+            load_scoped(db_session, models.EvaluationRun, run_id, outsider)
+        assert forbidden.value.status_code == 403
+        with pytest.raises(HTTPException) as missing:
+            load_scoped(db_session, models.DesignArtifact, 9999, member)
+        assert missing.value.status_code == 404
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert client.get("/api/v1/evaluations/9999", headers=headers).status_code == 404
+    assert (
+        client.get(f"/api/v1/scenarios/{scenario_id}", headers=headers).status_code
+        == 200
+    )
+    art = client.get(f"/api/v1/artifacts/{payload['artifact_id']}", headers=headers)
+    assert art.status_code == 200 and art.json()["id"] == payload["artifact_id"]
+
+
+def test_evaluation_cache_is_org_scoped_and_dataset_versioned(client, db_session):
+    from datetime import datetime, timedelta
+
+    from app import models
+    from app.evaluation_cache import (
+        dataset_versions,
+        evaluation_cache_key,
+        find_cached_run,
+    )
+
+    headers, payload, sc = _prepare_evaluation(client, db_session)
+    project_id = sc.project_id
+    run_id = client.post("/api/v1/evaluations", json=payload, headers=headers).json()[
+        "id"
+    ]
+    cache_key = db_session.get(models.EvaluationRun, run_id).cache_key
+
+    other_org = models.Org(name="orgOther")
+    db_session.add(other_org)
+    db_session.commit()
+    other_project = models.Project(org_id=other_org.id, name="p")
+    db_session.add(other_project)
+    db_session.commit()
+    assert find_cached_run(db_session, cache_key, project_id).id == run_id
+    assert find_cached_run(db_session, cache_key, other_project.id) is None
+
+    ds = models.AnthropometricDataset(org_id=other_org.id, name="d", distributions={})
+    db_session.add(ds)
+    db_session.commit()
+    pop_sc = models.SimulationScenario(
+        project_id=other_project.id,
+        name="pop",
+        config={"population": {"dataset_id": ds.id}},
+    )
+    db_session.add(pop_sc)
+    db_session.commit()
+    before = evaluation_cache_key(
+        pop_sc, None, None, dataset_versions(db_session, [pop_sc])
+    )
+    ds.updated_at = datetime.utcnow() + timedelta(seconds=1)
+    db_session.commit()
+    after = evaluation_cache_key(
+        pop_sc, None, None, dataset_versions(db_session, [pop_sc])
+    )
+    assert before != after
@@ -94,3 +94,80 @@ def test_create_org_register_login_create_project_flow(client, db_session):
     assert r.status_code == 200
     items = r.json()
     assert any(p["id"] == proj["id"] for p in items)
+
+
+def test_project_list_keyset_pagination(client, db_session):
+    from app import models
+
+    org, other = models.Org(name="orgP"), models.Org(name="orgQ")
+    db_session.add_all([org, other])
+    db_session.commit()
+    org_id, other_id = org.id, other.id
+    r = client.post(
+        "/auth/register",
+        json={"email": "p@example.com", "password": "pw", "org_id": org_id},
+    )
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    names = ["delta", "alpha", "charlie", "bravo", "alpha2", "echo", "foxtrot"]
+    db_session.add_all([models.Project(org_id=org_id, name=n) for n in names])
+    db_session.add(models.Project(org_id=other_id, name="alpha-other"))
+    db_session.commit()
+
+    def walk(params):
+        seen, after = [], None
+        while True:
+            q = dict(params, **({"after": after} if after else {}))
+            r = client.get("/api/v1/projects", params=q, headers=headers)
+            assert r.status_code == 200, r.text
+            page = r.json()
+            assert len(page) <= params["limit"]
+            seen += [p["name"] for p in page]
+            after = r.headers.get("x-next-cursor")
+            if not after:
+                assert "link" not in r.headers
+                return seen
+            assert 'rel="next"' in r.headers["link"]
+
+    assert walk({"limit": 3}) == names  # default: id ascending, own org only
+    assert walk({"limit": 2, "sort": "name"}) == sorted(names)
+    assert walk({"limit": 4, "sort": "-name"}) == sorted(names, reverse=True)
+    assert walk({"limit": 10, "q": "ALPHA"}) == ["alpha", "alpha2"]
+
+    r = client.get("/api/v1/projects", params={"limit": 2}, headers=headers)
+    cursor = r.headers["x-next-cursor"]
+    # A cursor only continues the sort order it was issued for
+    r = client.get(
+        "/api/v1/projects", params={"sort": "name", "after": cursor}, headers=headers
+    )
+    assert r.status_code == 400
+    assert (
+        client.get(
+            "/api/v1/projects", params={"after": "garbage"}, headers=headers
+        ).status_code
+        == 400
+    )
+    assert (
+        client.get(
+            "/api/v1/projects", params={"sort": "description"}, headers=headers
+        ).status_code
+        == 400
+    )
+    assert (
+        client.get("/api/v1/projects", params={"limit": 0}, headers=headers).status_code
+        == 422
+    )
+
+
+def test_async_engine_url_follows_database_url():
+    from app.config import Settings
+
+    pg = Settings(DATABASE_URL="postgresql+psycopg2://u:p@db:5432/idp")
+    assert pg.async_sql_url == "postgresql+asyncpg://u:p@db:5432/idp"
+    assert pg.async_pool_options["pool_size"] == pg.db_async_pool_size
+    lite = Settings(DATABASE_URL="sqlite:///./idp.db")
+    assert lite.async_sql_url == "sqlite+aiosqlite:///./idp.db"
+    assert lite.async_pool_options == {}
+    explicit = Settings(
+        DATABASE_URL="sqlite:///./idp.db", ASYNC_DATABASE_URL="sqlite+aiosqlite://"
+    )
+    assert explicit.async_sql_url == "sqlite+aiosqlite://"
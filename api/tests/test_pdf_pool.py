@@ -0,0 +1,68 @@
+import os
+import time
+
+import pytest
+from app.pdf_pool import RendererError, RendererPool, RendererTimeout
+
+# Renderer factories run inside the pool's subprocesses
+FACTORY = "tests.test_pdf_pool:fake_renderer"
+
+
+def fake_renderer():
+    pid = str(os.getpid()).encode()
+
+    def render(html):
+        if html == "boom":
+            raise ValueError("bad html")
+        if html == "slow":
+            time.sleep(5)
+        return b"%PDF " + pid + b" " + html.encode()
+
+    return render
+
+
+def broken_renderer():
+    raise RuntimeError("no fonts")
+
+
+def _pid(pdf):
+    return pdf.split()[1]
+
+
+def test_pool_renders_and_recycles():
+    pool = RendererPool(size=1, max_jobs=2, timeout=10, factory=FACTORY)
+    try:
+        with pytest.raises(RendererError, match="bad html"):
+            pool.render("boom")
+        a = pool.render("<p>a</p>")
+        b = pool.render("<p>b</p>")
+        assert a.endswith(b"<p>a</p>")
+        # A render error does not cost the warm renderer, but counts as a
+        # job: the process is recycled after max_jobs renders
+        assert _pid(a) != _pid(b)
+        assert _pid(pool.render("<p>c</p>")) == _pid(b)
+    finally:
+        pool.close()
+
+
+def test_pool_timeout_replaces_renderer():
+    pool = RendererPool(size=1, max_jobs=10, timeout=10, factory=FACTORY)
+    try:
+        before = _pid(pool.render("warm"))
+        with pytest.raises(RendererTimeout):
+            pool.render("slow", timeout=0.5)
+        after = pool.render("next")
+        assert after.endswith(b"next") and _pid(after) != before
+    finally:
+        pool.close()
+
+
+def test_pool_reports_startup_failure():
+    pool = RendererPool(
+        size=1, timeout=10, factory="tests.test_pdf_pool:broken_renderer"
+    )
+    try:
+        with pytest.raises(RendererError, match="no fonts"):
+            pool.render("<p>x</p>")
+    finally:
+        pool.close()
@@ -1,3 +1,5 @@
+import time
+
 import pytest
 from app import models
 from app.db import Base, get_db
@@ -117,3 +119,194 @@ def test_rbac_denied_cross_org_access_and_audit(client, db_session):
     # Count events
     evts = db_session.query(models.AuditEvent).all()
     assert any("/api/v1/projects" in e.action for e in evts)
+
+
+def test_principal_cached_and_invalidated_on_role_change(
+    client, db_session, monkeypatch
+):
+    import app.dependencies as deps_mod
+    import app.middleware as mw_mod
+    from app import principals
+    from app.security import create_access_token
+
+    auth = auth_headers(client, db_session)
+    admin = (
+        db_session.query(models.User)
+        .filter(models.User.email == "userA@example.com")
+        .first()
+    )
+    admin.roles = ["org_admin"]
+    peer = models.User(
+        email="c@x", hashed_password="hpw", org_id=admin.org_id, roles=["designer"]
+    )
+    db_session.add_all([admin, peer])
+    db_session.commit()
+    peer_id = peer.id
+    admin_h = auth["A"]["h"]
+    peer_h = {"Authorization": f"Bearer {create_access_token(str(peer_id))}"}
+
+    decodes = []
+
+    def counting_decode(token):
+        decodes.append(token)
+        return principals.decode_user_id(token)
+
+    monkeypatch.setattr(deps_mod, "decode_user_id", counting_decode)
+    monkeypatch.setattr(mw_mod, "decode_user_id", counting_decode)
+
+    assert client.get("/api/v1/me", headers=peer_h).json()["roles"] == ["designer"]
+    assert len(decodes) == 1  # once per request, shared by middleware and dependency
+
+    # Cached: a direct DB change is not seen until the entry is invalidated
+    db_session.query(models.User).filter(models.User.id == peer_id).update(
+        {"roles": ["reviewer"]}
+    )
+    db_session.commit()
+    assert client.get("/api/v1/me", headers=peer_h).json()["roles"] == ["designer"]
+
+    r = client.patch(
+        f"/api/v1/users/{peer_id}/roles",
+        json={"roles": ["researcher"]},
+        headers=admin_h,
+    )
+    assert r.status_code == 200, r.text
+    assert client.get("/api/v1/me", headers=peer_h).json()["roles"] == ["researcher"]
+
+    assert client.delete(f"/api/v1/users/{peer_id}", headers=admin_h).status_code == 204
+    assert client.get("/api/v1/me", headers=peer_h).status_code == 401
+
+
+def test_principal_invalidations_are_broadcast(monkeypatch):
+    import asyncio
+
+    from app import events, principals
+
+    class FakeRedis:
+        def __init__(self):
+            self.sent = []
+
+        def publish(self, name, payload):
+            self.sent.append((name, payload))
+
+    # Sent even while progress events are backing off after a Redis failure
+    fake = FakeRedis()
+    monkeypatch.setattr(events, "_get_client", lambda: fake)
+    monkeypatch.setattr(events, "_disabled_until", float("inf"))
+    events.publish(1, "log", {"msg": "skipped"})
+    principals.invalidate_principal(7)
+    assert fake.sent == [(principals.INVALIDATION_CHANNEL, '{"user_id": 7}')]
+
+    # Another process' broadcast drops only that user's entry
+    for user_id in (7, 8):
+        principals.principal_cache.put(
+            principals.Principal(id=user_id, email=f"{user_id}@x", org_id=1, roles=())
+        )
+
+    async def fake_listen(name, poll_seconds=1.0):
+        yield None
+        yield {"user_id": 7}
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(events, "listen", fake_listen)
+
+    async def run_listener():
+        task = asyncio.create_task(principals.listen_for_invalidations())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(run_listener())
+    assert principals.principal_cache.get(7) is None
+    assert principals.principal_cache.get(8) is not None
+
+
+def test_audit_writer_batches_drops_and_flushes(db_session):
+    import threading
+
+    from app.audit import AuditWriter
+
+    Session = sessionmaker(bind=db_session.get_bind())
+    org = models.Org(name="O")
+    db_session.add(org)
+    db_session.commit()
+    user = models.User(email="u@x", hashed_password="h", org_id=org.id, roles=[])
+    db_session.add(user)
+    db_session.commit()
+    user_id, org_id = user.id, org.id
+
+    batches = []
+    gate = threading.Event()
+
+    class CountingWriter(AuditWriter):
+        def _write(self, events):
+            gate.wait(5)
+            batches.append(len(events))
+            super()._write(events)
+
+    def evt(i, uid=None):
+        return {"org_id": None, "user_id": uid, "action": f"GET /{i}", "details": {}}
+
+    w = CountingWriter(Session, maxsize=5, batch_size=3, flush_interval=5.0)
+    # Writer blocked on the first batch: the bounded queue fills and drops
+    for i in range(3):
+        assert w.submit(evt(i))
+    deadline = time.monotonic() + 5
+    while w.stats()["queued"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    results = [w.submit(evt(i, user_id)) for i in range(3, 10)]
+    assert results.count(False) == 2
+    assert w.stats()["dropped"] == 2
+    gate.set()
+    assert w.flush()
+    assert batches[0] == 3  # batch size reached before the interval
+    w.submit(evt(99, 12345))  # unknown user: reference dropped, batch still lands
+    w.close()
+    assert w.stats()["written"] == 9 and w.stats()["failed"] == 0
+    rows = db_session.query(models.AuditEvent).order_by(models.AuditEvent.id).all()
+    assert len(rows) == 9
+    assert rows[3].user_id == user_id and rows[3].org_id == org_id
+    assert rows[-1].user_id is None
+
+
+def test_audit_reads_only_small_json_bodies(client, db_session, monkeypatch):
+    from starlette.requests import Request
+
+    from app.config import settings
+
+    auth_headers(client, db_session)
+
+    def details(action):
+        evts = db_session.query(models.AuditEvent).filter(
+            models.AuditEvent.action == action
+        )
+        return [e.details for e in evts]
+
+    # JSON bodies are snapshotted with secrets redacted
+    reg = details("POST /auth/register")[0]
+    assert reg["before"]["password"] == "***"
+    assert reg["before"]["email"] == "userA@example.com"
+    # Form posts are described, not read
+    tok = details("POST /auth/token")[0]
+    assert tok["before"] is None
+    assert tok["body"]["content_type"] == "application/x-www-form-urlencoded"
+
+    reads = []
+    orig_body = Request.body
+
+    async def counting_body(self):
+        reads.append(self.url.path)
+        return await orig_body(self)
+
+    monkeypatch.setattr(Request, "body", counting_body)
+    blob = b"\0" * 200_000
+    client.post("/api/v1/nowhere", files={"file": ("part.step", blob)})
+    monkeypatch.setattr(settings, "audit_max_body_bytes", 16)
+    client.post("/api/v1/nowhere2", json={"name": "x" * 64})
+    assert reads == []
+    up = details("POST /api/v1/nowhere")[0]
+    assert up["before"] is None
+    assert up["body"]["content_type"] == "multipart/form-data"
+    assert up["body"]["content_length"] > len(blob)
+    assert (
+        details("POST /api/v1/nowhere2")[0]["body"]["content_type"]
+        == "application/json"
+    )
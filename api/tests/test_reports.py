@@ -1,3 +1,5 @@
+import hashlib
+
 import pytest
 from app import models
 from app import storage as storage_mod
@@ -44,7 +46,12 @@ def db_session():
 
 
 @pytest.fixture(scope="function")
-def client(db_session, monkeypatch):
+def fake_s3():
+    return FakeS3()
+
+
+@pytest.fixture(scope="function")
+def client(db_session, fake_s3, monkeypatch):
     def override_get_db():
         try:
             yield db_session
@@ -64,15 +71,16 @@ def client(db_session, monkeypatch):
 
     tasks_mod.SessionLocal = lambda: db_session
 
-    fake = FakeS3()
+    fake = fake_s3
     monkeypatch.setattr(storage_mod, "get_s3_client", lambda: fake)
     monkeypatch.setattr(
         storage_mod, "ensure_bucket_exists", lambda client=None, bucket=None: None
     )
-    # Patch the evaluations router to use the fake S3 client as well
-    import app.routers.evaluations as eval_router
-
-    monkeypatch.setattr(eval_router, "get_s3_client", lambda: fake)
+    # Report builds upload from the Celery task
+    monkeypatch.setattr(tasks_mod, "get_s3_client", lambda: fake)
+    monkeypatch.setattr(
+        tasks_mod, "ensure_bucket_exists", lambda client=None, bucket=None: None
+    )
     from app.config import settings
 
     settings.s3_bucket = "test-bkt"
@@ -141,13 +149,44 @@ def ready_evaluation(client, db_session):
     return headers, eid
 
 
-def test_report_checksum_stable(client, db_session):
+def test_report_checksum_stable(client, db_session, fake_s3):
     headers, eid = ready_evaluation(client, db_session)
     r1 = client.post(f"/api/v1/evaluations/{eid}/report", headers=headers)
-    assert r1.status_code == 200, r1.text
-    rep1 = r1.json()
+    assert r1.status_code == 202, r1.text
+    assert r1.headers["location"] == f"/api/v1/evaluations/{eid}/report"
+    # Celery runs eagerly here, so the build has finished; poll like a client
+    rep1 = client.get(f"/api/v1/evaluations/{eid}/report", headers=headers).json()
+    assert rep1["status"] == "done"
     r2 = client.post(f"/api/v1/evaluations/{eid}/report", headers=headers)
     rep2 = r2.json()
     assert rep1["checksum_sha256"] == rep2["checksum_sha256"]
     assert rep1["presigned_pdf_url"].startswith("https://example.com/")
     assert rep1["presigned_html_url"].startswith("https://example.com/")
+
+    # Checksum is kept in a sidecar, not inside the rendered document
+    objects = {key: body for (_, key), body in fake_s3.objects.items()}
+    pdf = objects[rep1["pdf_key"]]
+    assert hashlib.sha256(pdf).hexdigest() == rep1["checksum_sha256"]
+    sidecar = objects[rep1["pdf_key"] + ".sha256"].decode()
+    assert sidecar.split()[0] == rep1["checksum_sha256"]
+    assert rep1["checksum_sha256"] not in objects[rep1["html_key"]].decode()
+
+
+def test_unchanged_report_is_not_rebuilt(client, db_session, fake_s3, monkeypatch):
+    headers, eid = ready_evaluation(client, db_session)
+    puts = []
+    put_object = fake_s3.put_object
+    monkeypatch.setattr(
+        fake_s3, "put_object", lambda **kw: (puts.append(kw["Key"]), put_object(**kw))
+    )
+
+    first = client.post(f"/api/v1/evaluations/{eid}/report", headers=headers)
+    assert first.status_code == 202, first.text
+    assert len(puts) == 3  # html, pdf, sha256 sidecar
+
+    again = client.post(f"/api/v1/evaluations/{eid}/report", headers=headers)
+    assert again.status_code == 200, again.text
+    assert again.json()["cached"] is True
+    assert again.json()["id"] == first.json()["id"]
+    assert len(puts) == 3
+    assert db_session.query(models.Report).count() == 1
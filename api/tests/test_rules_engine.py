@@ -1,5 +1,15 @@
+import json
+from pathlib import Path
+
+import numpy as np
 import pytest
-from app.rules import UnsafeExpression, evaluate_condition, evaluate_rule
+from app.rules import (
+    RulePackCache,
+    UnsafeExpression,
+    evaluate_condition,
+    evaluate_rule,
+    evaluate_rules_batch,
+)
 
 
 def test_evaluator_basic_arithmetic_and_logic():
@@ -64,3 +74,143 @@ def test_rule_torque_limit_with_threshold_input():
     assert (
         evaluate_rule(rule, {"torque_Nm": 0.3, "max_torque_Nm": 0.25}).passed is False
     )
+
+
+def test_evaluator_chained_comparison_and_js_operators():
+    assert evaluate_condition("1 < x <= 3", {"x": 3}) is True
+    assert evaluate_condition("1 < x <= 3", {"x": 4}) is False
+    assert evaluate_condition("x > 0 && y > 0 || z", {"x": 1, "y": 0, "z": True})
+    with pytest.raises(UnsafeExpression):
+        evaluate_condition("x > 0 or missing > 0", {"x": 1})
+
+
+def test_compiled_rulepack_cache_reuses_and_tracks_content():
+    cache = RulePackCache(maxsize=2)
+    rules = {
+        "rules": [
+            {
+                "id": "contrast",
+                "thresholds": {"min_ratio": 4.5},
+                "condition": "contrast_ratio >= min_ratio",
+                "severity": "high",
+            },
+            {"id": "bad", "condition": "open('x')", "severity": "low"},
+        ]
+    }
+    pack = cache.get(1, "1.0.0", rules)
+    assert cache.get(1, "1.0.0", rules) is pack
+    assert [r.id for r in pack.rules] == ["contrast", "bad"]
+    assert pack.rules[0].evaluate({"contrast_ratio": 7.0}).passed is True
+    # Invalid conditions only fail their own rule, at evaluation time
+    with pytest.raises(UnsafeExpression):
+        pack.rules[1].evaluate({})
+
+    edited = {"rules": [dict(rules["rules"][0], thresholds={"min_ratio": 8.0})]}
+    pack2 = cache.get(1, "1.0.0", edited)
+    assert pack2 is not pack
+    assert pack2.rules[0].evaluate({"contrast_ratio": 7.0}).passed is False
+    cache.get(2, "1.0.0", rules)
+    assert len(cache) == 2
+
+
+def test_compiled_rulepack_cache_keys_saved_packs_on_updated_at(monkeypatch):
+    from datetime import datetime
+
+    from app import rules as rules_mod
+
+    def no_hashing(rules):
+        raise AssertionError("content hashed for a saved rulepack")
+
+    monkeypatch.setattr(rules_mod, "rulepack_content_hash", no_hashing)
+    cache = RulePackCache()
+    rules = {"rules": [{"id": "r", "condition": "x > 1"}]}
+    saved = datetime(2026, 10, 17, 12, 0)
+    pack = cache.get(1, "1.0.0", rules, saved)
+    assert cache.get(1, "1.0.0", rules, saved) is pack
+    edited = {"rules": [{"id": "r", "condition": "x > 2"}]}
+    pack2 = cache.get(1, "1.0.0", edited, datetime(2026, 10, 17, 12, 5))
+    assert pack2 is not pack
+    assert pack2.rules[0].evaluate({"x": 2}).passed is False
+
+
+def test_batch_evaluation_matches_scalar_rules():
+    seed = Path(__file__).resolve().parents[1] / "seeds" / "rulepack_general_eu_v1.json"
+    rules = json.loads(seed.read_text(encoding="utf-8"))["rules"]
+    rng = np.random.default_rng(0)
+    n = 500
+    names = {v for r in rules for v in (r.get("variables") or [])}
+    columns = {name: rng.uniform(0, 2000, n) for name in names}
+    columns["slope_ratio"] = rng.uniform(0, 0.2, n)
+    columns["flash_hz"] = rng.uniform(0, 3, n)
+
+    batch = evaluate_rules_batch(rules, columns)
+    assert batch.passed.shape == (len(rules), n)
+    assert batch.errors == {}
+    for i, rule in enumerate(rules):
+        for row in (0, 17, n - 1):
+            inputs = {k: float(v[row]) for k, v in columns.items()}
+            assert batch.passed[i, row] == evaluate_rule(rule, inputs).passed
+
+
+def test_batch_evaluation_chained_scalars_and_errors():
+    rules = [
+        {
+            "id": "range",
+            "thresholds": {"lo": 1},
+            "condition": "lo < x <= 3 && not flag",
+        },
+        {"id": "missing", "condition": "y > 0"},
+    ]
+    batch = evaluate_rules_batch(
+        rules, {"x": np.array([0.5, 2.0, 3.0, 4.0]), "flag": False}
+    )
+    assert batch.ids == ["range", "missing"]
+    assert batch.passed[0].tolist() == [False, True, True, False]
+    assert not batch.passed[1].any()
+    assert "Unknown variable" in batch.errors["missing"]
+
+
+def test_batch_evaluation_zero_divisor_matches_scalar_errors():
+    rules = [
+        {"id": "ratio", "condition": "force / reach < 2"},
+        {"id": "mod", "condition": "x % reach == 0 or x > 0"},
+    ]
+    columns = {"force": np.array([1.0, 1.0, 0.0]), "reach": np.array([1.0, 0.0, 0.0])}
+    columns["x"] = np.array([2.0, 2.0, 2.0])
+    batch = evaluate_rules_batch(rules, columns)
+    assert batch.errors == {}
+    for i, rule in enumerate(rules):
+        for row in range(3):
+            inputs = {k: float(v[row]) for k, v in columns.items()}
+            try:
+                expected, errored = evaluate_rule(rule, inputs).passed, False
+            except ZeroDivisionError:
+                expected, errored = False, True
+            assert batch.row_errors[i, row] == errored
+            assert batch.passed[i, row] == expected
+    assert batch.row_errors[:, 1:].all() and not batch.row_errors[:, 0].any()
+
+
+def test_compiled_rulepack_static_variable_analysis():
+    pack = RulePackCache().get(
+        1,
+        "1.0.0",
+        {
+            "rules": [
+                {
+                    "id": "button",
+                    "variables": ["button_width_mm"],
+                    "thresholds": {"min_mm": 9},
+                    "condition": "button_width_mm >= min_mm && h_mm >= min_mm",
+                },
+                {"id": "reach", "condition": "distance_cm <= 60"},
+            ]
+        },
+    )
+    assert pack.rules[0].variables == ("button_width_mm",)
+    assert pack.rules[0].requires == {"button_width_mm", "h_mm"}
+    assert pack.requires == {"button_width_mm", "h_mm", "distance_cm"}
+    # Thresholds are layered over the shared inputs without mutating them
+    base = {"button_width_mm": 10.0, "h_mm": 9.0, "min_mm": 100}
+    assert pack.rules[0].evaluate(base).passed is True
+    assert base["min_mm"] == 100
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from app.services.datasets import interpolate_percentile
+from app.simulations import simulate_population
+
+DISTRIBUTIONS = {
+    "forward_reach_cm": [
+        {"sex": "all", "percentiles": {"p5": 55.0, "p50": 65.0, "p95": 75.0}},
+        {"sex": "F", "percentiles": {"p5": 50.0, "p50": 60.0, "p95": 70.0}},
+    ],
+    "strength_N": [{"percentiles": {"p5": 10.0, "p50": 25.0, "p95": 40.0}}],
+}
+
+
+def test_interpolate_percentile_accepts_arrays():
+    ps = np.array([0.0, 5.0, 27.5, 50.0, 72.5, 95.0, 100.0])
+    out = interpolate_percentile(165.0, 177.0, 190.0, ps)
+    expected = [interpolate_percentile(165.0, 177.0, 190.0, float(p)) for p in ps]
+    assert np.allclose(out, expected)
+
+
+def test_population_accommodated_fractions():
+    res = simulate_population(
+        DISTRIBUTIONS,
+        n=200_000,
+        distance_cm=65.0,
+        required_force_N=25.0,
+        capability_N=0.0,
+        contrast=7.0,
+        seed=42,
+    )
+    assert res["n"] == 200_000
+    # Distance at the median reach / force at the median strength
+    assert abs(res["reach"]["accommodated"] - 0.5) < 0.01
+    assert abs(res["strength"]["accommodated"] - 0.5) < 0.01
+    # No visual metric in the dataset: falls back to WCAG 4.5:1 for everyone
+    assert res["visual"] == {"accommodated": 1.0, "metric": None}
+    idx = res["inclusivity_index"]
+    assert abs(idx["accommodated"] - 0.25) < 0.01
+    assert abs(idx["mean_score"] - (0.4 * 0.5 + 0.3 * 0.5 + 0.3)) < 0.01
+
+
+def test_population_segment_and_seed_are_respected():
+    kwargs = dict(
+        n=50_000,
+        distance_cm=60.0,
+        required_force_N=5.0,
+        capability_N=0.0,
+        contrast=3.0,
+        seed=7,
+    )
+    everyone = simulate_population(DISTRIBUTIONS, **kwargs)
+    women = simulate_population(DISTRIBUTIONS, sex="F", **kwargs)
+    assert women["reach"]["accommodated"] < everyone["reach"]["accommodated"]
+    assert simulate_population(DISTRIBUTIONS, **kwargs) == everyone
+    assert everyone["visual"]["accommodated"] == 0.0
+
+
+def test_population_is_sampled_within_the_fitted_range():
+    res = simulate_population(
+        DISTRIBUTIONS,
+        n=100_000,
+        distance_cm=55.0,
+        required_force_N=40.0,
+        capability_N=0.0,
+        contrast=7.0,
+        seed=1,
+    )
+    # Tails are not clamped: no 5% point mass on p95 (or p5) of the table
+    assert res["strength"]["accommodated"] < 0.001
+    assert res["reach"]["p5"] > 55.5
+    with pytest.raises(ValueError):
+        simulate_population(
+            DISTRIBUTIONS,
+            n=0,
+            distance_cm=1.0,
+            required_force_N=1.0,
+            capability_N=0.0,
+            contrast=7.0,
+        )
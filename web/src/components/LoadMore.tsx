@@ -0,0 +1,24 @@
+import React, { useState } from 'react';
+
+type Props = {
+  next: string | null | undefined;
+  onMore: (after: string) => Promise<void>;
+  label?: string;
+};
+
+// Fetches the next page of a keyset-paginated list; hidden on the last page
+export default function LoadMore({ next, onMore, label = 'Load more' }: Props) {
+  const [busy, setBusy] = useState(false);
+  if (!next) return null;
+  return (
+    <button
+      type="button"
+      className="btn btn-outline"
+      disabled={busy}
+      onClick={async () => {
+        setBusy(true);
+        try { await onMore(next); } finally { setBusy(false); }
+      }}
+    >{busy ? 'Loading...' : label}</button>
+  );
+}
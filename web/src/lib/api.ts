@@ -22,7 +22,7 @@ import { getToken, setToken } from './auth';
 
 type Opts = RequestInit & { auth?: boolean };
 
-async function request(path: string, opts: Opts = {}) {
+async function send(path: string, opts: Opts = {}): Promise<Response> {
   const headers = new Headers(opts.headers || {});
   headers.set('Accept', 'application/json');
   if (!(opts.body instanceof FormData)) headers.set('Content-Type', 'application/json');
@@ -40,11 +40,87 @@ async function request(path: string, opts: Opts = {}) {
     const msg = await res.text();
     throw new Error(msg || res.statusText);
   }
+  return res;
+}
+
+async function request(path: string, opts: Opts = {}) {
+  const res = await send(path, opts);
   const ct = res.headers.get('content-type') || '';
   if (ct.includes('application/json')) return res.json();
   return res.text();
 }
 
+// Keyset pagination: list endpoints return one page (default 100 rows);
+// the cursor of the next page comes back in the X-Next-Cursor header.
+// The `list` helpers return one page; pass `after: page.next` for the next
+// one (see components/LoadMore). Only small, bounded lists (rulepacks,
+// datasets) are fetched whole via listAll.
+export type ListParams = { limit?: number; after?: string; sort?: string; q?: string; [k: string]: any };
+
+function qs(params?: ListParams): string {
+  if (!params) return '';
+  const sp = new URLSearchParams();
+  for (const [k, v] of Object.entries(params)) if (v !== undefined && v !== null && v !== '') sp.set(k, String(v));
+  const s = sp.toString();
+  return s ? `?${s}` : '';
+}
+
+function withParams(path: string, params?: ListParams): string {
+  const q = qs(params);
+  if (!q) return path;
+  return path.includes('?') ? `${path}&${q.slice(1)}` : `${path}${q}`;
+}
+
+const MAX_PAGE = 500;
+
+export type Page<T = any> = { items: T[]; next: string | null };
+
+export async function listPage<T = any>(path: string, params?: ListParams): Promise<Page<T>> {
+  const res = await send(withParams(path, params));
+  return { items: await res.json(), next: res.headers.get('X-Next-Cursor') };
+}
+
+// Every row of a listing, fetched in max-size pages
+export async function listAll<T = any>(path: string, params?: ListParams): Promise<T[]> {
+  const items: T[] = [];
+  let after: string | undefined = params?.after;
+  do {
+    const page = await listPage<T>(path, { limit: MAX_PAGE, ...params, after });
+    items.push(...page.items);
+    after = page.next ?? undefined;
+  } while (after);
+  return items;
+}
+
+// Listings omit presigned URLs; pages fetch them with one batched
+// POST /api/v1/files/presign for the rows on screen. Maps key field -> URL field.
+export type UrlFields = Record<string, string>;
+export const ARTIFACT_URLS: UrlFields = { object_key: 'presigned_url' };
+export const REPORT_URLS: UrlFields = { html_key: 'presigned_html_url', pdf_key: 'presigned_pdf_url' };
+const MAX_PRESIGN_KEYS = 500;
+
+// Object keys of rows whose URL has not been fetched yet
+export function missingUrlKeys(rows: Array<Record<string, any>>, fields: UrlFields): string[] {
+  const keys = new Set<string>();
+  for (const row of rows) {
+    for (const [keyField, urlField] of Object.entries(fields)) {
+      if (row[keyField] && row[urlField] == null) keys.add(row[keyField]);
+    }
+  }
+  return [...keys];
+}
+
+// Fill URLs from a presign result; keys without a URL get '' so they are not requested again
+export function applyUrls<T extends Record<string, any>>(rows: T[], fields: UrlFields, urls: Record<string, string>): T[] {
+  return rows.map((row) => {
+    const out: Record<string, any> = { ...row };
+    for (const [keyField, urlField] of Object.entries(fields)) {
+      if (row[keyField] && row[urlField] == null) out[urlField] = urls[row[keyField]] ?? '';
+    }
+    return out as T;
+  });
+}
+
 export const api = {
   async login(email: string, password: string): Promise<string> {
     const form = new URLSearchParams();
@@ -67,13 +143,16 @@ export const api = {
       }),
   },
   projects: {
-    list: () => request('/api/v1/projects'),
+    list: (params?: ListParams) => listPage('/api/v1/projects', params),
     create: (name: string, description?: string) =>
       request('/api/v1/projects', {
         method: 'POST',
         body: JSON.stringify({ name, description }),
       }),
     get: (id: number) => request(`/api/v1/projects/${id}`),
+    // Pre-aggregated daily rollups; since/until are YYYY-MM-DD (UTC), default last 30 days
+    dashboard: (id: number, params?: { since?: string; until?: string }) =>
+      request(withParams(`/api/v1/projects/${id}/dashboard`, params)),
     update: (id: number, name: string, description?: string) =>
       request(`/api/v1/projects/${id}` , {
         method: 'PATCH',
@@ -86,11 +165,11 @@ export const api = {
       remove: (projectId: number, user_id: number) => request(`/api/v1/projects/${projectId}/members/${user_id}`, { method: 'DELETE' }),
     },
     reports: {
-      list: (projectId: number) => request(`/api/v1/projects/${projectId}/reports`),
+      list: (projectId: number, params?: ListParams) => listPage(`/api/v1/projects/${projectId}/reports`, params),
       delete: (projectId: number, reportId: number) => request(`/api/v1/projects/${projectId}/reports/${reportId}`, { method: 'DELETE' }),
     },
     evaluations: {
-      list: (projectId: number) => request(`/api/v1/projects/${projectId}/evaluations`),
+      list: (projectId: number, params?: ListParams) => listPage(`/api/v1/projects/${projectId}/evaluations`, params),
     },
   },
   artifacts: {
@@ -112,22 +191,52 @@ export const api = {
       return res.json();
     },
     delete: (projectId: number, id: number) => request(`/api/v1/projects/${projectId}/artifacts/${id}`, { method: 'DELETE' }),
-    list: (projectId: number) => request(`/api/v1/projects/${projectId}/artifacts`),
+    list: (projectId: number, params?: ListParams) => listPage(`/api/v1/projects/${projectId}/artifacts`, params),
     get: (id: number) => request(`/api/v1/artifacts/${id}`),
     convert: (id: number) => request(`/api/v1/artifacts/${id}/convert`, { method: 'POST' }),
   },
+  files: {
+    // Presigned GET URLs for object keys from listings (which omit them by default)
+    presign: (keys: string[]): Promise<{ urls: Record<string, string> }> =>
+      request('/api/v1/files/presign', { method: 'POST', body: JSON.stringify({ keys }) }),
+    // Any number of keys, in batches of the endpoint's maximum
+    presignAll: async (keys: string[]): Promise<Record<string, string>> => {
+      const urls: Record<string, string> = {};
+      for (let i = 0; i < keys.length; i += MAX_PRESIGN_KEYS) {
+        Object.assign(urls, (await api.files.presign(keys.slice(i, i + MAX_PRESIGN_KEYS))).urls);
+      }
+      return urls;
+    },
+  },
   evaluations: {
     enqueue: (artifact_id: number, scenario_id: number, rulepack_id: number, opts?: { debug?: boolean; webhook_url?: string }) =>
       request('/api/v1/evaluations', { method: 'POST', body: JSON.stringify({ artifact_id, scenario_id, rulepack_id, debug: opts?.debug ?? false, webhook_url: opts?.webhook_url }) }),
     get: (id: number) => request(`/api/v1/evaluations/${id}`),
-    report: (id: number) => request(`/api/v1/evaluations/${id}/report`, { method: 'POST' }),
+    // EventSource cannot send headers, so the token travels as a query param
+    events: (id: number) => {
+      const token = getToken();
+      const qs = token ? `?access_token=${encodeURIComponent(token)}` : '';
+      return new EventSource(`${BASE}/api/v1/evaluations/${id}/events${qs}`);
+    },
+    // Reports are built by a worker: queue (202), then poll until done
+    report: async (id: number, timeoutMs = 300000) => {
+      let rep = await request(`/api/v1/evaluations/${id}/report`, { method: 'POST' });
+      const deadline = Date.now() + timeoutMs;
+      while (rep?.status !== 'done') {
+        if (rep?.status === 'error') throw new Error(rep.error || 'Report failed');
+        if (Date.now() > deadline) throw new Error('Timed out waiting for report');
+        await new Promise((r) => setTimeout(r, 1000));
+        rep = await request(`/api/v1/evaluations/${id}/report`);
+      }
+      return rep;
+    },
     delete: (id: number) => request(`/api/v1/evaluations/${id}`, { method: 'DELETE' }),
   },
   demo: {
     seed: () => request('/api/v1/demo/seed', { method: 'POST' }),
   },
   scenarios: {
-    list: (projectId?: number) => request(`/api/v1/scenarios${projectId ? `?project_id=${projectId}` : ''}`),
+    list: (projectId?: number, params?: ListParams) => listPage(`/api/v1/scenarios${projectId ? `?project_id=${projectId}` : ''}`, params),
     get: (id: number) => request(`/api/v1/scenarios/${id}`),
     create: (project_id: number, name: string, config?: any) =>
       request('/api/v1/scenarios', {
@@ -137,8 +246,10 @@ export const api = {
     delete: (id: number) => request(`/api/v1/scenarios/${id}`, { method: 'DELETE' }),
   },
   rulepacks: {
-    list: () => request('/api/v1/rulepacks'),
+    list: (params?: ListParams) => listAll('/api/v1/rulepacks', params),
     get: (id: number) => request(`/api/v1/rulepacks/${id}`),
+    dashboard: (id: number, params?: { since?: string; until?: string }) =>
+      request(withParams(`/api/v1/rulepacks/${id}/dashboard`, params)),
     create: (name: string, version: string, rules?: any) =>
       request('/api/v1/rulepacks', {
         method: 'POST',
@@ -148,7 +259,7 @@ export const api = {
   },
   datasets: {
     anthro: {
-      list: () => request('/api/v1/datasets/anthropometrics'),
+      list: (params?: ListParams) => listAll('/api/v1/datasets/anthropometrics', params),
       get: (id: number) => request(`/api/v1/datasets/anthropometrics/${id}`),
       delete: (id: number) => request(`/api/v1/datasets/anthropometrics/${id}`, { method: 'DELETE' }),
       create: (name: string, source?: string, schema?: any, distributions?: any) =>
@@ -158,7 +269,7 @@ export const api = {
         }),
     },
     abilities: {
-      list: () => request('/api/v1/datasets/abilities'),
+      list: (params?: ListParams) => listAll('/api/v1/datasets/abilities', params),
       get: (id: number) => request(`/api/v1/datasets/abilities/${id}`),
       delete: (id: number) => request(`/api/v1/datasets/abilities/${id}`, { method: 'DELETE' }),
       create: (name: string, data?: any) =>
@@ -170,7 +281,7 @@ export const api = {
   },
   users: {
     me: () => request('/api/v1/me'),
-    list: () => request('/api/v1/users'),
+    list: (params?: ListParams) => listPage('/api/v1/users', params),
     setRoles: (id: number, roles: string[]) =>
       request(`/api/v1/users/${id}/roles`, { method: 'PATCH', body: JSON.stringify({ roles }) }),
     setPassword: (id: number, password: string) =>
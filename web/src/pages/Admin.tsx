@@ -1,8 +1,9 @@
 import React, { useEffect, useState } from 'react';
 import Layout from '../components/Layout';
-import { api, normalizeS3 } from '../lib/api';
+import { api, applyUrls, ARTIFACT_URLS, missingUrlKeys, normalizeS3 } from '../lib/api';
 import Confirm from '../components/Confirm';
 import Toast from '../components/Toast';
+import LoadMore from '../components/LoadMore';
 
 type User = { id: number; email: string; org_id?: number | null; roles: string[] };
 
@@ -27,27 +28,47 @@ export default function AdminPage() {
   const [projEditDesc, setProjEditDesc] = useState('');
   const [addUserId, setAddUserId] = useState<number | ''>('');
   const [projScenarios, setProjScenarios] = useState<Array<{ id:number; name:string }>>([]);
-  const [projArtifacts, setProjArtifacts] = useState<Array<{ id:number; name:string; presigned_url?: string }>>([]);
+  const [projArtifacts, setProjArtifacts] = useState<Array<{ id:number; name:string; object_key?: string; presigned_url?: string }>>([]);
   const [rulepacks, setRulepacks] = useState<Array<{ id:number; name:string; version?: string }>>([]);
   const [runScenarioId, setRunScenarioId] = useState<number | ''>('');
   const [runRulepackId, setRunRulepackId] = useState<number | ''>('');
   const [reportEvalId, setReportEvalId] = useState<string>('');
   const [reportBusy, setReportBusy] = useState(false);
   const [reportLink, setReportLink] = useState<string | null>(null);
+  // Next-page cursors of the paginated lists, by list name
+  const [cursors, setCursors] = useState<Record<string, string | null>>({});
+  const setCursor = (list: string, next: string | null) => setCursors((prev) => ({ ...prev, [list]: next }));
+
+  async function loadProjectLists(pid: number) {
+    try {
+      const page = await api.scenarios.list(pid);
+      setProjScenarios(page.items);
+      setCursor('scenarios', page.next);
+      setRunScenarioId(page.items[0]?.id || '');
+    } catch {}
+    try {
+      const page = await api.artifacts.list(pid);
+      setProjArtifacts(page.items);
+      setCursor('artifacts', page.next);
+    } catch {}
+  }
 
   async function load() {
     try {
       const u = await api.users.me();
       setMe(u);
       try {
-        const list = await api.users.list();
-        setUsers(list);
+        const page = await api.users.list();
+        setUsers(page.items);
+        setCursor('users', page.next);
       } catch (e: any) {
         // not fatal (may be 403 for non-admins)
       }
       try {
-        const projs = await api.projects.list();
+        const page = await api.projects.list();
+        const projs = page.items;
         setProjects(projs);
+        setCursor('projects', page.next);
         if (!selectedProject && projs.length) {
           setSelectedProject(projs[0].id);
           setProjEditName(projs[0].name || '');
@@ -55,30 +76,14 @@ export default function AdminPage() {
           const pid = projs[0].id;
           const mem = await api.projects.members.list(pid);
           setProjMembers(mem);
-          try {
-            const scs = await api.scenarios.list(pid);
-            setProjScenarios(scs);
-            setRunScenarioId(scs[0]?.id || '');
-          } catch {}
-          try {
-            const arts = await api.artifacts.list(pid);
-            setProjArtifacts(arts);
-          } catch {}
+          await loadProjectLists(pid);
         } else if (selectedProject) {
           const p = projs.find(p=>p.id===selectedProject);
           if (p) { setProjEditName(p.name||''); setProjEditDesc(p.description||''); }
           const pid = Number(selectedProject);
           const mem = await api.projects.members.list(pid);
           setProjMembers(mem);
-          try {
-            const scs = await api.scenarios.list(pid);
-            setProjScenarios(scs);
-            setRunScenarioId(scs[0]?.id || '');
-          } catch {}
-          try {
-            const arts = await api.artifacts.list(pid);
-            setProjArtifacts(arts);
-          } catch {}
+          await loadProjectLists(pid);
         }
       } catch (e: any) { /* ignore */ }
       try {
@@ -89,6 +94,11 @@ export default function AdminPage() {
     } catch (e: any) { setErr(e.message); }
   }
   useEffect(() => { void load(); }, []);
+  // Listings omit presigned URLs; fetch them for the shown artifacts in one batch
+  useEffect(() => {
+    const keys = missingUrlKeys(projArtifacts, ARTIFACT_URLS);
+    if (keys.length) api.files.presignAll(keys).then((urls) => setProjArtifacts((prev) => applyUrls(prev, ARTIFACT_URLS, urls))).catch(() => {});
+  }, [projArtifacts]);
 
   function toggleRole(target: User, role: string, on: boolean): string[] {
     const set = new Set(target.roles || []);
@@ -123,14 +133,14 @@ export default function AdminPage() {
                 // Set roles for the new user
                 if (created?.access_token || true) {
                   // We don't need the token; we set roles via admin endpoint
-                  const list = await api.users.list();
-                  const nu = list.find(u => u.email === newEmail.trim());
+                  const { items } = await api.users.list({ q: newEmail.trim() });
+                  const nu = items.find((u: User) => u.email === newEmail.trim());
                   if (nu) {
                     await api.users.setRoles(nu.id, newRoles);
                   }
                 }
                 setNewEmail(''); setNewPassword(''); setNewRoles(['designer']);
-                const list2 = await api.users.list(); setUsers(list2);
+                const page = await api.users.list(); setUsers(page.items); setCursor('users', page.next);
                 setToast({ msg: 'User created' });
               } catch (e: any) { setErr(e.message); }
             }}
@@ -215,6 +225,16 @@ export default function AdminPage() {
               ))}
             </tbody>
           </table>
+          <LoadMore
+            next={cursors.users}
+            onMore={async (after) => {
+              try {
+                const page = await api.users.list({ after });
+                setUsers((prev) => [...prev, ...page.items]);
+                setCursor('users', page.next);
+              } catch (e: any) { setErr(e.message); }
+            }}
+          />
           <div className="muted">Note: Only org_admin can manage users in their org; superadmin can manage all.</div>
         </div>
       )}
@@ -243,22 +263,25 @@ export default function AdminPage() {
             setProjEditDesc(p?.description || '');
             const mem = await api.projects.members.list(v);
             setProjMembers(mem);
-            try {
-              const scs = await api.scenarios.list(v);
-              setProjScenarios(scs);
-              setRunScenarioId(scs[0]?.id || '');
-            } catch {}
-            try {
-              const arts = await api.artifacts.list(v);
-              setProjArtifacts(arts);
-            } catch {}
+            await loadProjectLists(v);
           } else {
-            setProjEditName(''); setProjEditDesc(''); setProjMembers([]); setProjScenarios([]); setProjArtifacts([]);
+            setProjEditName(''); setProjEditDesc(''); setProjMembers([]); setProjScenarios([]); setProjArtifacts([]); setCursor('scenarios', null); setCursor('artifacts', null);
           }
         }}>
           <option value="">-- choose --</option>
           {projects.map(p => <option key={p.id} value={p.id}>{p.name} (#{p.id})</option>)}
         </select>
+        <LoadMore
+          next={cursors.projects}
+          label="More projects"
+          onMore={async (after) => {
+            try {
+              const page = await api.projects.list({ after });
+              setProjects((prev) => [...prev, ...page.items]);
+              setCursor('projects', page.next);
+            } catch (e: any) { setErr(e.message); }
+          }}
+        />
         <div className="space" />
         {selectedProject && (
           <>
@@ -295,6 +318,16 @@ export default function AdminPage() {
             <ul>
               {projScenarios.map(s => (<li key={s.id}>{s.name} (#{s.id})</li>))}
             </ul>
+            <LoadMore
+              next={cursors.scenarios}
+              onMore={async (after) => {
+                try {
+                  const page = await api.scenarios.list(Number(selectedProject), { after });
+                  setProjScenarios((prev) => [...prev, ...page.items]);
+                  setCursor('scenarios', page.next);
+                } catch (e: any) { setErr(e.message); }
+              }}
+            />
             <div className="space" />
             <h3>Artifacts</h3>
             <div className="row">
@@ -325,6 +358,16 @@ export default function AdminPage() {
                 </li>
               ))}
             </ul>
+            <LoadMore
+              next={cursors.artifacts}
+              onMore={async (after) => {
+                try {
+                  const page = await api.artifacts.list(Number(selectedProject), { after });
+                  setProjArtifacts((prev) => [...prev, ...page.items]);
+                  setCursor('artifacts', page.next);
+                } catch (e: any) { setErr(e.message); }
+              }}
+            />
           </>
         )}
       </div>
@@ -368,8 +411,9 @@ export default function AdminPage() {
           try {
             await api.users.delete(pendingDelete);
             setPendingDelete(null);
-            const list = await api.users.list();
-            setUsers(list);
+            const page = await api.users.list();
+            setUsers(page.items);
+            setCursor('users', page.next);
             setToast({ msg: 'User deleted' });
           } catch (e: any) { setErr(e.message); setPendingDelete(null); }
         }}
@@ -2,6 +2,7 @@ import React, { useState, DragEvent, useEffect } from 'react';
 import Layout from '../components/Layout';
 import Confirm from '../components/Confirm';
 import Toast from '../components/Toast';
+import LoadMore from '../components/LoadMore';
 import { api, normalizeS3 } from '../lib/api';
 import { href } from '../router';
 
@@ -14,6 +15,7 @@ export default function ArtifactsPage({ projectId }: { projectId: number }) {
   const [scenarioId, setScenarioId] = useState<number | ''>('');
   const [rulepackId, setRulepackId] = useState<number | ''>('');
   const [scenarios, setScenarios] = useState<Array<{ id: number; name: string }>>([]);
+  const [scenariosNext, setScenariosNext] = useState<string | null>(null);
   const [rulepacks, setRulepacks] = useState<Array<{ id: number; name: string; version?: string }>>([]);
   const [newScenName, setNewScenName] = useState('');
   const [newScenConfig, setNewScenConfig] = useState('');
@@ -38,11 +40,13 @@ export default function ArtifactsPage({ projectId }: { projectId: number }) {
 
   async function loadLists() {
     try {
-      const [scs, rps] = await Promise.all([
+      const [page, rps] = await Promise.all([
         api.scenarios.list(projectId),
         api.rulepacks.list(),
       ]);
+      const scs = page.items;
       setScenarios(scs);
+      setScenariosNext(page.next);
       setRulepacks(rps);
       if (!scenarioId && scs.length) setScenarioId(scs[0].id);
       if (!rulepackId && rps.length) setRulepackId(rps[0].id);
@@ -160,6 +164,17 @@ export default function ArtifactsPage({ projectId }: { projectId: number }) {
                   <option key={s.id} value={s.id}>{s.name} (#{s.id})</option>
                 ))}
               </select>
+              <LoadMore
+                next={scenariosNext}
+                label="More scenarios"
+                onMore={async (after) => {
+                  try {
+                    const page = await api.scenarios.list(projectId, { after });
+                    setScenarios((prev) => [...prev, ...page.items]);
+                    setScenariosNext(page.next);
+                  } catch (e: any) { setStatus(e.message || 'Failed to load lists'); }
+                }}
+              />
               <div className="space" />
               <form onSubmit={onCreateScenario} aria-label="Create scenario">
                 <label htmlFor="nsn">New name</label>
@@ -13,6 +13,7 @@ export default function EvaluationDetailPage({ id }: { id: number }) {
   const [reportUrl, setReportUrl] = useState<string | null>(null);
   const [busyReport, setBusyReport] = useState(false);
   const [busyRefresh, setBusyRefresh] = useState(false);
+  const [log, setLog] = useState<string[]>([]);
 
   async function load() {
     try {
@@ -34,6 +35,23 @@ export default function EvaluationDetailPage({ id }: { id: number }) {
     }
   }
   useEffect(() => { void load(); }, [id]);
+  // Follow status transitions and progress lines while the run is in flight
+  const live = !!data?.status && !['done', 'error', 'failed'].includes(data.status);
+  useEffect(() => {
+    if (!live) return;
+    const es = api.evaluations.events(id);
+    es.addEventListener('log', (e) => {
+      try { const d = JSON.parse((e as MessageEvent).data); setLog((l) => [...l, d.msg]); } catch {}
+    });
+    es.addEventListener('status', (e) => {
+      try {
+        const d = JSON.parse((e as MessageEvent).data);
+        if (['done', 'error', 'failed'].includes(d.status)) { es.close(); void load(); }
+        else setData((prev: any) => (prev ? { ...prev, status: d.status } : prev));
+      } catch {}
+    });
+    return () => es.close();
+  }, [id, live]);
   useEffect(() => {
     const saved = sessionStorage.getItem(`report_url_${id}`);
     if (saved) setReportUrl(normalizeS3(saved));
@@ -92,6 +110,9 @@ export default function EvaluationDetailPage({ id }: { id: number }) {
             <button onClick={onRefresh} aria-label="Refresh" disabled={busyRefresh}>{busyRefresh ? 'Refreshing…' : 'Refresh'}</button>
           </div>
           <div className="muted">Status: {data?.status || 'unknown'}</div>
+          {log.length > 0 && data?.status !== 'done' && (
+            <pre className="panel" aria-live="polite">{log.join('\n')}</pre>
+          )}
           {reportUrl && (
             <div className="space" />
           )}
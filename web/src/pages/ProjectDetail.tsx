@@ -1,9 +1,10 @@
 import React, { useEffect, useState } from 'react';
 import Layout from '../components/Layout';
-import { api, normalizeS3 } from '../lib/api';
+import { api, applyUrls, ARTIFACT_URLS, missingUrlKeys, normalizeS3, REPORT_URLS } from '../lib/api';
 import { href } from '../router';
 import Confirm from '../components/Confirm';
 import Toast from '../components/Toast';
+import LoadMore from '../components/LoadMore';
 
 type Project = { id: number; name: string; description?: string };
 type User = { id: number; email: string; org_id?: number | null; roles: string[] };
@@ -19,17 +20,20 @@ export default function ProjectDetailPage({ id }: { id: number }) {
   const [newScenName, setNewScenName] = useState('');
   const [newScenConfig, setNewScenConfig] = useState('');
   const [pendingScenarioDelete, setPendingScenarioDelete] = useState<number | null>(null);
-  const [artifacts, setArtifacts] = useState<Array<{ id:number; name:string; presigned_url?: string }>>([]);
+  const [artifacts, setArtifacts] = useState<Array<{ id:number; name:string; object_key?: string; presigned_url?: string }>>([]);
   const [members, setMembers] = useState<User[]>([]);
   const [allUsers, setAllUsers] = useState<User[]>([]);
   const [addUserId, setAddUserId] = useState<number | ''>('');
   const [toast, setToast] = useState<{ msg: string } | null>(null);
   const [rulepacks, setRulepacks] = useState<Array<{ id:number; name:string; version?:string }>>([]);
-  const [reports, setReports] = useState<Array<{ id:number; title:string; presigned_html_url?:string; presigned_pdf_url?:string; created_at?: string }>>([]);
+  const [reports, setReports] = useState<Array<{ id:number; title:string; html_key?:string; pdf_key?:string; presigned_html_url?:string; presigned_pdf_url?:string; created_at?: string }>>([]);
   const [busyEvalId, setBusyEvalId] = useState<number | null>(null);
   const [convBusyId, setConvBusyId] = useState<number | null>(null);
   const [selScenario, setSelScenario] = useState<Record<number, number | ''>>({});
   const [selRulepack, setSelRulepack] = useState<Record<number, number | ''>>({});
+  // Next-page cursors of the paginated lists, by list name
+  const [cursors, setCursors] = useState<Record<string, string | null>>({});
+  const setCursor = (list: string, next: string | null) => setCursors((prev) => ({ ...prev, [list]: next }));
   async function pollEvaluation(eid: number, maxMs = 60000, intervalMs = 1000): Promise<any | null> {
     const deadline = Date.now() + maxMs;
     while (Date.now() < deadline) {
@@ -42,10 +46,30 @@ export default function ProjectDetailPage({ id }: { id: number }) {
     return null;
   }
   const [evaluations, setEvaluations] = useState<Array<{ id:number; status:string; created_at?:string; metrics?: any }>>([]);
+  async function loadEvaluations() {
+    const page = await api.projects.evaluations.list(id);
+    setEvaluations(page.items);
+    setCursor('evaluations', page.next);
+  }
+  async function moreArtifacts(after: string) {
+    try {
+      const page = await api.artifacts.list(id, { after });
+      setArtifacts((prev) => [...prev, ...page.items]);
+      setCursor('artifacts', page.next);
+    } catch (e:any) { setErr(e.message); }
+  }
+  async function moreScenarios(after: string) {
+    try {
+      const page = await api.scenarios.list(id, { after });
+      setScenarios((prev) => [...prev, ...page.items]);
+      setCursor('scenarios', page.next);
+    } catch (e:any) { setErr(e.message); }
+  }
   async function loadReports() {
     try {
-      const reps = await api.projects.reports.list(id);
-      setReports(reps || []);
+      const page = await api.projects.reports.list(id);
+      setReports(page.items);
+      setCursor('reports', page.next);
     } catch (e:any) { setErr(e.message); }
   }
   // Inline uploader state
@@ -61,34 +85,45 @@ export default function ProjectDetailPage({ id }: { id: number }) {
         setName(p.name || '');
         setDesc(p.description || '');
         try {
-          const scs = await api.scenarios.list(id);
-          setScenarios(scs);
+          const page = await api.scenarios.list(id);
+          setScenarios(page.items);
+          setCursor('scenarios', page.next);
         } catch {}
         try {
-          const arts = await api.artifacts.list(id);
-          setArtifacts(arts);
+          const page = await api.artifacts.list(id);
+          setArtifacts(page.items);
+          setCursor('artifacts', page.next);
         } catch {}
         try {
           const rps = await api.rulepacks.list();
           setRulepacks(rps);
         } catch {}
         try { await loadReports(); } catch {}
-        try {
-          const evals = await api.projects.evaluations.list(id);
-          setEvaluations(evals || []);
-        } catch {}
+        try { await loadEvaluations(); } catch {}
         try {
           const mem = await api.projects.members.list(id);
           setMembers(mem);
         } catch {}
         try {
-          const users = await api.users.list();
-          setAllUsers(users);
+          const page = await api.users.list();
+          setAllUsers(page.items);
+          setCursor('users', page.next);
         } catch {}
       } catch (e: any) { setErr(e.message); }
     })();
   }, [id]);
 
+  // Presigned URLs for the rows of the tab on screen, in one batch
+  useEffect(() => {
+    if (tab === 'artifacts') {
+      const keys = missingUrlKeys(artifacts, ARTIFACT_URLS);
+      if (keys.length) api.files.presignAll(keys).then((urls) => setArtifacts((prev) => applyUrls(prev, ARTIFACT_URLS, urls))).catch(() => {});
+    } else if (tab === 'reports') {
+      const keys = missingUrlKeys(reports, REPORT_URLS);
+      if (keys.length) api.files.presignAll(keys).then((urls) => setReports((prev) => applyUrls(prev, REPORT_URLS, urls))).catch(() => {});
+    }
+  }, [tab, artifacts, reports]);
+
   return (
     <Layout>
       {!project ? <div>Loading...</div> : (
@@ -245,6 +280,7 @@ export default function ProjectDetailPage({ id }: { id: number }) {
                   </li>
                 ))}
               </ul>
+              <LoadMore next={cursors.artifacts} onMore={moreArtifacts} />
             </>
           )}
           {tab === 'evaluations' && (
@@ -284,7 +320,7 @@ export default function ProjectDetailPage({ id }: { id: number }) {
                             if (!rpId) { setErr('No rulepack available'); return; }
                             const r = await api.evaluations.enqueue(a.id, scenarioId, rpId);
                             setToast({ msg: `Evaluation ${r.id} enqueued` });
-                            try { const evals = await api.projects.evaluations.list(id); setEvaluations(evals || []); } catch {}
+                            try { await loadEvaluations(); } catch {}
                           } catch (e:any) { setErr(e.message); }
                         }}
                       >Run</button>
@@ -314,6 +350,8 @@ export default function ProjectDetailPage({ id }: { id: number }) {
                   </li>
                 ))}
               </ul>
+              <LoadMore next={cursors.artifacts} onMore={moreArtifacts} />
+              <LoadMore next={cursors.scenarios} label="More scenarios" onMore={moreScenarios} />
             </>
           )}
           {tab === 'scenarios' && (
@@ -343,6 +381,7 @@ export default function ProjectDetailPage({ id }: { id: number }) {
                   </li>
                 ))}
               </ul>
+              <LoadMore next={cursors.scenarios} onMore={moreScenarios} />
               <h3>New Scenario</h3>
               <form
                 onSubmit={async (e) => {
@@ -389,6 +428,16 @@ export default function ProjectDetailPage({ id }: { id: number }) {
                 </li>
               ))}
               </ul>
+              <LoadMore
+                next={cursors.reports}
+                onMore={async (after) => {
+                  try {
+                    const page = await api.projects.reports.list(id, { after });
+                    setReports((prev) => [...prev, ...page.items]);
+                    setCursor('reports', page.next);
+                  } catch (e:any) { setErr(e.message); }
+                }}
+              />
               <div className="space" />
               <h2>Evaluations</h2>
               <ul>
@@ -410,6 +459,16 @@ export default function ProjectDetailPage({ id }: { id: number }) {
                   </li>
                 ))}
               </ul>
+              <LoadMore
+                next={cursors.evaluations}
+                onMore={async (after) => {
+                  try {
+                    const page = await api.projects.evaluations.list(id, { after });
+                    setEvaluations((prev) => [...prev, ...page.items]);
+                    setCursor('evaluations', page.next);
+                  } catch (e:any) { setErr(e.message); }
+                }}
+              />
             </>
           )}
           {tab === 'users' && (
@@ -441,6 +500,17 @@ export default function ProjectDetailPage({ id }: { id: number }) {
                     try { await api.projects.members.add(id, Number(addUserId)); const mem = await api.projects.members.list(id); setMembers(mem); setAddUserId(''); setToast({ msg: 'User added' }); }
                     catch (e:any) { setErr(e.message); }
                   }}>Add</button>
+                  <LoadMore
+                    next={cursors.users}
+                    label="More users"
+                    onMore={async (after) => {
+                      try {
+                        const page = await api.users.list({ after });
+                        setAllUsers((prev) => [...prev, ...page.items]);
+                        setCursor('users', page.next);
+                      } catch (e:any) { setErr(e.message); }
+                    }}
+                  />
                 </div>
               ) : (
                 <form onSubmit={async (e)=>{ e.preventDefault(); if (!addUserId) return; try { await api.projects.members.add(id, Number(addUserId)); const mem = await api.projects.members.list(id); setMembers(mem); setAddUserId(''); } catch (e:any){ setErr(e.message);} }} aria-label="Add user by ID">
@@ -4,11 +4,13 @@ import { api } from '../lib/api';
 import { href } from '../router';
 import Confirm from '../components/Confirm';
 import Toast from '../components/Toast';
+import LoadMore from '../components/LoadMore';
 
 type Project = { id: number; name: string; description?: string };
 
 export default function ProjectsPage() {
   const [items, setItems] = useState<Project[]>([]);
+  const [next, setNext] = useState<string | null>(null);
   const [name, setName] = useState('');
   const [desc, setDesc] = useState('');
   const [err, setErr] = useState<string | null>(null);
@@ -17,8 +19,9 @@ export default function ProjectsPage() {
 
   async function load() {
     try {
-      const data = await api.projects.list();
-      setItems(data);
+      const page = await api.projects.list();
+      setItems(page.items);
+      setNext(page.next);
     } catch (e: any) {
       setErr(e.message);
     }
@@ -80,6 +83,16 @@ export default function ProjectsPage() {
           </li>
         ))}
       </ul>
+      <LoadMore
+        next={next}
+        onMore={async (after) => {
+          try {
+            const page = await api.projects.list({ after });
+            setItems((prev) => [...prev, ...page.items]);
+            setNext(page.next);
+          } catch (e: any) { setErr(e.message); }
+        }}
+      />
       <Confirm
         open={pendingDelete !== null}
         title="Delete project?"
@@ -3,11 +3,13 @@ import Layout from '../components/Layout';
 import { api } from '../lib/api';
 import Confirm from '../components/Confirm';
 import Toast from '../components/Toast';
+import LoadMore from '../components/LoadMore';
 
 type Scenario = { id: number; name: string };
 
 export default function ScenariosPage({ projectId }: { projectId: number }) {
   const [items, setItems] = useState<Scenario[]>([]);
+  const [next, setNext] = useState<string | null>(null);
   const [name, setName] = useState('');
   const [config, setConfig] = useState('');
   const [err, setErr] = useState<string | null>(null);
@@ -16,8 +18,9 @@ export default function ScenariosPage({ projectId }: { projectId: number }) {
 
   async function load() {
     try {
-      const data = await api.scenarios.list(projectId);
-      setItems(data);
+      const page = await api.scenarios.list(projectId);
+      setItems(page.items);
+      setNext(page.next);
     } catch (e: any) { setErr(e.message); }
   }
   useEffect(() => { void load(); }, [projectId]);
@@ -57,6 +60,16 @@ export default function ScenariosPage({ projectId }: { projectId: number }) {
           </li>
         ))}
       </ul>
+      <LoadMore
+        next={next}
+        onMore={async (after) => {
+          try {
+            const page = await api.scenarios.list(projectId, { after });
+            setItems((prev) => [...prev, ...page.items]);
+            setNext(page.next);
+          } catch (e: any) { setErr(e.message); }
+        }}
+      />
       <Confirm
         open={pendingDelete !== null}
         title="Delete scenario?"